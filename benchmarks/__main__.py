@@ -0,0 +1,68 @@
+"""
+Benchmark suite.
+
+    python -m benchmarks [solvers calibration data] [--quick] [--filter TEXT] [--repeat 5]
+                         [--output results.json] [--baseline results.json] [--tolerance 0.3]
+
+Runs the cases of the selected suites (all by default) and prints the median time and throughput of each.
+--output writes the results as JSON, --baseline compares against such a file and exits with status 1
+when a case's median is slower than the baseline's by more than the tolerance.
+Import time is benchmarked separately by python -m benchmarks.importtime.
+"""
+import sys
+import json
+import argparse
+import importlib
+from typing import Optional
+
+from .harness import measure, compare, environment
+
+
+SUITES = ("solvers", "calibration", "data")
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("suites", nargs="*", help=f"Suites to run, all if omitted: {', '.join(SUITES)}.")
+    parser.add_argument("--quick", action="store_true", help="Smaller sizes, for a fast smoke run.")
+    parser.add_argument("--filter", default="", help="Only run cases whose name contains this text.")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per case.")
+    parser.add_argument("--warmup", type=int, default=1, help="Untimed runs per case.")
+    parser.add_argument("--output", help="Write the results as JSON.")
+    parser.add_argument("--baseline", help="JSON written by --output to compare against.")
+    parser.add_argument("--tolerance", type=float, default=0.3, help="Allowed relative slowdown.")
+    args = parser.parse_args(argv)
+    unknown = set(args.suites).difference(SUITES)
+    if unknown:
+        parser.error(f"Unknown suites: {', '.join(sorted(unknown))}")
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)["results"]
+
+    results = {}
+    for suite in args.suites or SUITES:
+        for case in importlib.import_module(f".{suite}", __package__).cases(args.quick):
+            if args.filter not in case.name:
+                continue
+            result = results[case.name] = measure(case, args.repeat, args.warmup)
+            line = f"{case.name:72s} {result['median_s']*1000:10.2f} ms"
+            if "rate" in result:
+                line += f"  {result['rate']:12.4g} {result['unit']}"
+            if baseline is not None and case.name in baseline:
+                line += f"  x{result['median_s']/baseline[case.name]['median_s']:.2f}"
+            print(line, flush=True)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"environment": environment(), "quick": args.quick, "results": results}, f, indent=2)
+
+    if baseline is None:
+        return 0
+    regressions = compare(results, baseline, args.tolerance)
+    for name, old, new in regressions:
+        print(f"REGRESSION {name}: {old*1000:.2f} ms -> {new*1000:.2f} ms", file=sys.stderr)
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
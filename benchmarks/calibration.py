@@ -0,0 +1,36 @@
+"""
+calibrate of every model across series lengths.
+"""
+import numpy as np
+
+from .harness import Case
+from .solvers import MODELS
+
+
+def synthetic_rates(n: int, seed: int = 0) -> np.ndarray:
+    """
+    Mean-reverting daily series around 3 (rates in percent), positive as CIR requires.
+    """
+
+    dt = 1/252
+    noise = np.random.default_rng(seed).standard_normal(n-1)*0.3*np.sqrt(dt)
+    rates = np.empty(n)
+    rates[0] = 3.0
+    for i, z in enumerate(noise.tolist()):
+        rates[i+1] = rates[i] + 0.5*(3.0-rates[i])*dt + z
+    return rates
+
+def calibrate_case(model: str, n: int) -> Case:
+    rates = synthetic_rates(n)
+    instance = MODELS[model]()
+    return Case(
+        name=f"calibrate/{model}/n={n}",
+        run=lambda: instance.calibrate(rates, dt=1/252),
+        params={"model": model, "n": n},
+        work=n,
+        unit="observations",
+    )
+
+def cases(quick: bool = False) -> list[Case]:
+    lengths = (252, 2520) if quick else (252, 2520, 25200)
+    return [calibrate_case(model, n) for model in MODELS for n in lengths]
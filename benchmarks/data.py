@@ -0,0 +1,69 @@
+"""
+DataLoader construction (CSV parse, cache write, cache hit) and lookups on synthetic CSVs of the size
+of the bundled data (daily dates x 360 monthly maturities).
+"""
+import os
+import shutil
+import atexit
+import tempfile
+
+import numpy as np
+
+from .harness import Case
+from .calibration import synthetic_rates
+
+from data import DataLoader
+
+
+MATURITIES = 360
+
+def write_csv(directory: str, num_dates: int) -> str:
+    """
+    Writes num_dates business days of rates for every maturity, in shuffled row order as in the bundled file.
+    """
+
+    dates = np.busday_offset("2000-01-03", np.arange(num_dates), roll="forward")
+    curve = synthetic_rates(num_dates)[:, None] + np.linspace(0, 1, MATURITIES)
+    order = np.random.default_rng(0).permutation(num_dates)
+    file_path = os.path.join(directory, f"zcbs_{num_dates}.csv")
+    with open(file_path, "w") as f:
+        f.write(",".join(["Date", *map(str, range(1, MATURITIES+1))]) + "\n")
+        for i in order:
+            f.write(f"{dates[i]}," + ",".join(map(repr, curve[i].tolist())) + "\n")
+    return file_path
+
+def loader_cases(directory: str, num_dates: int) -> list[Case]:
+    file_path = write_csv(directory, num_dates)
+    cache_dir = os.path.join(directory, f"cache_{num_dates}")
+    params = {"dates": num_dates, "maturities": MATURITIES}
+    DataLoader(file_path, cache_dir=cache_dir)
+    loader = DataLoader(file_path, cache_dir=cache_dir)
+    keys = np.random.default_rng(1).choice(loader.date_index, 1000)
+    maturities = np.random.default_rng(2).integers(1, MATURITIES+1, 1000)
+
+    def get_dates():
+        for date in keys:
+            loader.get_date(date)
+
+    def get_maturities():
+        for months in maturities.tolist():
+            np.asarray(loader.get_maturity(months)).sum()
+
+    name = f"data/dates={num_dates}"
+    rows = {"params": params, "work": num_dates, "unit": "rows"}
+    lookups = {"params": params, "work": 1000, "unit": "lookups"}
+    return [
+        Case(f"{name}/parse", lambda: DataLoader(file_path, cache=False), **rows),
+        Case(f"{name}/parse_and_cache", lambda: DataLoader(file_path, cache_dir=cache_dir),
+             setup=lambda: shutil.rmtree(cache_dir, ignore_errors=True), **rows),
+        Case(f"{name}/cached", lambda: DataLoader(file_path, cache_dir=cache_dir),
+             setup=lambda: os.path.exists(cache_dir) or DataLoader(file_path, cache_dir=cache_dir), **rows),
+        Case(f"{name}/get_date", get_dates, **lookups),
+        Case(f"{name}/get_maturity", get_maturities, **lookups),
+    ]
+
+def cases(quick: bool = False) -> list[Case]:
+    directory = tempfile.mkdtemp(prefix="benchmarks_data_")
+    atexit.register(shutil.rmtree, directory, ignore_errors=True)
+    sizes = (2658,) if quick else (2658, 10000)
+    return [case for n in sizes for case in loader_cases(directory, n)]
@@ -0,0 +1,87 @@
+import os
+import sys
+import time
+import platform
+import statistics
+from dataclasses import dataclass, field
+from typing import Callable, Optional
+
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+if SRC_DIR not in sys.path:
+    sys.path.insert(0, SRC_DIR)
+
+@dataclass
+class Case:
+    """
+    One benchmark case.
+
+    Attributes:
+        name (str): Unique name, "<suite>/<subject>/<parameters>".
+        run (Callable[[], None]): The timed operation.
+        params (dict): Parameters of the case, recorded with the results.
+        setup (Optional[Callable[[], None]]): Untimed preparation before every timed run (e.g. clearing a cache).
+        work (Optional[float]): Units of work per run (e.g. chains times steps), reported as a rate.
+        unit (str): Name of the unit of work.
+    """
+
+    name: str
+    run: Callable[[], None]
+    params: dict = field(default_factory=dict)
+    setup: Optional[Callable[[], None]] = None
+    work: Optional[float] = None
+    unit: str = ""
+
+def measure(case: Case, repeat: int = 5, warmup: int = 1) -> dict:
+    """
+    Times case.run, after warmup untimed runs (pool start-up, first-touch allocation, lazy imports).
+
+    Returns:
+        dict: Median, minimum and all wall-clock times in seconds, the rate of case.work per second of
+            the median, and the case parameters.
+    """
+
+    for _ in range(warmup):
+        if case.setup is not None:
+            case.setup()
+        case.run()
+    times = []
+    for _ in range(repeat):
+        if case.setup is not None:
+            case.setup()
+        start = time.perf_counter()
+        case.run()
+        times.append(time.perf_counter()-start)
+
+    result = {"median_s": statistics.median(times), "min_s": min(times), "runs_s": times, "params": case.params}
+    if case.work is not None:
+        result["rate"] = case.work/result["median_s"]
+        result["unit"] = f"{case.unit}/s"
+    return result
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list[tuple[str, float, float]]:
+    """
+    Args:
+        results (dict): Results by case name, as returned by measure.
+        baseline (dict): Earlier results by case name.
+        tolerance (float): Allowed relative slowdown of the median.
+
+    Returns:
+        list[tuple[str, float, float]]: Name, baseline and current median of every case slower than the tolerance.
+    """
+
+    regressions = []
+    for name, result in results.items():
+        if name in baseline and result["median_s"] > baseline[name]["median_s"]*(1+tolerance):
+            regressions.append((name, baseline[name]["median_s"], result["median_s"]))
+    return regressions
+
+def environment() -> dict:
+    import numpy as np
+
+    return {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+    }
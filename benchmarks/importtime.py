@@ -0,0 +1,126 @@
+"""
+Import-time regression benchmark.
+
+Imports each entry module in fresh interpreters under python -X importtime and reports the median
+cumulative import time and the third-party packages it loaded. A module loading one of its forbidden
+packages (e.g. util loading sympy or matplotlib) fails regardless of timing, as does a median slower than
+the baseline by more than the tolerance.
+
+    python -m benchmarks.importtime [--repeat 5] [--output importtime.json] [--baseline importtime.json]
+"""
+import os
+import re
+import sys
+import json
+import argparse
+import platform
+import statistics
+import subprocess
+from typing import Optional
+
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+
+HEAVY = ("sympy", "scipy", "pandas", "matplotlib", "dill", "tqdm", "sklearn")
+
+# Entry module -> packages it must not import
+TARGETS = {
+    "util": HEAVY,
+    "simulation": HEAVY,
+    "model": HEAVY,
+    "solver": HEAVY,
+    "stats": HEAVY,
+    "data": ("sympy", "scipy", "matplotlib", "dill", "tqdm", "sklearn"),
+    "backtest": ("sympy", "scipy", "matplotlib", "dill", "tqdm", "sklearn"),
+    "visualizations": ("sympy", "scipy", "dill", "tqdm", "sklearn"),
+}
+
+_LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|( *)(\S+)")
+
+def measure(module: str) -> tuple[float, set[str]]:
+    """
+    Imports module in a fresh interpreter.
+
+    Returns:
+        tuple[float, set[str]]: Cumulative import time in ms of the module and its imports, and the top-level
+            names of every module imported along the way.
+
+    Raises:
+        RuntimeError: If the import fails.
+    """
+
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [SRC_DIR, os.getenv("PYTHONPATH")])))
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"], env=env, capture_output=True, text=True)
+    if proc.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{proc.stderr[-2000:]}")
+
+    total_us = 0
+    packages = set()
+    for self_us, cumulative_us, indent, name in _LINE.findall(proc.stderr):
+        packages.add(name.split(".")[0])
+        # Top-level entries (one space after the bar) already include everything they imported
+        if len(indent) == 1:
+            total_us += int(cumulative_us)
+    return total_us/1000, packages
+
+def run(modules: list[str], repeat: int) -> dict:
+    results = {}
+    for module in modules:
+        times, packages = [], set()
+        for _ in range(repeat):
+            ms, packages = measure(module)
+            times.append(ms)
+        results[module] = {
+            "median_ms": statistics.median(times),
+            "runs_ms": times,
+            "heavy": sorted(packages.intersection(HEAVY)),
+            "forbidden": sorted(packages.intersection(TARGETS.get(module, ()))),
+        }
+    return results
+
+def compare(results: dict, baseline: dict, tolerance: float, min_delta_ms: float) -> list[str]:
+    """
+    Returns:
+        list[str]: Descriptions of the modules slower than the baseline by more than tolerance (relative)
+            and min_delta_ms (absolute, to ignore noise on fast imports).
+    """
+
+    regressions = []
+    for module, result in results.items():
+        if module not in baseline:
+            continue
+        old, new = baseline[module]["median_ms"], result["median_ms"]
+        if new > old*(1+tolerance) and new-old > min_delta_ms:
+            regressions.append(f"{module}: {old:.1f} ms -> {new:.1f} ms")
+    return regressions
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("modules", nargs="*", default=list(TARGETS), help="Entry modules, all targets if omitted.")
+    parser.add_argument("--repeat", type=int, default=5, help="Fresh interpreters per module.")
+    parser.add_argument("--output", help="Write the results as JSON.")
+    parser.add_argument("--baseline", help="JSON written by --output to compare against.")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed relative slowdown.")
+    parser.add_argument("--min-delta", type=float, default=10.0, help="Slowdowns below this many ms are ignored.")
+    args = parser.parse_args(argv)
+
+    results = run(args.modules, args.repeat)
+    for module, result in results.items():
+        heavy = ", ".join(result["heavy"]) or "-"
+        print(f"{module:16s} {result['median_ms']:8.1f} ms   heavy: {heavy}")
+
+    report = {"python": platform.python_version(), "results": results}
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+    failures = [f"{module} imports {', '.join(result['forbidden'])}" for module, result in results.items() if result["forbidden"]]
+    if args.baseline:
+        with open(args.baseline) as f:
+            failures += compare(results, json.load(f)["results"], args.tolerance, args.min_delta)
+    for failure in failures:
+        print(f"FAIL {failure}", file=sys.stderr)
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
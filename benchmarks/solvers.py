@@ -0,0 +1,67 @@
+"""
+SDESolver.run across chain, step and worker counts, Euler-Maruyama against Milstein for every model,
+parameter batches stepped in one pass, and paths carrying tangents for all parameter sensitivities.
+"""
+import numpy as np
+from omegaconf import OmegaConf
+
+from .harness import Case
+
+from model import Vasicek, CIR, BlackKarasinski
+from util import make_solver
+
+
+MAX_CELLS = 3*10**7
+
+# Parameters of the order of a calibration on daily rates in percent
+MODELS = {
+    "Vasicek": lambda: Vasicek(theta=0.15, alpha=0.05, sigma=0.3, r0=3.0),
+    "CIR": lambda: CIR(theta=0.15, alpha=0.05, sigma=0.2, r0=3.0),
+    "BlackKarasinski": lambda: BlackKarasinski(theta=[0.15], phi=[0.05], sigma=[0.3], r0=3.0),
+}
+
+def solver_case(solver: str, model: str, chains: int, steps: int, workers: int, params: int = 1, sensitivities: bool = False) -> Case:
+    config = OmegaConf.create({"solver": {
+        "_target_": f"solver.{solver}",
+        "_partial_": True,
+        "num_chains": chains,
+        "num_workers": workers,
+        # One block per worker, so the pool runs
+        "chunk_size": -(-chains//workers) if workers > 1 else None,
+        "seed": 0,
+        "sensitivities": sensitivities,
+    }})
+    ir_model = MODELS[model]()
+    name = f"solver/{solver}/{model}/chains={chains}/steps={steps}/workers={workers}"
+    if params > 1:
+        # Volatility sweep around the base model, all sets stepped together
+        ir_model = ir_model.scenarios({"sigma": np.linspace(0.5, 1.5, params)*np.mean(ir_model.sigma)})
+        name += f"/params={params}"
+    if sensitivities:
+        name += "/sensitivities"
+    sde = make_solver(config, ir_model, 0, steps, tag="benchmark", dt=1/252)
+    blocks = -(-chains//sde.chunk_size)
+    if workers > 1 and blocks < 2:
+        raise ValueError(f"{name} runs in one block, the worker pool would not be used.")
+    return Case(
+        name=name,
+        run=sde.run,
+        params={"solver": solver, "model": model, "chains": chains, "steps": steps, "workers": workers, "params": params, "sensitivities": sensitivities, "blocks": blocks},
+        work=params*chains*steps,
+        unit="chain-steps",
+    )
+
+def cases(quick: bool = False) -> list[Case]:
+    chains = (1000, 10000) if quick else (1000, 10000, 50000)
+    steps = (252, 2520)
+    workers = (1, 2) if quick else (1, 2, 4)
+
+    # run keeps every chain in memory, so sizes above MAX_CELLS are skipped
+    grid = [("EulerMaruyama", "Vasicek", c, n, 1) for c in chains for n in steps if c*n <= MAX_CELLS]
+    grid += [("EulerMaruyama", "Vasicek", 10000, 2520, w) for w in workers if w > 1]
+    grid += [(solver, model, 10000, 252, 1) for model in MODELS for solver in ("EulerMaruyama", "Milstein")]
+    # Against the same chain-steps as params separate runs of 1000 chains
+    grid += [("EulerMaruyama", model, 1000, 252, 1, 16) for model in MODELS]
+    # Against 2*len(PARAM_NDIM) bumped runs of the same size
+    grid += [(solver, model, 10000, 252, 1, 1, True) for model in MODELS for solver in ("EulerMaruyama", "Milstein")]
+    return [solver_case(*args) for args in dict.fromkeys(grid)]
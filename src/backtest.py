@@ -0,0 +1,105 @@
+import os
+import logging
+import numpy as np
+import pandas as pd
+
+from omegaconf import DictConfig
+from hydra.utils import instantiate
+
+from solver import ExactSolver
+from stats import pinball_loss, coverage, crps_sample
+from util import init_model, make_solver
+from instrumentation import stage
+
+
+log = logging.getLogger(__name__)
+
+def backtest(config: DictConfig):
+    """
+    Backtest procedure.
+
+    Walks forecast origins through the history of the sim.bond column, every sim.stride dates from the first
+    full calibration window of sim.window dates. At each origin the model is calibrated on the past window,
+    sim.horizon steps are forecast and the realized rates are scored against the forecast distribution:
+    CRPS, pinball loss of each of sim.quantiles and coverage of the band between the outer quantiles.
+
+    Time is in years of config.calendar, one business day per observation.
+    Calibrations of all origins come from one rolling calibration when the model supports it, and every origin
+    reuses the same increments (common random numbers), so origins, models and solvers are compared on
+    the same noise. Adaptive solvers re-plan their step grid for each origin's calibration and draw the same
+    streams on it. Control variates only correct means, so they are rejected. Scores are written to OUTPUT_DIR/backtest_<model>_<solver>.csv (per horizon step)
+    and backtest_<model>_<solver>_origins.csv (per origin).
+    """
+
+    log.info("Initializing data loader.")
+    with stage("data load"):
+        data_loader = instantiate(config.data)
+    calendar = instantiate(config.calendar)
+
+    log.info("Initializing model.")
+    model = init_model(config)
+
+    rates = np.asarray(data_loader.get_maturity(config.sim.bond))
+    window = config.sim.window
+    horizon = config.sim.horizon
+    quantiles = sorted(config.sim.get("quantiles", (0.05, 0.5, 0.95)))
+    origins = np.arange(window-1, len(rates)-horizon, config.sim.get("stride", 1))
+    if len(origins) == 0:
+        raise ValueError(f"No origin leaves a window of {window} and a horizon of {horizon} in {len(rates)} dates.")
+
+    log.info(f"Calibrating {len(origins)} origins.")
+    with stage("calibration"):
+        try:
+            table = type(model).rolling_calibrate(rates, window, dt=calendar.dt)
+        except NotImplementedError:
+            table = None
+
+    solver = make_solver(config, model, 0, horizon, tag="backtest", dt=calendar.dt)
+    if solver.sensitivities or solver.control_variate:
+        raise ValueError("Backtests score paths only, solver.sensitivities and solver.control_variate must be False.")
+    exact = isinstance(solver, ExactSolver)
+    # Adaptive grids are planned from the calibrated model at each origin
+    dW = None if exact or solver.adaptive else solver.increments(0, solver.num_chains)
+
+    log.info("Running backtest.")
+    crps = np.empty((len(origins), horizon))
+    hits = np.empty((len(origins), horizon))
+    pinball = np.empty((len(origins), len(quantiles), horizon))
+    with stage("backtest simulation") as timing:
+        for i, o in enumerate(origins):
+            if table is None:
+                model.calibrate(rates[o-window+1:o+1], dt=calendar.dt, **config.sim.get("calibrate", {}))
+            else:
+                for name in model.PARAMS:
+                    setattr(model, name, float(table.at[o, name]))
+            solver.Y0 = rates[o]
+            if solver.adaptive:
+                solver.sim_grid = None
+                dW = solver.increments(0, solver.num_chains)
+            paths = solver.simulate(0, solver.num_chains) if exact else solver.integrate(dW)
+
+            forecast = paths[:, 1:]
+            realized = rates[o+1:o+horizon+1]
+            bands = np.quantile(forecast, quantiles, axis=0)
+            crps[i] = crps_sample(forecast, realized)
+            hits[i] = coverage(bands[0], bands[-1], realized)
+            for j, p in enumerate(quantiles):
+                pinball[i, j] = pinball_loss(bands[j], realized, p)
+        timing.chains = len(origins)*solver.num_chains
+        timing.steps = timing.chains*horizon
+
+    nominal = quantiles[-1]-quantiles[0]
+    by_step = pd.DataFrame({"step": np.arange(1, horizon+1), "crps": crps.mean(axis=0), "coverage": hits.mean(axis=0)})
+    by_origin = pd.DataFrame({"date": data_loader.date_index[origins], "crps": crps.mean(axis=1), "coverage": hits.mean(axis=1)})
+    for j, p in enumerate(quantiles):
+        by_step[f"pinball_q{p:g}"] = pinball[:, j].mean(axis=0)
+        by_origin[f"pinball_q{p:g}"] = pinball[:, j].mean(axis=1)
+    log.info(f"Mean CRPS {crps.mean()}, coverage {hits.mean()} (nominal {nominal:g}), pinball {pinball.mean()}.")
+
+    name = f"backtest_{type(model).__name__}_{type(solver).__name__}"
+    output_dir = os.getenv("OUTPUT_DIR", ".")
+    os.makedirs(output_dir, exist_ok=True)
+    by_step.to_csv(os.path.join(output_dir, f"{name}.csv"), index=False)
+    by_origin.to_csv(os.path.join(output_dir, f"{name}_origins.csv"), index=False)
+    log.info(f"Scores saved to {os.path.join(output_dir, name)}.csv")
+    return by_step
@@ -0,0 +1,54 @@
+import os
+import logging
+import pandas as pd
+
+from omegaconf import DictConfig
+from hydra.utils import instantiate
+
+from instrumentation import stage
+
+
+log = logging.getLogger(__name__)
+
+def calibration(config: DictConfig):
+    """
+    Batch calibration procedure.
+
+    Calibrates the model to every maturity column (sim.axis "maturity") or every date row (sim.axis "date")
+    of the rates matrix in one vectorized call and writes the parameter table to OUTPUT_DIR/calibration_<axis>.csv.
+    With sim.axis "rolling" the sim.bond column is instead recalibrated on every sliding window of sim.window dates.
+    Parameters are per year: date series have one business day of config.calendar per observation, maturity rows one month.
+    """
+
+    log.info("Initializing data loader.")
+    with stage("data load"):
+        data_loader = instantiate(config.data)
+    calendar = instantiate(config.calendar)
+
+    log.info("Initializing model.")
+    model = instantiate(config.model)
+
+    axis = config.sim.get("axis", "maturity")
+    if axis == "maturity":
+        rates, index = data_loader.rates, pd.Index(data_loader.maturity_index, name="maturity")
+    elif axis in ("date", "rolling"):
+        rates, index = data_loader.rates.T, pd.Index(data_loader.date_index, name="date")
+    else:
+        raise ValueError(f"Unknown calibration axis: {axis}")
+    # A date row runs over consecutive monthly maturities
+    dt = 1/12 if axis == "date" else calendar.dt
+
+    if axis == "rolling":
+        log.info(f"Rolling calibration of maturity {config.sim.bond} over windows of {config.sim.window}.")
+        with stage("calibration"):
+            table = type(model).rolling_calibrate(data_loader.get_maturity(config.sim.bond), config.sim.window, index, dt)
+    else:
+        log.info(f"Batch calibration of {rates.shape[1]} series.")
+        with stage("calibration"):
+            table = type(model).calibrate_batch(rates, index, dt)
+
+    file_path = os.path.join(os.getenv("OUTPUT_DIR", "."), f"calibration_{axis}.csv")
+    os.makedirs(os.path.dirname(os.path.abspath(file_path)), exist_ok=True)
+    table.to_csv(file_path)
+    log.info(f"Parameter table saved to {file_path}")
+    return table
@@ -1 +1,2 @@
-from .data_loader import DataLoader
\ No newline at end of file
+from .data_loader import DataLoader
+from .business_calendar import BusinessCalendar
\ No newline at end of file
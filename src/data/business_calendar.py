@@ -0,0 +1,104 @@
+from typing import Optional, Sequence, Union
+from pathlib import Path
+
+import numpy as np
+import numpy.typing as npt
+
+
+DateLike = Union[str, np.datetime64]
+
+class BusinessCalendar:
+    """
+    Business-day calendar built on numpy's busday functions, so grids and day counts are vectorized.
+    Time is measured in business days over days_per_year (business/252 by default), which makes a grid
+    of consecutive business days uniform in years with step dt = 1/days_per_year.
+
+    Attributes:
+        weekmask (str): Business weekdays, Monday first ("1111100" for Monday to Friday).
+        holidays (npt.NDArray[np.datetime64]): Non-business dates.
+        days_per_year (float): Business days in one year.
+        dt (float): Length of one business day in years.
+
+    Methods:
+        is_business_day(dates: npt.ArrayLike) -> npt.NDArray[np.bool_]:
+            Whether each date is a business day.
+        grid(start: DateLike, stop: DateLike, every: int = 1) -> npt.NDArray[np.datetime64]:
+            start, every business day (or every every-th) strictly between, and stop.
+        year_fractions(dates: npt.ArrayLike, origin: Optional[DateLike] = None) -> npt.NDArray[np.float64]:
+            Business time in years from origin to each date.
+        load_holidays(file_path: str) -> npt.NDArray[np.datetime64]:
+            Reads holidays, one ISO date per line.
+    """
+
+    def __init__(self, holidays: Sequence[DateLike] = (), holidays_file: Optional[str] = None, weekmask: str = "1111100", days_per_year: float = 252):
+        """
+        Args:
+            holidays (Sequence[DateLike]): Non-business dates.
+            holidays_file (Optional[str]): File with further non-business dates, one ISO date (YYYY-MM-DD) per line.
+            weekmask (str): Business weekdays, Monday first.
+            days_per_year (float): Business days in one year.
+        """
+
+        dates = [np.asarray(holidays, dtype="datetime64[D]")]
+        if holidays_file is not None:
+            dates.append(self.load_holidays(holidays_file))
+        self.holidays = np.unique(np.concatenate(dates))
+        self.weekmask = weekmask
+        self.days_per_year = days_per_year
+        self.dt = 1/days_per_year
+        self._calendar = np.busdaycalendar(weekmask=weekmask, holidays=self.holidays)
+
+    @staticmethod
+    def load_holidays(file_path: str) -> npt.NDArray[np.datetime64]:
+        """
+        Reads a holiday file, blank lines and lines starting with # are skipped.
+
+        Raises:
+            FileNotFoundError: If the file does not exist.
+        """
+
+        lines = Path(file_path).read_text().splitlines()
+        dates = [line.split(",")[0].strip() for line in lines if line.strip() and not line.lstrip().startswith("#")]
+        return np.asarray(dates, dtype="datetime64[D]")
+
+    def is_business_day(self, dates: npt.ArrayLike) -> npt.NDArray[np.bool_]:
+        return np.is_busday(np.asarray(dates, dtype="datetime64[D]"), busdaycal=self._calendar)
+
+    def grid(self, start: DateLike, stop: DateLike, every: int = 1) -> npt.NDArray[np.datetime64]:
+        """
+        Forecast grid from start (e.g. the last observed date) to stop.
+
+        Args:
+            start (DateLike): First grid date.
+            stop (DateLike): Last grid date, kept even when it is not a business day.
+            every (int): Keep only every every-th business day, e.g. 5 for a weekly grid.
+
+        Returns:
+            npt.NDArray[np.datetime64]: Dates of the grid, just [start] if stop is not after start.
+        """
+
+        start, stop = np.datetime64(start, "D"), np.datetime64(stop, "D")
+        if stop <= start:
+            return np.array([start])
+        days = np.arange(start+1, stop, dtype="datetime64[D]")
+        return np.concatenate([[start], days[self.is_business_day(days)][every-1::every], [stop]])
+
+    def year_fractions(self, dates: npt.ArrayLike, origin: Optional[DateLike] = None) -> npt.NDArray[np.float64]:
+        """
+        Business days from origin to each date over days_per_year, usable directly as solver times.
+        An origin off the calendar (e.g. an observation on a holiday) counts as one business day itself.
+
+        Args:
+            dates (npt.ArrayLike): Dates, e.g. a grid or DataLoader.date_index.
+            origin (Optional[DateLike]): Time zero, the first date if None.
+
+        Returns:
+            npt.NDArray[np.float64]: Time in years of each date.
+        """
+
+        dates = np.asarray(dates, dtype="datetime64[D]")
+        origin = dates[0] if origin is None else np.datetime64(origin, "D")
+        days = np.busday_count(origin, dates, busdaycal=self._calendar)
+        if not self.is_business_day(origin):
+            days += dates > origin
+        return days/self.days_per_year
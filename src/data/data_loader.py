@@ -1,17 +1,28 @@
-from typing import Union
+import os
+import json
+import hashlib
+import logging
+from typing import Optional, Union
 from pathlib import Path
 import pandas as pd
 import numpy as np
 import numpy.typing as npt
 
+
+log = logging.getLogger(__name__)
+
 class DataLoader:
     """
     A class to load and process bond rates from a CSV file.
 
+    The parsed CSV is cached next to it as a binary, column-major rates matrix plus a sorted int64 date index.
+    Later loads memory-map the cache instead of parsing the CSV, it is rebuilt when the file changes.
+
     Attributes:
-        data (pd.DataFrame): The internal DataFrame storing the raw and processed data.
-        date_index(npt.NDArray[np.datetime64]): Dates (row keys).
+        rates (npt.NDArray[np.float64]): Rates matrix (dates x maturities), column-major and memory-mapped when cached.
+        date_index(npt.NDArray[np.datetime64]): Dates (row keys), sorted.
         maturity_index(npt.NDArray[np.int_]): maturities (column keys).
+        data (pd.DataFrame): The data as a DataFrame, built on first access.
 
     Methods:
         get_date(date: np.datetime64) -> npt.NDArray[np.float64]:
@@ -21,12 +32,18 @@ class DataLoader:
             Returns the column of rates data for the given index.
     """
 
-    def __init__(self, file_path: str):
+    RATES_FILE = "rates.npy"
+    DATES_FILE = "dates.npy"
+    META_FILE = "meta.json"
+
+    def __init__(self, file_path: str, cache: bool = True, cache_dir: Optional[str] = None):
         """
         Initializes the DataLoader instance and loads data from the given CSV file.
 
         Args:
             file_path (str): The path to the CSV file containing the data.
+            cache (bool): Whether to read and write the binary cache (default is True).
+            cache_dir (Optional[str]): Cache location, defaults to .<file name>.cache next to the CSV.
 
         Raises:
             FileNotFoundError: If the file does not exist.
@@ -36,13 +53,98 @@ class DataLoader:
         file_path = Path(file_path)
         if not file_path.exists():
             raise FileNotFoundError(f"File not found: {file_path}")
-        
-        self.data = pd.read_csv(file_path)
-        self.data['Date'] = pd.to_datetime(self.data['Date'])
-        self.data = self.data.sort_values(by='Date')
-        self.data = self.data.reset_index(drop=True)
-        self.date_index = self.data['Date'].to_numpy()
-        self.maturity_index = np.arange(1, len(self.data.columns))
+        self.file_path = file_path
+        self.cache_dir = Path(cache_dir) if cache_dir is not None else file_path.parent / f".{file_path.name}.cache"
+        self._data = None
+
+        loaded = self._load_cache() if cache else None
+        if loaded is None:
+            loaded = self._parse_csv()
+            if cache:
+                self._write_cache(*loaded)
+        self.rates, dates, self.columns = loaded
+
+        self._dates = dates
+        self.date_index = dates.view("datetime64[ns]")
+        self.maturity_index = np.arange(1, self.rates.shape[1]+1)
+
+    @property
+    def data(self) -> pd.DataFrame:
+        if self._data is None:
+            self._data = pd.DataFrame(np.asarray(self.rates), columns=self.columns)
+            self._data.insert(0, "Date", self.date_index)
+        return self._data
+
+    def _parse_csv(self) -> tuple[npt.NDArray[np.float64], npt.NDArray[np.int64], list[str]]:
+        """
+        Parses the CSV and sorts it by date.
+        """
+
+        data = pd.read_csv(self.file_path)
+        dates = pd.to_datetime(data.pop("Date")).to_numpy().astype("datetime64[ns]").view(np.int64)
+        order = np.argsort(dates, kind="stable")
+        try:
+            rates = np.asfortranarray(data.to_numpy(dtype=np.float64)[order])
+        except ValueError as e:
+            raise ValueError(f"Invalid data in {self.file_path}: {e}") from e
+        return rates, dates[order], [str(c) for c in data.columns]
+
+    def _fingerprint(self) -> dict:
+        stat = self.file_path.stat()
+        return {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size}
+
+    def _hash(self) -> str:
+        digest = hashlib.sha256()
+        with open(self.file_path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+        return digest.hexdigest()
+
+    def _load_cache(self) -> Optional[tuple[npt.NDArray[np.float64], npt.NDArray[np.int64], list[str]]]:
+        """
+        Memory-maps the cache if it matches the CSV, by mtime and size or, failing that, by content hash.
+        """
+
+        meta_path = self.cache_dir / self.META_FILE
+        try:
+            with open(meta_path) as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        fingerprint = self._fingerprint()
+        if any(meta.get(k) != v for k, v in fingerprint.items()):
+            if meta.get("size") != fingerprint["size"] or meta.get("sha256") != self._hash():
+                log.info(f"Data cache {self.cache_dir} is stale.")
+                return None
+            # Touched but unchanged, refresh the fingerprint
+            meta.update(fingerprint)
+            self._write_meta(meta)
+
+        try:
+            rates = np.load(self.cache_dir / self.RATES_FILE, mmap_mode="r")
+            dates = np.load(self.cache_dir / self.DATES_FILE)
+        except (OSError, ValueError):
+            return None
+        return rates, dates, meta["columns"]
+
+    def _write_cache(self, rates: npt.NDArray[np.float64], dates: npt.NDArray[np.int64], columns: list[str]):
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            for name, arr in ((self.RATES_FILE, rates), (self.DATES_FILE, dates)):
+                tmp = self.cache_dir / f"{name}.tmp"
+                with open(tmp, "wb") as f:
+                    np.save(f, arr)
+                os.replace(tmp, self.cache_dir / name)
+            self._write_meta({**self._fingerprint(), "sha256": self._hash(), "columns": columns})
+        except OSError as e:
+            log.warning(f"Could not write data cache {self.cache_dir}: {e}")
+
+    def _write_meta(self, meta: dict):
+        tmp = self.cache_dir / f"{self.META_FILE}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(meta, f)
+        os.replace(tmp, self.cache_dir / self.META_FILE)
 
     def get_date(self, date: np.datetime64) -> npt.NDArray[np.float64]:
         """
@@ -58,14 +160,15 @@ class DataLoader:
             KeyError: If the date is not found in the data.
         """
 
-        row = self.data.loc[self.data['Date'] == date]
-        if row.empty:
+        key = np.datetime64(date, "ns").view(np.int64)
+        i = np.searchsorted(self._dates, key)
+        if i == len(self._dates) or self._dates[i] != key:
             raise KeyError(f"Date {date} not found in the data.")
-        return row.iloc[0, 1:].to_numpy()
+        return self.rates[i]
 
     def get_maturity(self, months: int) -> npt.NDArray[np.float64]:
         """
-        Returns the column of rates data for the given index.
+        Returns the column of rates data for the given index, as a view.
 
         Args:
             months (int): Maturity months.
@@ -79,5 +182,4 @@ class DataLoader:
 
         if months not in self.maturity_index:
             raise IndexError(f"maturity index {months} is out of bounds.")
-        return self.data.iloc[:, months].to_numpy()
-
+        return self.rates[:, months-1]
@@ -0,0 +1,198 @@
+import os
+import sys
+import json
+import time
+import logging
+import resource
+from datetime import datetime
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Iterator
+
+if TYPE_CHECKING:
+    from omegaconf import DictConfig
+
+
+log = logging.getLogger(__name__)
+
+PROFILERS = (None, "cprofile", "pyinstrument")
+
+# Report of the current run, stages outside a run are timed and logged only
+_active = {"report": None, "progress_interval": 10.0}
+
+def _max_rss_mb() -> float:
+    # ru_maxrss is in KiB on Linux, bytes on macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss/2**20 if sys.platform == "darwin" else rss/2**10
+
+class Stage:
+    """
+    Measurements of one stage of a run.
+
+    CPU time and memory are those of the main process, worker processes are not included.
+
+    Attributes:
+        name (str): Stage name.
+        wall_s (float): Wall-clock time.
+        cpu_s (float): CPU time of the process (all threads).
+        max_rss_mb (float): Peak resident memory of the process at the end of the stage.
+        rss_growth_mb (float): Increase of the peak during the stage.
+        chains (Optional[int]): Chains simulated, set by the stage's code.
+        steps (Optional[int]): Chain-steps simulated, set by the stage's code.
+
+    Methods:
+        to_dict() -> dict:
+            Measurements with chains/sec and steps/sec where chains and steps are set.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.wall_s = 0.0
+        self.cpu_s = 0.0
+        self.max_rss_mb = 0.0
+        self.rss_growth_mb = 0.0
+        self.chains = None
+        self.steps = None
+
+    def to_dict(self) -> dict:
+        out = {
+            "name": self.name,
+            "wall_s": self.wall_s,
+            "cpu_s": self.cpu_s,
+            "max_rss_mb": self.max_rss_mb,
+            "rss_growth_mb": self.rss_growth_mb,
+        }
+        for key in ("chains", "steps"):
+            value = getattr(self, key)
+            if value is not None:
+                out[key] = value
+                out[f"{key}_per_s"] = value/self.wall_s if self.wall_s > 0 else None
+        return out
+
+@contextmanager
+def stage(name: str) -> Iterator[Stage]:
+    """
+    Times the enclosed code as one stage of the active run report.
+
+    Args:
+        name (str): Stage name, e.g. "calibration" or "forecast simulation".
+
+    Yields:
+        Stage: The stage, so the code can record the chains and steps it simulated.
+    """
+
+    record = Stage(name)
+    rss = _max_rss_mb()
+    wall, cpu = time.perf_counter(), time.process_time()
+    try:
+        yield record
+    finally:
+        record.wall_s = time.perf_counter()-wall
+        record.cpu_s = time.process_time()-cpu
+        record.max_rss_mb = _max_rss_mb()
+        record.rss_growth_mb = record.max_rss_mb-rss
+        log.info(f"{name}: {record.wall_s:.3f} s wall, {record.cpu_s:.3f} s CPU, peak memory {record.max_rss_mb:.0f} MB.")
+        if _active["report"] is not None:
+            _active["report"].append(record)
+
+class Progress:
+    """
+    One progress counter for a whole run, logged at most every interval seconds (and when complete),
+    instead of a bar per chain. The interval is sim.progress_interval of the active run.
+
+    Attributes:
+        total (int): Number of units expected.
+        done (int): Number of units completed.
+        unit (str): Name of a unit.
+        interval (float): Minimum number of seconds between log lines, never logs if None.
+
+    Methods:
+        update(n: int):
+            Adds n completed units.
+    """
+
+    def __init__(self, total: int, unit: str = "chains"):
+        self.total = total
+        self.done = 0
+        self.unit = unit
+        self.interval = _active["progress_interval"]
+        self._started = self._logged = time.monotonic()
+
+    def update(self, n: int):
+        self.done += n
+        if self.interval is None:
+            return
+        now = time.monotonic()
+        if now-self._logged >= self.interval or (self.done >= self.total and now > self._started):
+            self._logged = now
+            rate = self.done/max(now-self._started, 1e-9)
+            log.info(f"{self.done}/{self.total} {self.unit} ({100*self.done/max(self.total, 1):.0f}%), {rate:.0f} {self.unit}/s.")
+
+def output_dir() -> str:
+    """
+    Returns:
+        str: The Hydra output directory of the run, OUTPUT_DIR outside Hydra.
+    """
+
+    from hydra.core.hydra_config import HydraConfig
+
+    if HydraConfig.initialized():
+        return HydraConfig.get().runtime.output_dir
+    return os.getenv("OUTPUT_DIR", ".")
+
+@contextmanager
+def run_report(config: "DictConfig"):
+    """
+    Collects the stages of the enclosed run and writes them to run_report.json in the Hydra output directory.
+
+    sim.report False disables the report, sim.profile "cprofile" (profile.prof and profile.txt) or
+    "pyinstrument" (profile.html) profiles the run into the same directory, and sim.progress_interval sets
+    the seconds between progress lines (null for none).
+
+    Raises:
+        ValueError: If sim.profile is unknown.
+    """
+
+    profiler = config.sim.get("profile")
+    if profiler not in PROFILERS:
+        raise ValueError(f"Unknown profiler: {profiler}")
+    report = [] if config.sim.get("report", True) else None
+    _active.update(report=report, progress_interval=config.sim.get("progress_interval", 10.0))
+    started = datetime.now()
+
+    if profiler == "cprofile":
+        import cProfile
+        profile = cProfile.Profile()
+        profile.enable()
+    elif profiler == "pyinstrument":
+        from pyinstrument import Profiler
+        profile = Profiler()
+        profile.start()
+
+    try:
+        with stage("total"):
+            yield
+    finally:
+        directory = output_dir()
+        os.makedirs(directory, exist_ok=True)
+        if profiler == "cprofile":
+            import pstats
+            profile.disable()
+            profile.dump_stats(os.path.join(directory, "profile.prof"))
+            with open(os.path.join(directory, "profile.txt"), "w") as f:
+                pstats.Stats(profile, stream=f).sort_stats("cumulative").print_stats(50)
+        elif profiler == "pyinstrument":
+            profile.stop()
+            with open(os.path.join(directory, "profile.html"), "w") as f:
+                f.write(profile.output_html())
+
+        _active.update(report=None, progress_interval=10.0)
+        if report is not None:
+            file_path = os.path.join(directory, "run_report.json")
+            with open(file_path, "w") as f:
+                json.dump({
+                    "started": started.isoformat(timespec="seconds"),
+                    "run_func": config.sim.run_func._target_,
+                    "profile": profiler,
+                    "stages": [s.to_dict() for s in report],
+                }, f, indent=2)
+            log.info(f"Run report saved to {file_path}")
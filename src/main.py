@@ -6,10 +6,13 @@ from omegaconf import DictConfig
 import hydra
 from hydra.utils import call
 
+from instrumentation import run_report
+
 
 @hydra.main(version_base = None, config_path = "../config", config_name = "config")
 def main(config: DictConfig):
-    call(config.sim.run_func, config)
+    with run_report(config):
+        call(config.sim.run_func, config)
 
 if __name__ == "__main__":
     warnings.filterwarnings("ignore")
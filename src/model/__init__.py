@@ -1,4 +1,6 @@
 from .ir_model import IRModel
 from .vasicek import Vasicek
 from .cir import CIR
-from .black_karasinski import BlackKarasinski
\ No newline at end of file
+from .black_karasinski import BlackKarasinski
+from .rolling import RollingCalibrator
+from .calibration_cache import CalibrationCache
\ No newline at end of file
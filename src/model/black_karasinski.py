@@ -1,9 +1,69 @@
+from typing import Optional
+
 import numpy as np
 import numpy.typing as npt
-from scipy.optimize import minimize
 
 from .ir_model import IRModel
-from solver import EulerMaruyama
+from .calibration_cache import cached_calibration
+
+
+# Steps per block of _linear_recurrence
+BLOCK = 64
+
+def _linear_recurrence(c: npt.NDArray[np.float64], d: npt.NDArray[np.float64], y0: float) -> npt.NDArray[np.float64]:
+    """
+    Evaluates y[0] = y0, y[i+1] = c[i]*y[i] + d[i] without a per-step loop. Every block of BLOCK steps is solved from a
+    zero start with cumulative products P of c, y[i+1] = P[i]*sum of d[j]/P[j] over j <= i, or by a product with the
+    matrix of partial products of c when some P vanishes or leaves the float range. The block starts follow the same
+    recurrence over blocks, solved recursively.
+    """
+
+    n = len(c)
+    if n == 0:
+        return np.array([y0], dtype=np.float64)
+    B = min(n, BLOCK)
+    blocks = -(-n//B)
+    C = np.ones(blocks*B)
+    D = np.zeros(blocks*B)
+    C[:n], D[:n] = c, d
+    C, D = C.reshape(blocks, B), D.reshape(blocks, B)
+
+    gain = np.cumprod(C, axis=1)
+    size = np.abs(gain)
+    if np.all((size > 1e-280) & (size < 1e280)):
+        response = gain*np.cumsum(D/gain, axis=1)
+    else:
+        # G[b, i, j] = c[j+1]*...*c[i] for j <= i, the weight of d[j] in y[i+1] within block b
+        rows, cols = np.arange(B)[:, None], np.arange(B)
+        G = np.cumprod(np.where(rows > cols, C[:, :, None], 1.0), axis=1)*(rows >= cols)
+        response = np.einsum("bij,bj->bi", G, D)
+
+    starts = np.array([y0], dtype=np.float64) if blocks == 1 else _linear_recurrence(gain[:, -1], response[:, -1], y0)[:-1]
+    y = gain*starts[:, None] + response
+    return np.concatenate([[y0], y.ravel()[:n]])
+
+def _path_loss(x: npt.NDArray[np.float64], rates: npt.NDArray[np.float64], dW: npt.NDArray[np.float64], k: npt.NDArray[np.int64], dt: float) -> tuple[float, npt.NDArray[np.float64]]:
+    """
+    Squared error of the Euler-Maruyama path driven by dW against the rates, and its gradient with respect to
+    x = (theta, phi, sigma) buckets, from one forward (path) and one backward (adjoint) pass.
+    Step i uses bucket k[i].
+    """
+
+    K = len(x)//3
+    theta, phi, sigma = x[:K][k], x[K:2*K][k], x[2*K:][k]
+
+    c = 1-phi*dt
+    Y = _linear_recurrence(c, theta*dt + sigma*dW, rates[0])
+    residuals = Y-rates
+
+    # Adjoint: lam[i] = dL/dY[i+1]
+    lam = _linear_recurrence(c[:0:-1], 2*residuals[-2:0:-1], 2*residuals[-1])[::-1]
+    grad = np.concatenate([
+        np.bincount(k, lam*dt, minlength=K),
+        np.bincount(k, -lam*Y[:-1]*dt, minlength=K),
+        np.bincount(k, lam*dW, minlength=K)
+    ])
+    return np.sum(residuals**2), grad
 
 class BlackKarasinski(IRModel):
     """
@@ -14,9 +74,11 @@ class BlackKarasinski(IRModel):
         phi (list[float]): Mean reversion speed parameters.
         sigma (list[float]): Volatility parameters.
         r0 (float): Initial interest rate.
+        horizon (float): Time spanned by the parameter buckets, t beyond it uses the last bucket.
+        theta, phi, sigma and r0 may carry a leading axis of one value per parameter set of a batch (see IRModel.scenarios).
 
     Methods:
-        __init__(self, theta: list[float], phi: list[float], sigma: list[float], r0: float):
+        __init__(self, theta: list[float], phi: list[float], sigma: list[float], r0: float, horizon: float = 1.0):
             Initializes the Black-Karasinski model with given parameters.
         a(self, Y_prev: float, t: float) -> float:
             Drift term of the model.
@@ -24,50 +86,116 @@ class BlackKarasinski(IRModel):
             Initial value of the interest rate.
         differentiable(self) -> bool:
             Indicates if the model is differentiable.
+        vectorized(self) -> bool:
+            Indicates if a and b accept arrays of rates.
         b(self, Y_prev: float, t: float) -> float:
             Diffusion term of the model.
-        calibrate(self, rates: npt.NDArray[np.float64], maxiter: int = 10):
+        a_vec, b_vec, b_prime_vec:
+            Array versions of a, b and db/dY.
+        derivatives(self, Y_prev: npt.NDArray[np.float64], t: float) -> dict[str, npt.NDArray[np.float64]]:
+            Derivatives of a, b and b*db/dY for pathwise sensitivities, parallel shifts of the buckets.
+        calibrate(self, rates: npt.NDArray[np.float64], maxiter: int = 10, buckets: Optional[int] = None, seed: int = 1, method: str = "L-BFGS-B", dt: Optional[float] = None):
             Calibrates the model parameters to fit the given interest rate data.
     """
-    
 
-    def __init__(self, theta: list[float], phi: list[float], sigma: list[float], r0: float):
+    PARAMS = ("theta", "phi", "sigma", "r0", "horizon")
+    PARAM_NDIM = {"theta": 1, "phi": 1, "sigma": 1, "r0": 0}
+
+    def __init__(self, theta: list[float], phi: list[float], sigma: list[float], r0: float, horizon: float = 1.0):
         super().__init__()
         self.theta = theta
         self.phi = phi
         self.sigma = sigma
         self.r0 = r0
+        self.horizon = horizon
+
+    def _bucket(self, t: npt.ArrayLike, K: int) -> npt.NDArray[np.int64]:
+        # t = i*dt accumulates rounding error, which must not push a step on a bucket edge into the previous bucket
+        return np.minimum(np.floor(np.asarray(t)/self.horizon*K + 1e-9), K-1).astype(np.int64)
+
+    def _at(self, name: str, t: npt.ArrayLike) -> npt.ArrayLike:
+        # Buckets are the last axis, batches lead
+        value = np.asarray(self.param(name))
+        return value[..., self._bucket(t, value.shape[-1])]
 
     def a(self, Y_prev: float, t: float) -> float:
-        return self.theta[int(t*len(self.theta))]-self.phi[int(t*len(self.phi))]*Y_prev
+        return self._at("theta", t)-self._at("phi", t)*Y_prev
 
     def Y0(self) -> float:
         return self.r0
 
     def differentiable(self) -> bool:
-        return False
+        return True
+
+    def vectorized(self) -> bool:
+        return True
+
+    def pathwise(self) -> bool:
+        return True
 
     def b(self, Y_prev: float, t: float) -> float:
-        return self.sigma[int(t*len(self.sigma))]
+        return self._at("sigma", t)
+
+    def a_vec(self, Y_prev: npt.NDArray[np.float64], t: float) -> npt.NDArray[np.float64]:
+        return self.a(Y_prev, t)
+
+    def b_vec(self, Y_prev: npt.NDArray[np.float64], t: float) -> npt.NDArray[np.float64]:
+        # t may hold one time per chain (adaptive steps)
+        return np.broadcast_to(self.b(Y_prev, t), np.shape(Y_prev)).astype(np.float64)
 
-    def calibrate(self, rates: npt.NDArray[np.float64], maxiter: int = 10):
+    def b_prime_vec(self, Y_prev: npt.NDArray[np.float64], t: float) -> npt.NDArray[np.float64]:
+        return np.zeros_like(Y_prev, dtype=np.float64)
+
+    def derivatives(self, Y_prev: npt.NDArray[np.float64], t: float) -> dict[str, npt.NDArray[np.float64]]:
+        """
+        With respect to a shift of all buckets of (theta, phi, sigma) and r0: da = (1, -Y, 0, 0), db = (0, 0, 1, 0).
+        """
+
+        zero = np.zeros_like(Y_prev, dtype=np.float64)
+        return {
+            "a_y": zero-self._at("phi", t),
+            "b_y": zero,
+            "m_y": zero,
+            "a_p": self._stack(Y_prev, 1.0, -Y_prev, 0.0, 0.0),
+            "b_p": self._stack(Y_prev, 0.0, 0.0, 1.0, 0.0),
+            "m_p": self._stack(Y_prev, 0.0, 0.0, 0.0, 0.0),
+        }
+
+    @cached_calibration
+    def calibrate(self, rates: npt.NDArray[np.float64], maxiter: int = 10, buckets: Optional[int] = None, seed: int = 1, method: str = "L-BFGS-B", dt: Optional[float] = None):
+        """
+        Least-squares fit of an Euler-Maruyama path, driven by a fixed noise path, to the rates.
+        Loss and its exact gradient are computed in one forward (path) and one backward (adjoint) pass,
+        so the optimizer never falls back to finite differences.
+
+        Args:
+            rates (npt.NDArray[np.float64]): Rates for a single instrument over time.
+            maxiter (int): Maximum number of optimizer iterations.
+            buckets (Optional[int]): Number of piecewise-constant parameter buckets, one per observation if None.
+            seed (int): Seed of the fixed noise path.
+            method (str): scipy.optimize.minimize method, must use the gradient.
+            dt (Optional[float]): Time between consecutive rates (e.g. BusinessCalendar.dt in years), 1/len(rates) if None.
+        """
+
+        from scipy.optimize import minimize
+
+        rates = np.asarray(rates, dtype=np.float64)
         N = len(rates)
-        dt = 1/N
+        dt = 1/N if dt is None else dt
+        K = N if buckets is None else buckets
 
         self.r0 = rates[0]
+        self.horizon = N*dt
+
+        dW = np.random.default_rng(seed=seed).normal(loc=0.0, scale=np.sqrt(dt), size=N-1)
+        # Bucket of each step, the one _bucket gives a and b at t = i*dt
+        k = (np.arange(N-1)*K)//N
 
-        def loss(x, r0, rates, N):
-            theta, phi, sigma = x[:N], x[N:2*N], x[2*N:]
-            bk = BlackKarasinski(theta, phi, sigma, r0)
-            solver = EulerMaruyama(bk.a, bk.b, 0, N-1, 1, 1, r0)
-            Y = solver.run()
-            return np.sum((Y - rates)**2)
-        
-        theta0 = np.ones(N) * 0.05
-        phi0 = np.ones(N) * 0.3
-        sigma0 = np.ones(N) * 0.1
+        theta0 = np.ones(K) * 0.05
+        phi0 = np.ones(K) * 0.3
+        sigma0 = np.ones(K) * 0.1
         x0 = np.concatenate([theta0, phi0, sigma0])
 
-        res = minimize(loss, x0, args=(self.r0, rates, N), options={'maxiter':maxiter})
-        self.theta, self.phi, self.sigma = res.x[:N], res.x[N:2*N], res.x[2*N:]
- 
\ No newline at end of file
+        res = minimize(_path_loss, x0, args=(rates, dW, k, dt), jac=True, method=method, options={'maxiter':maxiter})
+        self.theta, self.phi, self.sigma = res.x[:K], res.x[K:2*K], res.x[2*K:]
+        self.calibration_diagnostics = {"loss": float(res.fun), "iterations": int(res.nit), "success": bool(res.success)}
@@ -0,0 +1,135 @@
+import os
+import json
+import time
+import inspect
+import hashlib
+import logging
+import functools
+from typing import Any, Callable, Optional
+from pathlib import Path
+
+import numpy as np
+import numpy.typing as npt
+
+
+log = logging.getLogger(__name__)
+
+class CalibrationCache:
+    """
+    Persistent cache of calibration results, one JSON file per entry.
+    The key hashes the rates slice, the model class, the calibration options and a fixed context
+    (settings that affect calibration but are not arguments, e.g. solver options of a simulation-based fit).
+    Entries hold the fitted parameters plus diagnostics. The least recently used entries are evicted
+    once the cache exceeds max_entries or max_bytes (recency is the file modification time, bumped on every hit).
+
+    Attributes:
+        cache_dir (Path): Directory of the entries.
+        max_entries (int): Maximum number of entries.
+        max_bytes (int): Maximum total size of the entries.
+        context (dict): Settings mixed into every key.
+
+    Methods:
+        key(model_cls: type, rates: npt.ArrayLike, options: dict) -> str:
+            Key of a calibration.
+        get(key: str) -> Optional[dict]:
+            Entry for the key, or None.
+        put(key: str, params: dict, diagnostics: dict):
+            Stores an entry and evicts the least recently used ones over the limits.
+    """
+
+    VERSION = 1
+
+    def __init__(self, cache_dir: str, max_entries: int = 1024, max_bytes: int = 64*2**20, context: Optional[dict] = None):
+        self.cache_dir = Path(cache_dir)
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.context = dict(context or {})
+
+    def key(self, model_cls: type, rates: npt.ArrayLike, options: dict) -> str:
+        rates = np.ascontiguousarray(rates, dtype=np.float64)
+        digest = hashlib.sha256()
+        digest.update(json.dumps({
+            "version": self.VERSION,
+            "model": f"{model_cls.__module__}.{model_cls.__qualname__}",
+            "shape": rates.shape,
+            "options": options,
+            "context": self.context,
+        }, sort_keys=True, default=str).encode())
+        digest.update(rates.tobytes())
+        return digest.hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.json"
+
+    def get(self, key: str) -> Optional[dict]:
+        path = self._path(key)
+        try:
+            with open(path) as f:
+                entry = json.load(f)
+            os.utime(path)
+        except (OSError, ValueError):
+            return None
+        return entry
+
+    def put(self, key: str, params: dict, diagnostics: dict):
+        entry = {"params": params, "diagnostics": diagnostics, "created": time.time()}
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            tmp = self._path(key).with_suffix(f".{os.getpid()}.tmp")
+            with open(tmp, "w") as f:
+                json.dump(entry, f, default=float)
+            os.replace(tmp, self._path(key))
+            self._evict()
+        except OSError as e:
+            log.warning(f"Could not write calibration cache entry: {e}")
+
+    def _evict(self):
+        entries = []
+        for path in self.cache_dir.glob("*.json"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        entries.sort()
+        total = sum(size for _, size, _ in entries)
+        while entries and (len(entries) > self.max_entries or total > self.max_bytes):
+            _, size, path = entries.pop(0)
+            total -= size
+            path.unlink(missing_ok=True)
+
+def cached_calibration(calibrate: Callable) -> Callable:
+    """
+    Decorates a model's calibrate(rates, ...) so it reads and writes the model's calibration_cache, if any.
+    Options are bound to calibrate's signature with defaults applied before hashing, so positional and keyword
+    calls share an entry. On a hit the stored parameters and diagnostics are set and calibration is skipped.
+    """
+
+    signature = inspect.signature(calibrate)
+
+    @functools.wraps(calibrate)
+    def wrapper(self, rates: npt.NDArray[np.float64], *args: Any, **kwargs: Any):
+        cache = self.calibration_cache
+        if cache is None:
+            return calibrate(self, rates, *args, **kwargs)
+
+        bound = signature.bind(self, rates, *args, **kwargs)
+        bound.apply_defaults()
+        options = dict(list(bound.arguments.items())[2:])
+        key = cache.key(type(self), rates, options)
+        entry = cache.get(key)
+        if entry is not None:
+            self.set_params(entry["params"])
+            self.calibration_diagnostics = entry["diagnostics"]
+            log.info(f"Calibration of {type(self).__name__} loaded from cache.")
+            return
+
+        started = time.perf_counter()
+        calibrate(*bound.args, **bound.kwargs)
+        self.calibration_diagnostics = {
+            **self.calibration_diagnostics,
+            "seconds": time.perf_counter()-started,
+            "observations": len(rates),
+        }
+        cache.put(key, self.get_params(), self.calibration_diagnostics)
+    return wrapper
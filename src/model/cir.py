@@ -1,9 +1,10 @@
+from typing import Optional
+
 import numpy as np
 import numpy.typing as npt
-from sklearn.linear_model import LinearRegression
-from sympy import sqrt
 
 from .ir_model import IRModel
+from .calibration_cache import cached_calibration
 
 
 class CIR(IRModel):
@@ -16,6 +17,7 @@ class CIR(IRModel):
         alpha (float): Speed of reversion to the mean.
         sigma (float): Volatility parameter.
         r0 (float): Initial interest rate.
+        Any of them may be an array of one value per parameter set of a batch (see IRModel.scenarios).
 
     Methods:
         __init__(theta: float, alpha: float, sigma: float, r0: float):
@@ -29,11 +31,29 @@ class CIR(IRModel):
 
         b(Y_prev: float, t: float) -> float:
             Computes the diffusion term of the CIR model.
+
+        a_vec, b_vec, b_prime_vec:
+            Array versions of a, b and db/dY.
+
+        derivatives(Y_prev: npt.NDArray[np.float64], t: float) -> dict[str, npt.NDArray[np.float64]]:
+            Derivatives of a, b and b*db/dY for pathwise sensitivities.
+
+        transition(Y_prev: npt.NDArray[np.float64], t: float, dt: float, rng: np.random.Generator) -> npt.NDArray[np.float64]:
+            Samples the scaled noncentral chi-square transition density.
+
+        bond_price(T: npt.ArrayLike, r: Optional[float] = None, rate_scale: float = 1.0, time_unit: float = 1.0) -> npt.NDArray[np.float64]:
+            Closed-form zero-coupon bond prices.
             
         calibrate(rates: npt.NDArray[np.float64]):
             Calibrates the CIR model parameters using historical interest rate data.
+
+        sufficient_statistics, params_from_statistics:
+            Regression calibration from additive pair statistics, used by fit, rolling_calibrate and RollingCalibrator.
     """
 
+    PARAMS = ("theta", "alpha", "sigma", "r0")
+    PARAM_NDIM = {"theta": 0, "alpha": 0, "sigma": 0, "r0": 0}
+
     def __init__(self, theta: float, alpha: float, sigma: float, r0: float):
         super().__init__()
         self.theta = theta
@@ -58,45 +78,139 @@ class CIR(IRModel):
     def differentiable(self) -> bool:
         return True
 
+    def vectorized(self) -> bool:
+        return True
+
+    def exact(self) -> bool:
+        return True
+
+    def closed_form(self) -> bool:
+        return True
+
+    def pathwise(self) -> bool:
+        return True
+
     def b(self, Y_prev: float, t: float) -> float:
         """
         Computes the diffusion term of the CIR model.
+        Negative rates (possible under discretisation) are truncated to zero.
         """
 
-        return self.sigma*sqrt(Y_prev)
+        return self.sigma*np.sqrt(max(Y_prev, 0.0))
+
+    def a_vec(self, Y_prev: npt.NDArray[np.float64], t: float) -> npt.NDArray[np.float64]:
+        return self.param("theta")-self.param("alpha")*Y_prev
+
+    def b_vec(self, Y_prev: npt.NDArray[np.float64], t: float) -> npt.NDArray[np.float64]:
+        return self.param("sigma")*np.sqrt(np.maximum(Y_prev, 0.0))
 
-    def calibrate(self, rates: npt.NDArray[np.float64]):
+    def b_prime_vec(self, Y_prev: npt.NDArray[np.float64], t: float) -> npt.NDArray[np.float64]:
+        sqrt_y = np.sqrt(np.maximum(Y_prev, 0.0))
+        return np.divide(0.5*self.param("sigma"), sqrt_y, out=np.zeros_like(sqrt_y), where=sqrt_y > 0)
+
+    def derivatives(self, Y_prev: npt.NDArray[np.float64], t: float) -> dict[str, npt.NDArray[np.float64]]:
         """
-        Calibrates the CIR model parameters using historical interest rate data via Linear Regression.
+        With respect to (theta, alpha, sigma, r0): da = (1, -Y, 0, 0), db = (0, 0, sqrt(Y), 0) and, as
+        b*db/dY = sigma^2/2 for Y > 0, d(b*db/dY) = (0, 0, sigma, 0) there. Truncated rates (Y <= 0) have zero derivatives.
+        """
+
+        positive = np.asarray(Y_prev) > 0
+        zero = np.zeros_like(Y_prev, dtype=np.float64)
+        return {
+            "a_y": zero-self.param("alpha"),
+            "b_y": self.b_prime_vec(Y_prev, t),
+            "m_y": zero,
+            "a_p": self._stack(Y_prev, 1.0, -Y_prev, 0.0, 0.0),
+            "b_p": self._stack(Y_prev, 0.0, 0.0, np.sqrt(np.maximum(Y_prev, 0.0)), 0.0),
+            "m_p": self._stack(Y_prev, 0.0, 0.0, np.where(positive, self.param("sigma"), 0.0), 0.0),
+        }
+
+    def transition(self, Y_prev: npt.NDArray[np.float64], t: float, dt: float, rng: np.random.Generator) -> npt.NDArray[np.float64]:
+        """
+        Samples Y(t+dt) | Y(t) ~ c*X, X noncentral chi-square with
+            c = sigma^2*(1-exp(-alpha*dt))/(4*alpha)
+            df = 4*theta/sigma^2
+            nonc = Y(t)*exp(-alpha*dt)/c
+        Draws of different parameter sets of a batch are independent, the chi-square has no common random numbers.
+        """
+
+        theta, alpha, sigma = self.param("theta"), self.param("alpha"), self.param("sigma")
+        c = sigma**2*(-np.expm1(-alpha*dt))/(4*alpha)
+        df = 4*theta/sigma**2
+        nonc = np.maximum(Y_prev, 0.0)*np.exp(-alpha*dt)/c
+        return c*rng.noncentral_chisquare(df, nonc)
+
+    def bond_price(self, T: npt.ArrayLike, r: Optional[float] = None, rate_scale: float = 1.0, time_unit: float = 1.0) -> npt.NDArray[np.float64]:
+        """
+        CIR zero-coupon bond price P(T) = A(T)*exp(-B(T)*r) with h = sqrt(alpha^2 + 2*sigma^2):
+            B = 2*(exp(h*T)-1) / (2*h + (alpha+h)*(exp(h*T)-1))
+            A = (2*h*exp((alpha+h)*T/2) / (2*h + (alpha+h)*(exp(h*T)-1)))^(2*theta/sigma^2)
+        Rates and theta are scaled to decimals by rate_scale, sigma by its square root,
+        and theta, alpha and sigma^2 to the time of T by time_unit. A batch of parameter sets gives one row of prices per set.
         """
 
-        N = len(rates)
-        dt = 1/N
+        T = np.asarray(T, dtype=np.float64)
+        r = (self.param("r0") if r is None else r)*rate_scale
+        alpha = self.param("alpha")/time_unit
+        theta = self.param("theta")*rate_scale/time_unit
+        sigma2 = self.param("sigma")**2*rate_scale/time_unit
+        h = np.sqrt(alpha**2 + 2*sigma2)
+        growth = np.expm1(h*T)
+        denom = 2*h + (alpha+h)*growth
+        B = 2*growth/denom
+        log_A = 2*theta/sigma2*(np.log(2*h/denom) + (alpha+h)*T/2)
+        return np.exp(log_A-B*r)
+
+    @cached_calibration
+    def calibrate(self, rates: npt.NDArray[np.float64], dt: Optional[float] = None):
+        """
+        Calibrates the CIR model parameters using historical interest rate data via Linear Regression.
 
-        rs = rates[:N - 1]  
-        rt = rates[1:N]
-        
-        model = LinearRegression()
+        Args:
+            rates (npt.NDArray[np.float64]): Rates for a single instrument over time.
+            dt (Optional[float]): Time between consecutive rates (e.g. BusinessCalendar.dt in years), 1/len(rates) if None.
+        """
 
-        y = (rt - rs) / np.sqrt(rs)
-        z1 = dt / np.sqrt(rs)
-        z2 = dt * np.sqrt(rs)
-        X = np.column_stack((z1, z2))
+        params = self.fit(rates, dt)
+        for name in self.PARAMS:
+            setattr(self, name, float(params[name][0]))
 
-        model = LinearRegression(fit_intercept=False)
-        model.fit(X, y)
+    @classmethod
+    def sufficient_statistics(cls, x: npt.NDArray[np.float64], y: npt.NDArray[np.float64]) -> npt.NDArray[np.float64]:
+        """
+        Per-pair terms of the regression sums, free of dt so windows of any length can share them:
+        1/r_s, r_s, (r_t-r_s)/r_s, r_t-r_s, (r_t-r_s)/sqrt(r_s), (r_t-r_s)^2/r_s, 1/sqrt(r_s), sqrt(r_s).
+        """
 
-        y_hat = model.predict(X)
-        residuals = y - y_hat
-        beta1 = model.coef_[0]        
-        beta2 = model.coef_[1]
+        sqrt_x = np.sqrt(x)
+        d = y-x
+        return np.stack([1/x, x, d/x, d, d/sqrt_x, d*d/x, 1/sqrt_x, sqrt_x], axis=-1)
 
-        k0 = -beta2
-        theta0 = beta1/k0
-        sigma0 = np.std(residuals)/np.sqrt(dt)
+    @classmethod
+    def params_from_statistics(cls, S: npt.NDArray[np.float64], N: int, r0: npt.ArrayLike, dt: Optional[float] = None) -> dict[str, npt.NDArray[np.float64]]:
+        """
+        Regression calibration
+            (r_t - r_s)/sqrt(r_s) = beta1*dt/sqrt(r_s) + beta2*dt*sqrt(r_s) + eps
+        with no intercept, solved from the 2x2 normal equations. sigma is the (population) standard deviation
+        of the residuals over sqrt(dt).
+        """
 
-        self.theta = k0*theta0
-        self.alpha = k0
-        self.sigma = sigma0
-        self.r0 = rates[0]
- 
+        inv, lin, d_inv, d, y, yy, inv_sqrt, sqrt = np.moveaxis(np.asarray(S, dtype=np.float64), -1, 0)
+        dt = 1/N if dt is None else dt
+        n = N-1
+
+        # Normal equations [[S11, S12], [S12, S22]] beta = [S1y, S2y], z1*z2 = dt^2
+        S11 = dt**2*inv
+        S22 = dt**2*lin
+        S12 = n*dt**2
+        S1y = dt*d_inv
+        S2y = dt*d
+        det = S11*S22 - S12**2
+        beta1 = (S22*S1y - S12*S2y)/det
+        beta2 = (S11*S2y - S12*S1y)/det
+
+        mean_residual = (y - beta1*dt*inv_sqrt - beta2*dt*sqrt)/n
+        mean_square = (yy - beta1*S1y - beta2*S2y)/n
+        sigma0 = np.sqrt(np.maximum(mean_square - mean_residual**2, 0.0))/np.sqrt(dt)
+
+        return {"theta": beta1, "alpha": -beta2, "sigma": sigma0, "r0": np.asarray(r0, dtype=np.float64)}
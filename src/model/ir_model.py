@@ -1,6 +1,12 @@
+import copy
+from typing import TYPE_CHECKING, Optional, Sequence
 from abc import ABCMeta, abstractmethod
 
-import pandas as pd
+import numpy as np
+import numpy.typing as npt
+
+if TYPE_CHECKING:
+    import pandas as pd
 
 
 class IRModel(metaclass=ABCMeta):
@@ -15,16 +21,100 @@ class IRModel(metaclass=ABCMeta):
     b(Y_prev: float, t: float) -> float
         b(Y, t)
 
+    a_vec(Y_prev: npt.NDArray[np.float64], t: float) -> npt.NDArray[np.float64]
+        a(Y, t) evaluated with NumPy ufuncs over an array of states.
+
+    b_vec(Y_prev: npt.NDArray[np.float64], t: float) -> npt.NDArray[np.float64]
+        b(Y, t) evaluated with NumPy ufuncs over an array of states.
+
+    b_prime_vec(Y_prev: npt.NDArray[np.float64], t: float) -> npt.NDArray[np.float64]
+        db/dY evaluated with NumPy ufuncs, needed for Milstein.
+
     Y0() -> float
         Starting point for chain.
 
     differentiable -> bool
         Needed for Milstein.
 
+    vectorized -> bool
+        Whether a and b accept arrays of states, needed for batched chain simulation.
+
+    exact -> bool
+        Whether the transition density is known, needed for ExactSolver.
+
+    transition(Y_prev: npt.NDArray[np.float64], t: float, dt: float, rng: np.random.Generator) -> npt.NDArray[np.float64]
+        Samples Y(t+dt) given Y(t) from the exact transition density.
+
+    closed_form -> bool
+        Whether zero-coupon bond prices are known in closed form.
+
+    bond_price(T: npt.ArrayLike, r: Optional[float] = None, rate_scale: float = 1.0, time_unit: float = 1.0) -> npt.NDArray[np.float64]
+        Closed-form zero-coupon bond prices for maturities T.
+
     calibrate(data: pd.DataFrame)
         Abstract method to calibrate the model using the provided data.
+
+    sufficient_statistics(x: npt.NDArray[np.float64], y: npt.NDArray[np.float64]) -> npt.NDArray[np.float64]
+        Contribution of each consecutive pair (x, y) to the additive calibration statistics.
+
+    params_from_statistics(S: npt.NDArray[np.float64], N: int, r0: npt.ArrayLike, dt: Optional[float] = None) -> dict[str, npt.NDArray[np.float64]]
+        Parameters from summed statistics of a series of N rates dt apart.
+
+    fit(rates: npt.NDArray[np.float64], dt: Optional[float] = None) -> dict[str, npt.NDArray[np.float64]]
+        Calibrates one parameter set per column of a rates matrix in one vectorized call.
+
+    rolling_calibrate(rates: npt.NDArray[np.float64], window: int, index: Optional[Sequence] = None, dt: Optional[float] = None) -> pd.DataFrame
+        Parameter time series of a sliding-window calibration.
+
+    calibrate_batch(rates: npt.NDArray[np.float64], index: Optional[Sequence] = None, dt: Optional[float] = None) -> pd.DataFrame
+        Parameter table with one row per column of rates.
+
+    from_params(params) -> IRModel
+        Model built from one row of a parameter table.
+
+    get_params() -> dict
+        Current parameters, JSON-serializable.
+
+    set_params(params: dict)
+        Sets parameters from get_params() output.
+
+    num_params() -> Optional[int]
+        Number of parameter sets of a batch, None for a single set.
+
+    param(name: str) -> npt.ArrayLike
+        Parameter shaped to broadcast against a (num_params, num_chains) state.
+
+    scenarios(grid: dict[str, Sequence], product: bool = True) -> IRModel
+        Copy of the model holding a batch of parameter sets.
+
+    pathwise -> bool
+        Whether derivatives are available, needed for pathwise sensitivities.
+
+    derivatives(Y_prev: npt.NDArray[np.float64], t: float) -> dict[str, npt.NDArray[np.float64]]
+        Derivatives of a, b and b*db/dY with respect to Y and to each parameter of PARAM_NDIM.
+
+    Y0_derivatives() -> npt.NDArray[np.float64]
+        Derivative of Y0() with respect to each parameter of PARAM_NDIM.
+
+    Attributes:
+    PARAMS (tuple[str, ...])
+        Names of the calibrated parameters.
+
+    PARAM_NDIM (dict[str, int])
+        Parameters that can vary across a batch, with the number of dimensions of one value (1 for bucketed parameters).
+
+    calibration_cache (Optional[CalibrationCache])
+        Persistent cache read and written by calibrate, if set.
+
+    calibration_diagnostics (dict)
+        Diagnostics of the last calibration (e.g. optimizer loss, time taken).
     """
 
+    PARAMS: tuple[str, ...] = ()
+    PARAM_NDIM: dict[str, int] = {}
+    calibration_cache = None
+    calibration_diagnostics: dict = {}
+
     @abstractmethod
     def a(self, Y_prev: float, t: float) -> float:
         pass
@@ -33,6 +123,18 @@ class IRModel(metaclass=ABCMeta):
     def b(self, Y_prev: float, t: float) -> float:
         pass
 
+    @abstractmethod
+    def a_vec(self, Y_prev: npt.NDArray[np.float64], t: float) -> npt.NDArray[np.float64]:
+        pass
+
+    @abstractmethod
+    def b_vec(self, Y_prev: npt.NDArray[np.float64], t: float) -> npt.NDArray[np.float64]:
+        pass
+
+    @abstractmethod
+    def b_prime_vec(self, Y_prev: npt.NDArray[np.float64], t: float) -> npt.NDArray[np.float64]:
+        pass
+
     @abstractmethod
     def Y0(self) -> float:
         pass
@@ -41,7 +143,258 @@ class IRModel(metaclass=ABCMeta):
     def differentiable(self) -> bool:
         pass
 
+    def vectorized(self) -> bool:
+        return False
+
+    def exact(self) -> bool:
+        return False
+
+    def transition(self, Y_prev: npt.NDArray[np.float64], t: float, dt: float, rng: np.random.Generator) -> npt.NDArray[np.float64]:
+        raise NotImplementedError(f"{type(self).__name__} has no exact transition density.")
+
+    def closed_form(self) -> bool:
+        return False
+
+    def pathwise(self) -> bool:
+        return False
+
+    def derivatives(self, Y_prev: npt.NDArray[np.float64], t: float) -> dict[str, npt.NDArray[np.float64]]:
+        """
+        Coefficient derivatives propagating pathwise (tangent) sensitivities. Parameters are those of PARAM_NDIM in
+        order, bucketed parameters are differentiated for a parallel shift of all buckets.
+
+        Args:
+            Y_prev (npt.NDArray[np.float64]): Array of states.
+            t (float): Timestep.
+
+        Returns:
+            dict[str, npt.NDArray[np.float64]]: "a_y", "b_y" and "m_y", the derivatives of a, b and the Milstein
+                product m = b*db/dY with respect to Y, shaped like Y_prev, and "a_p", "b_p" and "m_p", their derivatives
+                with respect to each parameter, shape (len(PARAM_NDIM),) + Y_prev.shape.
+        """
+
+        raise NotImplementedError(f"{type(self).__name__} has no pathwise derivatives.")
+
+    def Y0_derivatives(self) -> npt.NDArray[np.float64]:
+        """
+        Returns:
+            npt.NDArray[np.float64]: dY0/dp for each parameter of PARAM_NDIM, Y0() is r0.
+        """
+
+        return np.array([float(name == "r0") for name in self.PARAM_NDIM])
+
+    def _stack(self, Y_prev: npt.NDArray[np.float64], *terms: npt.ArrayLike) -> npt.NDArray[np.float64]:
+        # One derivative per parameter of PARAM_NDIM, broadcast to the states
+        return np.stack([np.broadcast_to(term, np.shape(Y_prev)) for term in terms]).astype(np.float64)
+
+    def bond_price(self, T: npt.ArrayLike, r: Optional[float] = None, rate_scale: float = 1.0, time_unit: float = 1.0) -> npt.NDArray[np.float64]:
+        """
+        Zero-coupon bond prices E[exp(-rate_scale*integral of Y over [0, T])] given Y(0) = r.
+        Rates are per unit of T (e.g. annual), while the dynamics are per model time unit (e.g. the calibration sample).
+
+        Args:
+            T (npt.ArrayLike): Maturities.
+            r (Optional[float]): Current short rate, Y0() if None.
+            rate_scale (float): Factor from model rate units to decimal rates (0.01 for percent).
+            time_unit (float): Length of one model time unit in the units of T.
+
+        Returns:
+            npt.NDArray[np.float64]: Price for each maturity.
+        """
+
+        raise NotImplementedError(f"{type(self).__name__} has no closed-form bond prices.")
+
 
     @abstractmethod
-    def calibrate(self, data: pd.DataFrame):
+    def calibrate(self, data: "pd.DataFrame"):
         pass
+
+    @classmethod
+    def sufficient_statistics(cls, x: npt.NDArray[np.float64], y: npt.NDArray[np.float64]) -> npt.NDArray[np.float64]:
+        """
+        Per-pair terms of the calibration statistics, which are sums over consecutive pairs
+        and so can be added and removed one observation at a time.
+
+        Args:
+            x (npt.NDArray[np.float64]): Rates r_s.
+            y (npt.NDArray[np.float64]): Next rates r_t, same shape as x.
+
+        Returns:
+            npt.NDArray[np.float64]: Array of shape x.shape + (K,).
+        """
+
+        raise NotImplementedError(f"{cls.__name__} has no batch calibration.")
+
+    @classmethod
+    def params_from_statistics(cls, S: npt.NDArray[np.float64], N: int, r0: npt.ArrayLike, dt: Optional[float] = None) -> dict[str, npt.NDArray[np.float64]]:
+        """
+        Args:
+            S (npt.NDArray[np.float64]): Statistics summed over the N-1 pairs of each series, shape (..., K).
+            N (int): Number of rates in each series.
+            r0 (npt.ArrayLike): First rate of each series.
+            dt (Optional[float]): Time between consecutive rates (e.g. BusinessCalendar.dt in years), 1/N if None.
+
+        Returns:
+            dict[str, npt.NDArray[np.float64]]: One array per name in PARAMS.
+        """
+
+        raise NotImplementedError(f"{cls.__name__} has no batch calibration.")
+
+    @classmethod
+    def fit(cls, rates: npt.NDArray[np.float64], dt: Optional[float] = None) -> dict[str, npt.NDArray[np.float64]]:
+        """
+        Calibrates every column of rates as a separate series.
+
+        Args:
+            rates (npt.NDArray[np.float64]): Matrix (time x series), or a single series.
+            dt (Optional[float]): Time between consecutive rates, 1/len(rates) if None.
+
+        Returns:
+            dict[str, npt.NDArray[np.float64]]: One array per name in PARAMS, one value per series.
+        """
+
+        rates = np.asarray(rates, dtype=np.float64)
+        if rates.ndim == 1:
+            rates = rates[:, None]
+        S = cls.sufficient_statistics(rates[:-1], rates[1:]).sum(axis=0)
+        return cls.params_from_statistics(S, len(rates), rates[0].copy(), dt)
+
+    @classmethod
+    def rolling_calibrate(cls, rates: npt.NDArray[np.float64], window: int, index: Optional[Sequence] = None, dt: Optional[float] = None) -> "pd.DataFrame":
+        """
+        Calibrates every window of window consecutive rates, each window from a difference of prefix sums
+        of the sufficient statistics, so the whole series costs about as much as one calibration.
+
+        Args:
+            rates (npt.NDArray[np.float64]): A single series.
+            window (int): Number of rates per window.
+            index (Optional[Sequence]): Labels of the rates (e.g. dates), rows are labelled by the last rate of each window.
+            dt (Optional[float]): Time between consecutive rates, 1/window if None.
+
+        Returns:
+            pd.DataFrame: Parameter table, one row per window.
+
+        Raises:
+            ValueError: If rates is not 1D or the window does not fit.
+        """
+
+        rates = np.asarray(rates, dtype=np.float64)
+        if rates.ndim != 1:
+            raise ValueError("rolling_calibrate expects a single series.")
+        N = len(rates)
+        import pandas as pd
+
+        if not 2 < window <= N:
+            raise ValueError(f"Window must be between 3 and {N}, got {window}.")
+        terms = cls.sufficient_statistics(rates[:-1], rates[1:])
+        # Extended precision keeps differences of long prefix sums accurate
+        C = np.zeros((N, terms.shape[-1]), dtype=np.longdouble)
+        np.cumsum(terms, axis=0, dtype=np.longdouble, out=C[1:])
+        # Window ending at i holds pairs i-window+1..i-1
+        S = (C[window-1:] - C[:N-window+1]).astype(np.float64)
+        params = cls.params_from_statistics(S, window, rates[:N-window+1], dt)
+        labels = np.arange(window-1, N) if index is None else pd.Index(index)[window-1:]
+        return pd.DataFrame({name: params[name] for name in cls.PARAMS}, index=labels)
+
+    @classmethod
+    def calibrate_batch(cls, rates: npt.NDArray[np.float64], index: Optional[Sequence] = None, dt: Optional[float] = None) -> "pd.DataFrame":
+        """
+        Calibrates every column of rates (e.g. DataLoader.rates for all maturities, its transpose for all dates).
+
+        Args:
+            rates (npt.NDArray[np.float64]): Matrix (time x series).
+            index (Optional[Sequence]): Row labels of the table, one per series.
+            dt (Optional[float]): Time between consecutive rates, 1/len(rates) if None.
+
+        Returns:
+            pd.DataFrame: Parameter table, columns PARAMS and one row per series.
+        """
+
+        import pandas as pd
+
+        params = cls.fit(rates, dt)
+        return pd.DataFrame({name: params[name] for name in cls.PARAMS}, index=index)
+
+    @classmethod
+    def from_params(cls, params) -> "IRModel":
+        return cls(**{name: float(params[name]) for name in cls.PARAMS})
+
+    def get_params(self) -> dict:
+        return {name: np.asarray(getattr(self, name)).tolist() for name in self.PARAMS}
+
+    def set_params(self, params: dict):
+        for name in self.PARAMS:
+            value = params[name]
+            setattr(self, name, np.asarray(value, dtype=np.float64) if isinstance(value, list) else float(value))
+
+    def num_params(self) -> Optional[int]:
+        """
+        Returns:
+            Optional[int]: Length of the leading batch axis of the parameters that have one, None if none has.
+
+        Raises:
+            ValueError: If batched parameters differ in length.
+        """
+
+        sizes = {np.shape(getattr(self, name))[0] for name, ndim in self.PARAM_NDIM.items() if np.ndim(getattr(self, name)) > ndim}
+        if len(sizes) > 1:
+            raise ValueError(f"Parameter batches of different lengths: {sorted(sizes)}.")
+        return sizes.pop() if sizes else None
+
+    def param(self, name: str) -> npt.ArrayLike:
+        """
+        Parameter as used by the vectorized methods: unchanged for a single set, with an axis inserted after
+        the batch axis otherwise, so it broadcasts against a (num_params, num_chains) state.
+
+        Args:
+            name (str): Parameter name.
+
+        Returns:
+            npt.ArrayLike: The value, shape (num_params, 1, ...) when batched.
+        """
+
+        value = getattr(self, name)
+        if np.ndim(value) <= self.PARAM_NDIM.get(name, 0):
+            return value
+        value = np.asarray(value, dtype=np.float64)
+        return value.reshape(value.shape[:1] + (1,) + value.shape[1:])
+
+    def scenarios(self, grid: dict[str, Sequence], product: bool = True) -> "IRModel":
+        """
+        Copy of the model holding one parameter set per scenario, simulated together by a solver with
+        common random numbers. Parameters not in grid keep their (e.g. calibrated) value for every scenario.
+
+        Args:
+            grid (dict[str, Sequence]): Values of each varied parameter, scalars for bucketed parameters set every bucket.
+            product (bool): One scenario per combination of the values, or per position when False.
+
+        Returns:
+            IRModel: The batched model.
+
+        Raises:
+            ValueError: If grid is empty, a parameter cannot vary across a batch, or value lists differ in length when product is False.
+        """
+
+        if not grid:
+            raise ValueError("No scenario parameters given.")
+        unknown = set(grid)-set(self.PARAM_NDIM)
+        if unknown:
+            raise ValueError(f"{type(self).__name__} parameters {sorted(unknown)} cannot vary across scenarios.")
+        values = {name: np.asarray(grid[name], dtype=np.float64) for name in grid}
+        if product:
+            index = np.indices([len(v) for v in values.values()]).reshape(len(values), -1)
+        else:
+            lengths = {len(v) for v in values.values()}
+            if len(lengths) > 1:
+                raise ValueError("Scenario values must have equal lengths unless product is True.")
+            index = np.tile(np.arange(lengths.pop() if lengths else 1), (len(values), 1))
+
+        batch = copy.copy(self)
+        for i, (name, value) in enumerate(values.items()):
+            ndim = self.PARAM_NDIM[name]
+            value = value[index[i]]
+            if value.ndim <= ndim:
+                value = value.reshape(value.shape + (1,)*ndim)
+                value = np.broadcast_to(value, value.shape[:1] + np.shape(getattr(self, name))).copy()
+            setattr(batch, name, value)
+        return batch
@@ -0,0 +1,79 @@
+from collections import deque
+from typing import Optional, Type
+
+import numpy as np
+import numpy.typing as npt
+
+from .ir_model import IRModel
+
+
+class RollingCalibrator:
+    """
+    Sliding-window calibration that keeps the model's sufficient statistics and updates them in O(1)
+    per observation: adding a rate adds the term of its pair with the previous rate, dropping the oldest
+    rate subtracts the term of the first pair. Works with any model implementing sufficient_statistics.
+
+    Attributes:
+        model_cls (Type[IRModel]): Calibrated model class.
+        window (int): Maximum number of rates kept, the oldest is dropped when it is exceeded.
+        dt (Optional[float]): Time between consecutive rates, 1/(rates in the window) if None.
+        rates (deque[float]): Rates in the window.
+        statistics (npt.NDArray[np.float64]): Statistics summed over the pairs in the window.
+
+    Methods:
+        add(rate: float):
+            Appends a rate, dropping the oldest one when the window is full.
+        drop():
+            Removes the oldest rate.
+        params() -> dict[str, float]:
+            Parameters calibrated on the current window.
+        model() -> IRModel:
+            Model with the current parameters.
+    """
+
+    def __init__(self, model_cls: Type[IRModel], window: int, dt: Optional[float] = None):
+        if window < 3:
+            raise ValueError("Window must hold at least 3 rates.")
+        self.model_cls = model_cls
+        self.window = window
+        self.dt = dt
+        self.rates = deque()
+        self.statistics = None
+
+    def _term(self, x: float, y: float) -> npt.NDArray[np.float64]:
+        # Extended precision so repeated adds and drops do not drift
+        return self.model_cls.sufficient_statistics(np.array([x]), np.array([y]))[0].astype(np.longdouble)
+
+    def add(self, rate: float):
+        rate = float(rate)
+        if self.rates:
+            term = self._term(self.rates[-1], rate)
+            self.statistics = term if self.statistics is None else self.statistics + term
+        self.rates.append(rate)
+        if len(self.rates) > self.window:
+            self.drop()
+
+    def drop(self):
+        if len(self.rates) < 2:
+            self.rates.clear()
+            self.statistics = None
+            return
+        self.statistics = self.statistics - self._term(self.rates[0], self.rates[1])
+        self.rates.popleft()
+
+    def params(self) -> dict[str, float]:
+        """
+        Returns:
+            dict[str, float]: Parameters calibrated on the rates in the window.
+
+        Raises:
+            ValueError: If the window holds fewer than 3 rates.
+        """
+
+        if len(self.rates) < 3:
+            raise ValueError("Calibration needs at least 3 rates.")
+        params = self.model_cls.params_from_statistics(self.statistics.astype(np.float64), len(self.rates), self.rates[0], self.dt)
+        return {name: float(params[name]) for name in self.model_cls.PARAMS}
+
+    def model(self) -> IRModel:
+        return self.model_cls.from_params(self.params())
@@ -1,4 +1,7 @@
+from typing import Optional
+
 from .ir_model import IRModel
+from .calibration_cache import cached_calibration
 
 import numpy as np
 import numpy.typing as npt
@@ -22,6 +25,7 @@ class Vasicek(IRModel):
         alpha (float): The speed of reversion to the mean.
         sigma (float): The volatility of the interest rate.
         r0 (float): First rate.
+        Any of them may be an array of one value per parameter set of a batch (see IRModel.scenarios).
 
     Methods:
         a(Y_prev: float, t:flaot) -> float:
@@ -30,13 +34,31 @@ class Vasicek(IRModel):
         b(Y_prev: float, t: float) -> float:
             Computes the diffusion term of the Vasicek model.
 
+        a_vec, b_vec, b_prime_vec:
+            Array versions of a, b and db/dY.
+
+        derivatives(Y_prev: npt.NDArray[np.float64], t: float) -> dict[str, npt.NDArray[np.float64]]:
+            Derivatives of a, b and b*db/dY for pathwise sensitivities.
+
+        transition(Y_prev: npt.NDArray[np.float64], t: float, dt: float, rng: np.random.Generator) -> npt.NDArray[np.float64]:
+            Samples the Gaussian transition density.
+
+        bond_price(T: npt.ArrayLike, r: Optional[float] = None, rate_scale: float = 1.0, time_unit: float = 1.0) -> npt.NDArray[np.float64]:
+            Closed-form zero-coupon bond prices.
+
         Y0() -> float:
             Starting point for chain.
 
         calibrate(data: pd.DataFrame):
             Calibrates the model parameters to market data.
+
+        sufficient_statistics, params_from_statistics:
+            MLE calibration from additive pair statistics, used by fit, rolling_calibrate and RollingCalibrator.
     """
 
+    PARAMS = ("theta", "alpha", "sigma", "r0")
+    PARAM_NDIM = {"theta": 0, "alpha": 0, "sigma": 0, "r0": 0}
+
     def __init__(self, theta: float, alpha: float, sigma: float, r0: float):
         """
         Initializes the Vasicek model with the given parameters.
@@ -72,6 +94,18 @@ class Vasicek(IRModel):
     def differentiable(self) -> bool:
         return True
 
+    def vectorized(self) -> bool:
+        return True
+
+    def exact(self) -> bool:
+        return True
+
+    def closed_form(self) -> bool:
+        return True
+
+    def pathwise(self) -> bool:
+        return True
+
     def b(self, Y_prev: float, t: float) -> float:
         """
         Computes the diffusion term of the Vasicek model.
@@ -84,32 +118,105 @@ class Vasicek(IRModel):
 
         return self.sigma
 
-    def calibrate(self, rates: npt.NDArray[np.float64]):
+    def a_vec(self, Y_prev: npt.NDArray[np.float64], t: float) -> npt.NDArray[np.float64]:
+        return self.param("theta")-self.param("alpha")*Y_prev
+
+    def b_vec(self, Y_prev: npt.NDArray[np.float64], t: float) -> npt.NDArray[np.float64]:
+        return np.broadcast_to(self.param("sigma"), np.shape(Y_prev)).astype(np.float64)
+
+    def b_prime_vec(self, Y_prev: npt.NDArray[np.float64], t: float) -> npt.NDArray[np.float64]:
+        return np.zeros_like(Y_prev, dtype=np.float64)
+
+    def derivatives(self, Y_prev: npt.NDArray[np.float64], t: float) -> dict[str, npt.NDArray[np.float64]]:
+        """
+        With respect to (theta, alpha, sigma, r0): da = (1, -Y, 0, 0), db = (0, 0, 1, 0), b*db/dY is 0.
+        """
+
+        zero = np.zeros_like(Y_prev, dtype=np.float64)
+        return {
+            "a_y": zero-self.param("alpha"),
+            "b_y": zero,
+            "m_y": zero,
+            "a_p": self._stack(Y_prev, 1.0, -Y_prev, 0.0, 0.0),
+            "b_p": self._stack(Y_prev, 0.0, 0.0, 1.0, 0.0),
+            "m_p": self._stack(Y_prev, 0.0, 0.0, 0.0, 0.0),
+        }
+
+    def transition(self, Y_prev: npt.NDArray[np.float64], t: float, dt: float, rng: np.random.Generator) -> npt.NDArray[np.float64]:
+        """
+        Samples Y(t+dt) | Y(t) ~ N(mean, var) with
+            mean = Y(t)*exp(-alpha*dt) + theta/alpha*(1-exp(-alpha*dt))
+            var = sigma^2/(2*alpha)*(1-exp(-2*alpha*dt))
+        A batch of parameter sets shares the normal draws of each chain (common random numbers).
+
+        Args:
+            Y_prev (npt.NDArray[np.float64]): Rates at time t, one per chain (and parameter set).
+            t (float): Timestep.
+            dt (float): Step length, may be arbitrarily large.
+            rng (np.random.Generator): Random generator.
+        Returns:
+            npt.NDArray[np.float64]: Rates at time t+dt.
+        """
+
+        theta, alpha, sigma = self.param("theta"), self.param("alpha"), self.param("sigma")
+        decay = np.exp(-alpha*dt)
+        mean = Y_prev*decay + theta/alpha*(1-decay)
+        std = sigma*np.sqrt(-np.expm1(-2*alpha*dt)/(2*alpha))
+        return mean + std*rng.standard_normal(np.shape(Y_prev)[-1:])
+
+    def bond_price(self, T: npt.ArrayLike, r: Optional[float] = None, rate_scale: float = 1.0, time_unit: float = 1.0) -> npt.NDArray[np.float64]:
+        """
+        Vasicek zero-coupon bond price P(T) = A(T)*exp(-B(T)*r) with long-term mean m = theta/alpha:
+            B = (1-exp(-alpha*T))/alpha
+            log A = (m - sigma^2/(2*alpha^2))*(B-T) - sigma^2*B^2/(4*alpha)
+        Rates, theta and sigma are scaled to decimals by rate_scale, alpha and sigma^2 to the time of T by time_unit.
+        A batch of parameter sets gives one row of prices per set.
+        """
+
+        T = np.asarray(T, dtype=np.float64)
+        r = (self.param("r0") if r is None else r)*rate_scale
+        alpha = self.param("alpha")/time_unit
+        mean = self.param("theta")/self.param("alpha")*rate_scale
+        sigma = self.param("sigma")*rate_scale/np.sqrt(time_unit)
+        B = -np.expm1(-alpha*T)/alpha
+        log_A = (mean-sigma**2/(2*alpha**2))*(B-T) - sigma**2*B**2/(4*alpha)
+        return np.exp(log_A-B*r)
+
+    @cached_calibration
+    def calibrate(self, rates: npt.NDArray[np.float64], dt: Optional[float] = None):
         """
         MLE Vasicek calibration.
 
         Args:
             rates (npt.NDArray[np.float64]): Rates for a single instrument over time.
+            dt (Optional[float]): Time between consecutive rates (e.g. BusinessCalendar.dt in years), 1/len(rates) if None.
         """
 
-        N = len(rates)
-        dt = 1/N
+        params = self.fit(rates, dt)
+        for name in self.PARAMS:
+            setattr(self, name, float(params[name][0]))
+
+    @classmethod
+    def sufficient_statistics(cls, x: npt.NDArray[np.float64], y: npt.NDArray[np.float64]) -> npt.NDArray[np.float64]:
+        """
+        Per-pair terms of Sx, Sy, Sxx, Sxy, Syy.
+        """
+
+        return np.stack([x, y, x*x, x*y, y*y], axis=-1)
+
+    @classmethod
+    def params_from_statistics(cls, S: npt.NDArray[np.float64], N: int, r0: npt.ArrayLike, dt: Optional[float] = None) -> dict[str, npt.NDArray[np.float64]]:
+        """
+        MLE Vasicek parameters from the sufficient statistics Sx, Sy, Sxx, Sxy, Syy of consecutive pairs.
+        """
+
+        Sx, Sy, Sxx, Sxy, Syy = np.moveaxis(np.asarray(S, dtype=np.float64), -1, 0)
+        dt = 1/N if dt is None else dt
 
-        Sx = sum(rates[0:(N-1)])
-        Sy = sum(rates[1:N])
-        Sxx = np.dot(rates[0:(N-1)], rates[0:(N-1)])
-        Sxy = np.dot(rates[0:(N-1)], rates[1:N])
-        Syy = np.dot(rates[1:N], rates[1:N])
-        
         theta = (Sy * Sxx - Sx * Sxy) / (N * (Sxx - Sxy) - (Sx**2 - Sx*Sy))
         kappa = -np.log((Sxy - theta * Sx - theta * Sy + N * theta**2) / (Sxx - 2*theta*Sx + N*theta**2)) / dt
         a = np.exp(-kappa * dt)
         sigmah2 = (Syy - 2*a*Sxy + a**2 * Sxx - 2*theta*(1-a)*(Sy - a*Sx) + N*theta**2 * (1-a)**2) / N
         sigma = np.sqrt(sigmah2*2*kappa / (1-a**2))
-        r0 = rates[0]
-        
-        self.theta = theta*kappa
-        self.alpha = kappa
-        self.sigma = sigma
-        self.r0 = r0
- 
\ No newline at end of file
+
+        return {"theta": theta*kappa, "alpha": kappa, "sigma": sigma, "r0": np.asarray(r0, dtype=np.float64)}
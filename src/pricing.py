@@ -0,0 +1,168 @@
+import numpy as np
+import numpy.typing as npt
+
+from model import IRModel
+from stats import Accumulator, RunningMoments
+
+
+class BondPricer(Accumulator):
+    """
+    Monte Carlo zero-coupon bond prices for a whole grid of maturities from one set of short-rate paths.
+    Each block of paths is integrated once (trapezoid rule, cumulative over the grid) and the discount
+    factors exp(-rate_scale*integral of r over [t_0, T]) of every maturity are read off the same integral,
+    so pricing all maturities costs about as much as pricing one.
+
+    Attributes:
+        t (npt.NDArray[np.float64]): Times of the path grid, in the units of the maturities (e.g. years).
+        maturities (npt.NDArray[np.float64]): Bond maturities measured from t[0], beyond t[-1] the last rate is held flat.
+        rate_scale (float): Factor from path rate units to decimal rates (0.01 for the percentages of DataLoader).
+        tangents (bool): Whether blocks are the (1+P, num_chains, N) paths and tangents of a sensitivity run.
+        discount (RunningMoments): Running mean and variance of the discount factors, one column per maturity.
+        sensitivity (Optional[RunningMoments]): Running moments of the pathwise price derivatives of a sensitivity run,
+            -rate_scale*discount*integral of dr/dp, one column per parameter and maturity.
+
+    Methods:
+        update(block: npt.NDArray[np.float64]):
+            Adds a (num_chains, N) block of short-rate paths, or with tangents a (1+P, num_chains, N) block of paths and their tangents.
+            Parameter batches are priced by one BondPricer per set (ParameterBatch).
+        merge(other: BondPricer):
+            Combines with prices accumulated over a disjoint set of paths.
+        prices -> npt.NDArray[np.float64]:
+            Monte Carlo bond prices.
+        std_error -> npt.NDArray[np.float64]:
+            Standard error of the prices.
+        price_sensitivities -> npt.NDArray[np.float64]:
+            Derivatives of the prices with respect to each parameter, shape (P, maturities).
+        price_sensitivity_std_error -> npt.NDArray[np.float64]:
+            Standard error of the price derivatives.
+        yields() -> npt.NDArray[np.float64]:
+            Continuously compounded yields in path rate units, comparable with DataLoader rows.
+        yield_std_error() -> npt.NDArray[np.float64]:
+            Standard error of the yields (delta method).
+    """
+
+    def __init__(self, t: npt.ArrayLike, maturities: npt.ArrayLike, rate_scale: float = 1.0, tangents: bool = False):
+        t = np.asarray(t, dtype=np.float64)
+        super().__init__(len(t))
+        if self.N < 2 or np.any(np.diff(t) <= 0):
+            raise ValueError("t must be a strictly increasing grid of at least 2 points.")
+        self.t = t
+        self.maturities = np.asarray(maturities, dtype=np.float64)
+        if np.any(self.maturities <= 0):
+            raise ValueError("Maturities must be positive.")
+        self.rate_scale = rate_scale
+        self.tangents = tangents
+        self.discount = RunningMoments(len(self.maturities))
+        self.sensitivity = None
+
+        # Integral to t_0+T = I[k] + w0*r[k] + w1*r[k+1], r linear inside the grid and flat past its end
+        end = t[0]+self.maturities
+        k = np.clip(np.searchsorted(t, end, side="right")-1, 0, self.N-2)
+        span = t[k+1]-t[k]
+        h = end-t[k]
+        inside = np.minimum(h, span)
+        self._k = k
+        self._w0 = inside - inside**2/(2*span)
+        self._w1 = inside**2/(2*span) + (h-inside)
+
+    def _integral(self, block: npt.NDArray[np.float64]) -> npt.NDArray[np.float64]:
+        # Integral of every path (last axis) to each maturity
+        I = np.zeros_like(block)
+        np.cumsum((block[..., :-1]+block[..., 1:])*(np.diff(self.t)/2), axis=-1, out=I[..., 1:])
+        k = self._k
+        return I[..., k] + self._w0*block[..., k] + self._w1*block[..., k+1]
+
+    def update(self, block: npt.NDArray[np.float64]):
+        block = np.asarray(block, dtype=np.float64)
+        tangents = None
+        if self.tangents:
+            if block.ndim != 3:
+                raise ValueError(f"Expected a (1+P, num_chains, {self.N}) block of paths and tangents, got {block.shape}.")
+            block, tangents = block[0], block[1:]
+        elif block.ndim == 3:
+            raise ValueError(f"Got a block of shape {block.shape}, price parameter batches with a ParameterBatch of BondPricers "
+                             "and sensitivity runs with tangents=True.")
+        block = self._check(block)
+        discount = np.exp(-self.rate_scale*self._integral(block))
+        self.discount.update(discount)
+        if tangents is not None:
+            # d/dp exp(-s*integral of r) = -s*exp(-s*integral of r)*integral of dr/dp, by parameter then maturity
+            derivative = -self.rate_scale*discount*self._integral(tangents)
+            if self.sensitivity is None:
+                self.sensitivity = RunningMoments(len(tangents)*len(self.maturities))
+            self.sensitivity.update(derivative.transpose(1, 0, 2).reshape(len(block), -1))
+        self.count += len(block)
+
+    def merge(self, other: "BondPricer"):
+        if other.N != self.N or not np.array_equal(other.maturities, self.maturities) or other.tangents != self.tangents:
+            raise ValueError("Cannot merge prices of different grids.")
+        self.discount.merge(other.discount)
+        if other.sensitivity is not None:
+            if self.sensitivity is None:
+                self.sensitivity = RunningMoments(other.sensitivity.N)
+            self.sensitivity.merge(other.sensitivity)
+        self.count += other.count
+
+    @property
+    def prices(self) -> npt.NDArray[np.float64]:
+        return self.discount.mean
+
+    @property
+    def std_error(self) -> npt.NDArray[np.float64]:
+        return self.discount.std_error
+
+    @property
+    def price_sensitivities(self) -> npt.NDArray[np.float64]:
+        if self.sensitivity is None:
+            raise ValueError("No sensitivities were accumulated, the paths carried no tangents.")
+        return self.sensitivity.mean.reshape(-1, len(self.maturities))
+
+    @property
+    def price_sensitivity_std_error(self) -> npt.NDArray[np.float64]:
+        if self.sensitivity is None:
+            raise ValueError("No sensitivities were accumulated, the paths carried no tangents.")
+        return self.sensitivity.std_error.reshape(-1, len(self.maturities))
+
+    def yields(self) -> npt.NDArray[np.float64]:
+        return bond_yields(self.prices, self.maturities, self.rate_scale)
+
+    def yield_std_error(self) -> npt.NDArray[np.float64]:
+        return self.std_error/self.prices/self.maturities/self.rate_scale
+
+def bond_yields(prices: npt.ArrayLike, maturities: npt.ArrayLike, rate_scale: float = 1.0) -> npt.NDArray[np.float64]:
+    """
+    Continuously compounded yields -log(P)/T, in rate units (divided by rate_scale).
+
+    Args:
+        prices (npt.ArrayLike): Zero-coupon bond prices.
+        maturities (npt.ArrayLike): Positive maturities, yields are per unit of their time.
+        rate_scale (float): Factor from rate units to decimal rates.
+
+    Returns:
+        npt.NDArray[np.float64]: Yield for each maturity.
+    """
+
+    return -np.log(np.asarray(prices, dtype=np.float64))/np.asarray(maturities, dtype=np.float64)/rate_scale
+
+def closed_form_yields(model: IRModel, maturities: npt.ArrayLike, time_unit: float = 1.0, rate_scale: float = 1.0) -> npt.NDArray[np.float64]:
+    """
+    Model-implied yield curve from closed-form bond prices, the fast path and validation baseline for BondPricer.
+
+    Args:
+        model (IRModel): A model with closed_form().
+        maturities (npt.ArrayLike): Maturities, e.g. in years.
+        time_unit (float): Length of one model time unit in the units of the maturities (years per calibration sample).
+        rate_scale (float): Factor from model rate units to decimal rates.
+
+    Returns:
+        npt.NDArray[np.float64]: Yields per unit of maturity time, in model rate units.
+
+    Raises:
+        RuntimeError: If the model has no closed-form bond prices.
+    """
+
+    if not model.closed_form():
+        raise RuntimeError(f"{type(model).__name__} has no closed-form bond prices!")
+    maturities = np.asarray(maturities, dtype=np.float64)
+    prices = model.bond_price(maturities, rate_scale=rate_scale, time_unit=time_unit)
+    return bond_yields(prices, maturities, rate_scale)
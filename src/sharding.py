@@ -0,0 +1,124 @@
+import os
+import re
+import glob
+import pickle
+import logging
+from typing import Optional, Sequence
+
+import numpy as np
+import numpy.typing as npt
+
+from stats import Accumulator, PathStatistics
+
+
+log = logging.getLogger(__name__)
+
+SHARD_PATTERN = re.compile(r"^(\d+)/(\d+)$")
+
+def parse_shard(spec: Optional[str]) -> Optional[tuple[int, int]]:
+    """
+    Parses a sim.shard value.
+
+    Args:
+        spec (Optional[str]): "i/k" for shard i of k (0-based), "merge" or None.
+
+    Returns:
+        Optional[tuple[int, int]]: (index, count), or None for "merge" and unsharded runs.
+
+    Raises:
+        ValueError: If spec is malformed or the index is out of range.
+    """
+
+    if spec is None or spec == "merge":
+        return None
+    match = SHARD_PATTERN.match(str(spec))
+    if match is None:
+        raise ValueError(f"Shard must be 'i/k' or 'merge', got {spec}.")
+    index, count = int(match.group(1)), int(match.group(2))
+    if not 0 <= index < count:
+        raise ValueError(f"Shard {index} out of range for {count} shards.")
+    return index, count
+
+def shard_path(shard_dir: str, tag: str, index: int, count: int, ext: str) -> str:
+    return os.path.join(shard_dir, f"{tag}.shard{index}of{count}.{ext}")
+
+def save_shard(shard_dir: str, tag: str, index: int, count: int, stats: PathStatistics, chains: tuple[int, int], accumulators: Sequence[Accumulator] = ()):
+    """
+    Writes the statistics of one shard, the paths (if any) are written by the solver next to it.
+
+    Args:
+        shard_dir (str): Directory shared by all shards.
+        tag (str): Run tag (e.g. "fit", "forecast").
+        index (int): Shard index.
+        count (int): Number of shards.
+        stats (PathStatistics): Statistics of the shard's chains.
+        chains (tuple[int, int]): Range [start, stop) of chains in the shard.
+        accumulators (Sequence[Accumulator]): Further statistics of the shard (e.g. bond prices), merged in the same order.
+    """
+
+    os.makedirs(shard_dir, exist_ok=True)
+    file_path = shard_path(shard_dir, tag, index, count, "pkl")
+    tmp = f"{file_path}.tmp"
+    with open(tmp, "wb") as f:
+        pickle.dump({"chains": chains, "stats": stats, "accumulators": list(accumulators)}, f)
+    os.replace(tmp, file_path)
+    log.info(f"Shard {index}/{count} of {tag} saved to {file_path}")
+
+def merge_shards(shard_dir: str, tag: str, N: int, out: Optional[str] = None) -> tuple[PathStatistics, list[Accumulator], npt.NDArray[np.float64]]:
+    """
+    Merges the shards of a run in order. Moments (and control-variate means) match an unsharded run
+    up to rounding, histogram quantile bands to one bin width.
+
+    Args:
+        shard_dir (str): Directory shared by all shards.
+        tag (str): Run tag.
+        N (int): Number of time steps per chain.
+        out (Optional[str]): If given and the shards wrote paths, they are concatenated into a memory-mapped .npy file here.
+
+    Returns:
+        tuple[PathStatistics, list[Accumulator], npt.NDArray[np.float64]]: Merged statistics, merged further accumulators
+            and merged paths (empty if none were written).
+
+    Raises:
+        FileNotFoundError: If no shard or only part of the shards are present.
+        ValueError: If shards do not line up or have a different time grid.
+    """
+
+    files = glob.glob(os.path.join(glob.escape(shard_dir), f"{glob.escape(tag)}.shard*of*.pkl"))
+    counts = {int(re.search(r"of(\d+)\.pkl$", f).group(1)) for f in files}
+    if len(counts) != 1:
+        raise FileNotFoundError(f"Expected shards of one run of {tag} in {shard_dir}, found counts {sorted(counts)}.")
+    count = counts.pop()
+    missing = [i for i in range(count) if not os.path.exists(shard_path(shard_dir, tag, i, count, "pkl"))]
+    if missing:
+        raise FileNotFoundError(f"Missing shards {missing} of {count} for {tag}.")
+
+    stats = None
+    accumulators = []
+    chains = []
+    for i in range(count):
+        with open(shard_path(shard_dir, tag, i, count, "pkl"), "rb") as f:
+            shard = pickle.load(f)
+        if shard["stats"].N != N:
+            raise ValueError(f"Shard {i} of {tag} has {shard['stats'].N} time steps, expected {N}.")
+        if chains and chains[-1][1] != shard["chains"][0]:
+            raise ValueError(f"Shard {i} of {tag} does not continue shard {i-1}.")
+        chains.append(shard["chains"])
+        if stats is None:
+            stats, accumulators = shard["stats"], shard["accumulators"]
+        else:
+            stats.merge(shard["stats"])
+            for acc, other in zip(accumulators, shard["accumulators"], strict=True):
+                acc.merge(other)
+    log.info(f"Merged {count} shards of {tag}, {stats.count} chains.")
+
+    paths = [shard_path(shard_dir, tag, i, count, "npy") for i in range(count)]
+    if not all(os.path.exists(p) for p in paths):
+        return stats, accumulators, np.empty((0, N))
+    shape = (chains[-1][1]-chains[0][0], N)
+    Ys = np.empty(shape) if out is None else np.lib.format.open_memmap(out, mode="w+", dtype=np.float64, shape=shape)
+    for (start, stop), p in zip(chains, paths):
+        Ys[start-chains[0][0]:stop-chains[0][0]] = np.load(p, mmap_mode="r")
+    if out is not None:
+        Ys.flush()
+    return stats, accumulators, Ys
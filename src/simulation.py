@@ -1,11 +1,12 @@
 import logging
-import pandas as pd
+import numpy as np
 from datetime import datetime
 
-from omegaconf import DictConfig
+from omegaconf import DictConfig, OmegaConf
 from hydra.utils import instantiate
 
-from util import working_days_between, run_sim
+from util import init_model, run_sim
+from instrumentation import stage
 
 
 log = logging.getLogger(__name__)
@@ -14,29 +15,42 @@ log = logging.getLogger(__name__)
 def simulation(config: DictConfig):
     """
     Simulation procedure.
+
+    Time is in years of config.calendar: the model is calibrated and simulated with one business day
+    (calendar.dt) per observation, and the forecast runs on the calendar's business days up to sim.forecast,
+    or on every sim.forecast_every-th of them (the solver's explicit time grid).
+
+    sim.scenarios maps parameter names to lists of values: the calibrated model becomes a batch of one parameter set
+    per combination (per position with sim.scenario_product False), simulated together with common random numbers.
     """
 
     log.info("Initializing data loader.")
-    data_loader = instantiate(config.data)
+    with stage("data load"):
+        data_loader = instantiate(config.data)
+    calendar = instantiate(config.calendar)
 
     log.info("Initializing model.")
-    model = instantiate(config.model)
+    model = init_model(config)
 
     rates = data_loader.get_maturity(config.sim.bond)
     t_start = 0
     t_stop = len(rates)-1
 
     log.info("Model calibration.")
-    model.calibrate(rates)
+    with stage("calibration"):
+        model.calibrate(rates, dt=calendar.dt, **config.sim.get("calibrate", {}))
+
+    if config.sim.get("scenarios"):
+        model = model.scenarios(OmegaConf.to_container(config.sim.scenarios), config.sim.get("scenario_product", True))
+        log.info(f"Simulating {model.num_params()} parameter scenarios.")
 
     log.info("Model fit.")
-    run_sim(config, t_start, t_stop, rates, data_loader.date_index, model, model.Y0())
+    run_sim(config, t_start, t_stop, rates, data_loader.date_index, model, model.Y0(), tag="fit", dt=calendar.dt)
 
     if ('forecast' in config.sim):
-        start_date = pd.to_datetime(data_loader.date_index[-1]).to_pydatetime().date()
-        stop_date = datetime.strptime(config.sim.forecast, "%m/%d/%Y").date()
-        days = working_days_between(start_date, stop_date)+[stop_date]
+        stop_date = np.datetime64(datetime.strptime(config.sim.forecast, "%m/%d/%Y").date())
+        days = calendar.grid(data_loader.date_index[-1], stop_date, config.sim.get("forecast_every", 1))
         N = len(days)-1
         if N > 0:
             log.info('Forecasting.')
-            run_sim(config, 0, N, None, days, model, rates[-1])
\ No newline at end of file
+            run_sim(config, 0, N, None, days, model, rates[-1], tag="forecast", t_grid=calendar.year_fractions(days))
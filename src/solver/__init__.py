@@ -1,3 +1,4 @@
 from .sde_solver import SDESolver
 from .milstein import Milstein
-from .euler_maruyama import EulerMaruyama
\ No newline at end of file
+from .euler_maruyama import EulerMaruyama
+from .exact import ExactSolver
@@ -1,7 +1,9 @@
+from typing import Optional, Sequence
+
 import numpy as np
 import numpy.typing as npt
 
-from .sde_solver import SDESolver, SDEFn
+from .sde_solver import SDESolver, SDEFn, DerivativesFn
 
 
 class EulerMaruyama(SDESolver):
@@ -20,16 +22,37 @@ class EulerMaruyama(SDESolver):
         num_chains (int): The number of independent chains to simulate.
         num_workers (int): The number of parallel workers to use for simulation.
         Y0 (float): starting point for chain.
+        vectorized (bool): Whether all chains are advanced at once.
+        chunk_size (int): Number of chains simulated together in one block.
+        variance_reduction (Optional[str]): None, "antithetic", "sobol" or "halton" increments.
+        control_variate (bool): Whether a control-variate mean is estimated.
+        tolerance (Optional[float]): Target standard error of the mean or quantiles, chains are generated until it is met.
+        t_grid (npt.NDArray[np.float64]): Times of the path points, possibly non-uniform.
+        adaptive (bool): Whether the solver steps through a grid chosen by step doubling and reports on t_grid.
+        num_params (Optional[int]): Number of parameter sets of a batched model stepped together.
+        sensitivities (bool): Whether paths carry their tangents dY/dp with respect to each model parameter.
         
     Methods:
-        step(Y_prev: float, t: float) -> npt.NDArray[np.float64]:
+        step(Y_prev: npt.ArrayLike, t: npt.ArrayLike, dW: npt.ArrayLike, dt: Optional[npt.ArrayLike] = None) -> npt.NDArray[np.float64]:
             Perform a single Euler-Maruyama step.
+
+        tangent_step(state: npt.NDArray[np.float64], t: float, dW: npt.ArrayLike, dt: Optional[float] = None) -> npt.NDArray[np.float64]:
+            Euler-Maruyama step of the paths and its derivative, J' = J + (a_y*J + a_p)*dt + (b_y*J + b_p)*dW.
     """
 
-    def __init__(self, a: SDEFn, b: SDEFn, t_start: int, t_stop: int, num_chains: int, num_workers: int = 1, Y0: float = 0.0):
-        super().__init__(a, b, t_start, t_stop, num_chains, num_workers, Y0)
+    def __init__(self, a: SDEFn, b: SDEFn, t_start: int, t_stop: int, num_chains: int, num_workers: int = 1, Y0: float = 0.0, vectorized: bool = False, chunk_size: Optional[int] = None, variance_reduction: Optional[str] = None, control_variate: bool = False, tolerance: Optional[float] = None, tolerance_target: str = "mean", time_budget: Optional[float] = None, seed: Optional[int] = 0, stream_key: Sequence[int] = (), dt: Optional[float] = None, t_grid: Optional[Sequence[float]] = None, adaptive: bool = False, step_tolerance: float = 1e-3, max_refine: int = 2, max_coarsen: int = 4, pilot_chains: int = 32, num_params: Optional[int] = None, sensitivities: bool = False, derivatives: Optional[DerivativesFn] = None, dY0: Optional[npt.ArrayLike] = None, stream_size: int = 1024):
+        super().__init__(a, b, t_start, t_stop, num_chains, num_workers, Y0, vectorized, chunk_size, variance_reduction, control_variate, tolerance, tolerance_target, time_budget, seed, stream_key, dt, t_grid, adaptive, step_tolerance, max_refine, max_coarsen, pilot_chains, num_params, sensitivities, derivatives, dY0, stream_size)
+
+    def step(self, Y_prev: npt.ArrayLike, t: npt.ArrayLike, dW: npt.ArrayLike, dt: Optional[npt.ArrayLike] = None) -> npt.NDArray[np.float64]:
+        dt = self.dt if dt is None else dt
+        return Y_prev + self.a(Y_prev, t)*dt + self.b(Y_prev, t)*dW
 
-    def step(self, Y_prev: float, t: float) -> npt.NDArray[np.float64]:
-        dt = self.dt
-        return Y_prev + self.a(Y_prev, t)*dt + self.b(Y_prev, t)*self.dW(dt)
+    def tangent_step(self, state: npt.NDArray[np.float64], t: float, dW: npt.ArrayLike, dt: Optional[float] = None) -> npt.NDArray[np.float64]:
+        dt = self.dt if dt is None else dt
+        Y, J = state[0], state[1:]
+        d = self.derivatives(Y, t)
+        out = np.empty_like(state)
+        out[0] = self.step(Y, t, dW, dt)
+        out[1:] = J + (d["a_y"]*J + d["a_p"])*dt + (d["b_y"]*J + d["b_p"])*dW
+        return out
     
\ No newline at end of file
@@ -0,0 +1,63 @@
+from typing import Callable, Optional, Sequence, TypeAlias
+
+import numpy as np
+import numpy.typing as npt
+
+from .sde_solver import SDESolver, SDEFn
+
+
+TransitionFn: TypeAlias = Callable[[npt.NDArray[np.float64], float, float, np.random.Generator], npt.NDArray[np.float64]]
+
+class ExactSolver(SDESolver):
+    """
+    Exact simulation for SDEs with a known transition density.
+    Instead of discretising dY = a(Y) dt + b(Y) dW, every step samples Y(t+dt) | Y(t) directly,
+    so there is no time-discretisation bias and the time grid can be arbitrarily coarse.
+
+    Attributes:
+        a (SDEFn): The drift coefficient function (unused, kept for a uniform solver interface).
+        b (SDEFn): The diffusion coefficient function (unused, kept for a uniform solver interface).
+        transition (TransitionFn): Samples Y(t+dt) given Y(t), t, dt and a random generator.
+        t_grid (npt.NDArray[np.float64]): Reporting times, uniform with step dt from t_start by default.
+        N (int): Number of grid points.
+        num_chains (int): The number of independent chains to simulate.
+        Y0 (float): starting point for chain.
+        tolerance (Optional[float]): Target standard error of the mean or quantiles, chains are generated until it is met.
+        stream_size (int): Chains per random stream, a transition call samples a whole stream at once.
+        num_params (Optional[int]): Number of parameter sets of a batched model sampled together.
+
+    Methods:
+        step(Y_prev: npt.ArrayLike, t: npt.ArrayLike, dW: npt.ArrayLike, dt: Optional[npt.ArrayLike] = None) -> npt.NDArray[np.float64]:
+            Sample one step of length dt, dW is ignored.
+        simulate(start: int, stop: int) -> npt.NDArray[np.float64]:
+            Sample a block of chains on t_grid (shape (stop-start, len(t_grid))).
+    """
+
+    def __init__(self, a: SDEFn, b: SDEFn, t_start: int, t_stop: int, num_chains: int, num_workers: int = 1, Y0: float = 0.0, vectorized: bool = True, chunk_size: Optional[int] = None, tolerance: Optional[float] = None, tolerance_target: str = "mean", time_budget: Optional[float] = None, seed: Optional[int] = 0, stream_key: Sequence[int] = (), dt: Optional[float] = None, stream_size: int = 1024, transition: Optional[TransitionFn] = None, t_grid: Optional[Sequence[float]] = None, num_params: Optional[int] = None):
+        # Transitions sample a whole group of chains from one generator, so streams cover stream_size chains
+        super().__init__(a, b, t_start, t_stop, num_chains, num_workers, Y0, vectorized, chunk_size, tolerance=tolerance, tolerance_target=tolerance_target, time_budget=time_budget, seed=seed, stream_key=stream_key, dt=dt, t_grid=t_grid, num_params=num_params, stream_size=stream_size)
+        if transition is None:
+            raise ValueError("ExactSolver requires a transition sampler.")
+        self.transition = transition
+        self._step_rng = self.rng(2)
+
+    def step(self, Y_prev: npt.ArrayLike, t: npt.ArrayLike, dW: npt.ArrayLike, dt: Optional[npt.ArrayLike] = None) -> npt.NDArray[np.float64]:
+        return self.transition(np.asarray(Y_prev, dtype=np.float64), t, self.dt if dt is None else dt, self._step_rng)
+
+    def integrate(self, dW: npt.NDArray[np.float64]) -> npt.NDArray[np.float64]:
+        raise NotImplementedError("ExactSolver samples transitions, it is not driven by Wiener increments.")
+
+    def _simulate_block(self, start: int, stop: int) -> tuple[npt.NDArray[np.float64], None]:
+        """
+        Samples the block of chains [start, stop) on t_grid, one transition draw per grid interval and stream.
+        """
+
+        S = self.stream_size
+        streams = [(slice(lo-start, min(lo+S, stop)-start), self.rng(0, lo//S)) for lo in range(start, stop, S)]
+        t = self.t_grid
+        Y = np.empty((self.N, *self._state_shape(stop-start)))
+        Y[0] = self._initial_state()
+        for i in range(1, self.N):
+            for cols, rng in streams:
+                Y[i, ..., cols] = self.transition(Y[i-1, ..., cols], t[i-1], t[i]-t[i-1], rng)
+        return np.moveaxis(Y, 0, -1), None
@@ -0,0 +1,178 @@
+import atexit
+import uuid
+import pickle
+import logging
+import multiprocessing as mp
+from collections import deque
+from multiprocessing import shared_memory, resource_tracker
+from typing import Iterator, Optional
+
+import numpy as np
+import numpy.typing as npt
+
+
+log = logging.getLogger(__name__)
+
+# Per-worker cache of the solver of the current run
+_worker_state = {}
+
+def _dill():
+    """
+    dill with the serializer settings, imported by parallel runs only.
+    """
+
+    import dill
+    dill.settings['recurse'] = True
+    return dill
+
+def _serialize(solver) -> tuple[bytes, bool]:
+    """
+    Pickles the solver, so workers rebuild its model from the class and parameter arrays.
+    Falls back to dill for what pickle cannot reference by name (lambdas, closures, locally defined functions).
+
+    Returns:
+        tuple[bytes, bool]: Payload and whether it needs dill to load.
+    """
+
+    try:
+        return pickle.dumps(solver, protocol=pickle.HIGHEST_PROTOCOL), False
+    except (pickle.PicklingError, AttributeError, TypeError) as e:
+        log.info(f"Solver is not picklable ({e}), serializing it with dill.")
+        return _dill().dumps(solver), True
+
+def _write_block(name: str, shape: tuple[int, ...], block: npt.NDArray[np.float64]):
+    shm = shared_memory.SharedMemory(name=name)
+    try:
+        buf = np.ndarray(shape, dtype=np.float64, buffer=shm.buf)
+        buf[..., :block.shape[-2], :] = block
+        del buf
+    finally:
+        shm.close()
+
+def _worker_block(token: str, payload_name: str, payload_size: int, use_dill: bool, start: int, stop: int, out_name: str, control_name: Optional[str], shape: tuple[int, ...]) -> bool:
+    """
+    Simulates chains [start, stop) in a worker and writes them to the shared out (and control) slot.
+    The solver is deserialized from shared memory once per run and worker.
+    """
+
+    if _worker_state.get("token") != token:
+        shm = shared_memory.SharedMemory(name=payload_name)
+        try:
+            payload = bytes(shm.buf[:payload_size])
+            solver = _dill().loads(payload) if use_dill else pickle.loads(payload)
+        finally:
+            shm.close()
+        _worker_state.clear()
+        _worker_state.update(token=token, solver=solver)
+
+    Y, C = _worker_state["solver"]._simulate_block(start, stop)
+    _write_block(out_name, shape, Y)
+    if C is not None:
+        _write_block(control_name, shape, C)
+    return C is not None
+
+
+class Executor:
+    """
+    Long-lived process pool shared by all solver runs in a process.
+    Per run, the solver is serialized once into shared memory, workers write chain blocks straight into
+    a ring of shared-memory slots and only block indices travel through the pool's pipes.
+
+    The solver is pickled: its coefficients should be methods of a model or module-level functions, which travel
+    as a class or function name plus the parameter arrays. Lambdas and closures (e.g. sympy-lambdified derivatives)
+    fall back to dill, which serializes their code and globals and must produce the same functions in the workers.
+
+    Attributes:
+        num_workers (int): Number of worker processes.
+
+    Methods:
+        map_blocks(solver: SDESolver, ranges: list[tuple[int, int]]) -> Iterator[tuple[npt.NDArray[np.float64], Optional[npt.NDArray[np.float64]]]]:
+            Simulates the chain ranges in parallel, yielding (block, control block) in order.
+        close():
+            Stops the workers.
+    """
+
+    def __init__(self, num_workers: int):
+        self.num_workers = num_workers
+        # Workers must share the parent's tracker, or each would report attached segments as leaked
+        resource_tracker.ensure_running()
+        self._pool = mp.get_context().Pool(num_workers)
+
+    def map_blocks(self, solver, ranges: list[tuple[int, int]]) -> Iterator[tuple[npt.NDArray[np.float64], Optional[npt.NDArray[np.float64]]]]:
+        """
+        Args:
+            solver (SDESolver): Solver whose _simulate_block runs in the workers.
+            ranges (list[tuple[int, int]]): Chain ranges [start, stop).
+
+        Yields:
+            tuple[npt.NDArray[np.float64], Optional[npt.NDArray[np.float64]]]: Chains and control paths (or None) of each range.
+        """
+
+        token = uuid.uuid4().hex
+        payload, use_dill = _serialize(solver)
+        # Slots hold the largest block, with the parameter sets of a batch leading
+        shape = (*solver._state_shape(max(stop-start for start, stop in ranges)), solver.N)
+        nbytes = int(np.prod(shape))*np.dtype(np.float64).itemsize
+        num_slots = min(2*self.num_workers, len(ranges))
+
+        segments = []
+        def segment(size: int) -> shared_memory.SharedMemory:
+            shm = shared_memory.SharedMemory(create=True, size=max(size, 1))
+            segments.append(shm)
+            return shm
+
+        pending = deque()
+        try:
+            payload_shm = segment(len(payload))
+            payload_shm.buf[:len(payload)] = payload
+            out = [segment(nbytes) for _ in range(num_slots)]
+            control = [segment(nbytes) if solver.control_variate else None for _ in range(num_slots)]
+
+            todo = iter(ranges)
+            def submit(slot: int):
+                r = next(todo, None)
+                if r is None:
+                    return
+                args = (token, payload_shm.name, len(payload), use_dill, *r, out[slot].name, control[slot].name if control[slot] else None, shape)
+                pending.append((r, slot, self._pool.apply_async(_worker_block, args)))
+
+            for slot in range(num_slots):
+                submit(slot)
+            while pending:
+                (start, stop), slot, result = pending.popleft()
+                has_control = result.get()
+                Y = np.ndarray(shape, dtype=np.float64, buffer=out[slot].buf)[..., :stop-start, :].copy()
+                C = np.ndarray(shape, dtype=np.float64, buffer=control[slot].buf)[..., :stop-start, :].copy() if has_control else None
+                submit(slot)
+                yield Y, C
+        finally:
+            for _, _, result in pending:
+                result.wait()
+            for shm in segments:
+                shm.close()
+                shm.unlink()
+
+    def close(self):
+        self._pool.terminate()
+        self._pool.join()
+
+
+_executors: dict[int, Executor] = {}
+
+def get_executor(num_workers: int) -> Executor:
+    """
+    Returns the process-wide executor with num_workers workers, starting it on first use.
+    """
+
+    if num_workers not in _executors:
+        _executors[num_workers] = Executor(num_workers)
+    return _executors[num_workers]
+
+@atexit.register
+def shutdown():
+    """
+    Stops all executors.
+    """
+
+    while _executors:
+        _executors.popitem()[1].close()
@@ -1,9 +1,9 @@
+from typing import Optional, Sequence
+
 import numpy as np
 import numpy.typing as npt
-import sympy as sym
-from sympy.abc import x, y
 
-from .sde_solver import SDESolver, SDEFn
+from .sde_solver import SDESolver, SDEFn, DerivativesFn
 
 
 class Milstein(SDESolver):
@@ -13,26 +13,50 @@ class Milstein(SDESolver):
     Attributes:
         a (SDEFn): Drift coefficient function.
         b (SDEFn): Diffusion coefficient function.
-        b_prime (SDEFn): Derivative of the diffusion coefficient function.
+        b_prime (SDEFn): Derivative of the diffusion coefficient function, derived symbolically from b when not given.
         t_start (int): Start time.
         t_stop (int): Stop time.
         N (int): Number of time steps.
         num_chains (int): Number of chains.
         num_workers (int): Number of workers for parallel computation.
         Y0 (float): starting point for chain.
+        vectorized (bool): Whether all chains are advanced at once.
+        chunk_size (int): Number of chains simulated together in one block.
+        variance_reduction (Optional[str]): None, "antithetic", "sobol" or "halton" increments.
+        control_variate (bool): Whether a control-variate mean is estimated.
+        tolerance (Optional[float]): Target standard error of the mean or quantiles, chains are generated until it is met.
+        t_grid (npt.NDArray[np.float64]): Times of the path points, possibly non-uniform.
+        adaptive (bool): Whether the solver steps through a grid chosen by step doubling and reports on t_grid.
+        num_params (Optional[int]): Number of parameter sets of a batched model stepped together.
+        sensitivities (bool): Whether paths carry their tangents dY/dp with respect to each model parameter.
 
     Methods:
-        step(dt: float, dW: SDEFn, Y_prev: float) -> npt.NDArray[np.float64]:
+        step(Y_prev: npt.ArrayLike, t: npt.ArrayLike, dW: npt.ArrayLike, dt: Optional[npt.ArrayLike] = None) -> npt.NDArray[np.float64]:
             Perform a single Milstein step.
+
+        tangent_step(state: npt.NDArray[np.float64], t: float, dW: npt.ArrayLike, dt: Optional[float] = None) -> npt.NDArray[np.float64]:
+            Milstein step of the paths and its derivative, the Euler-Maruyama tangent plus (m_y*J + m_p)*(dW^2-dt)/2 for m = b*db/dY.
     """
 
-    def __init__(self, a: SDEFn, b: SDEFn, t_start: int, t_stop: int, num_chains: int, num_workers: int = 1, Y0: float = 0.0):
-        super().__init__(a, b, t_start, t_stop, num_chains, num_workers, Y0)
-        b_prime = sym.diff(self.b(x, y), x)
-        self.b_prime = sym.lambdify([x, y], b_prime, "numpy")
+    def __init__(self, a: SDEFn, b: SDEFn, t_start: int, t_stop: int, num_chains: int, num_workers: int = 1, Y0: float = 0.0, vectorized: bool = False, chunk_size: Optional[int] = None, variance_reduction: Optional[str] = None, control_variate: bool = False, tolerance: Optional[float] = None, tolerance_target: str = "mean", time_budget: Optional[float] = None, seed: Optional[int] = 0, stream_key: Sequence[int] = (), dt: Optional[float] = None, t_grid: Optional[Sequence[float]] = None, adaptive: bool = False, step_tolerance: float = 1e-3, max_refine: int = 2, max_coarsen: int = 4, pilot_chains: int = 32, num_params: Optional[int] = None, sensitivities: bool = False, derivatives: Optional[DerivativesFn] = None, dY0: Optional[npt.ArrayLike] = None, stream_size: int = 1024, b_prime: Optional[SDEFn] = None):
+        super().__init__(a, b, t_start, t_stop, num_chains, num_workers, Y0, vectorized, chunk_size, variance_reduction, control_variate, tolerance, tolerance_target, time_budget, seed, stream_key, dt, t_grid, adaptive, step_tolerance, max_refine, max_coarsen, pilot_chains, num_params, sensitivities, derivatives, dY0, stream_size)
+        if b_prime is None:
+            # Differentiate once here, the compiled derivative is what runs per step
+            import sympy as sym
+            from sympy.abc import x, y
+            b_prime = sym.lambdify([x, y], sym.diff(self.b(x, y), x), "numpy")
+        self.b_prime = b_prime
 
-    def step(self, Y_prev: float, t: float) -> npt.NDArray[np.float64]:
-        dt = self.dt
-        dW_val = self.dW(dt)
+    def step(self, Y_prev: npt.ArrayLike, t: npt.ArrayLike, dW: npt.ArrayLike, dt: Optional[npt.ArrayLike] = None) -> npt.NDArray[np.float64]:
+        dt = self.dt if dt is None else dt
         b_val = self.b(Y_prev, t)
-        return Y_prev + self.a(Y_prev, t)*dt + b_val*dW_val+ 0.5*b_val*self.b_prime(Y_prev, t)*((dW_val**2)-dt)
+        return Y_prev + self.a(Y_prev, t)*dt + b_val*dW+ 0.5*b_val*self.b_prime(Y_prev, t)*((dW**2)-dt)
+
+    def tangent_step(self, state: npt.NDArray[np.float64], t: float, dW: npt.ArrayLike, dt: Optional[float] = None) -> npt.NDArray[np.float64]:
+        dt = self.dt if dt is None else dt
+        Y, J = state[0], state[1:]
+        d = self.derivatives(Y, t)
+        out = np.empty_like(state)
+        out[0] = self.step(Y, t, dW, dt)
+        out[1:] = J + (d["a_y"]*J + d["a_p"])*dt + (d["b_y"]*J + d["b_p"])*dW + 0.5*(d["m_y"]*J + d["m_p"])*((dW**2)-dt)
+        return out
@@ -1,15 +1,25 @@
-from typing import Callable, TypeAlias
+import time
+import logging
+from typing import Callable, Iterator, Optional, Sequence, TypeAlias, Union
 from abc import ABCMeta, abstractmethod
-
-from pathos.multiprocessing import ProcessPool as Pool
-import dill
+from pathlib import Path
 
 import numpy as np
 import numpy.typing as npt
-from tqdm import tqdm
+
+from stats import Accumulator, ControlVariateMean, StandardErrorMonitor
+from instrumentation import Progress
+from .executor import get_executor
+from .variance_reduction import VARIANCE_REDUCTION, brownian_bridge, qmc_normals
 
 
 SDEFn: TypeAlias = Callable[[float, float], float]
+DerivativesFn: TypeAlias = Callable[[npt.NDArray[np.float64], float], dict[str, npt.NDArray[np.float64]]]
+
+log = logging.getLogger(__name__)
+
+# Fewest random streams a run is split into, so small runs still have blocks to spread over workers
+MIN_STREAMS = 16
 
 class SDESolver(metaclass=ABCMeta):
     """
@@ -18,21 +28,72 @@ class SDESolver(metaclass=ABCMeta):
     Attributes:
         a (SDEFn): The drift coefficient function.
         b (SDEFn): The diffusion coefficient function.
-        N (int): Number of time steps.
+        N (int): Number of time points of the paths.
         num_chains (int): Number of independent chains to simulate.
-        dt (float): Time step size.
-        num_workers (int): Number of worker threads to use for parallel execution.
-        dW (Callable): Function to generate random increments for the Wiener process.
+        dt (float): Time step size, 1/N unless given.
+        t_grid (npt.NDArray[np.float64]): Times of the path points, uniform with step dt from t_start unless given.
+        steps (npt.NDArray[np.float64]): Lengths of the N-1 intervals of t_grid.
+        adaptive (bool): Whether the solver steps through its own grid, chosen by step doubling, instead of t_grid.
+        step_tolerance (float): Local error accepted per adaptive step.
+        max_refine (int): Adaptive steps go down to 1/2**max_refine of a t_grid interval.
+        max_coarsen (int): Adaptive steps go up to 2**max_coarsen t_grid intervals.
+        pilot_chains (int): Number of chains the adaptive grid is chosen on.
+        num_params (Optional[int]): Number of parameter sets of a batched model simulated together, None for a single set.
+        sensitivities (bool): Whether paths carry their tangents dY/dp, the derivatives with respect to each model parameter.
+        derivatives (Optional[DerivativesFn]): Coefficient derivatives of the model (IRModel.derivatives) driving the tangents.
+        dY0 (Optional[npt.NDArray[np.float64]]): Derivatives of Y0 with respect to each parameter, the initial tangents.
+        sim_grid (Optional[npt.NDArray[np.float64]]): Times the solver steps through, t_grid unless adaptive (chosen on first use).
+        num_workers (int): Number of worker processes to use for parallel execution, from a pool shared across runs.
+        vectorized (bool): Whether a and b accept arrays, so all chains can be advanced at once.
+        chunk_size (int): Number of chains simulated together in one block.
+        variance_reduction (Optional[str]): None, "antithetic", "sobol" or "halton" increments.
+        control_variate (bool): Whether linearised (Vasicek) control paths are simulated alongside.
+        control (Optional[ControlVariateMean]): Control-variate mean estimate of the last run.
+        tolerance (Optional[float]): Target standard error, chains are generated until it is met.
+        tolerance_target (str): "mean" or "quantile", what the tolerance applies to.
+        time_budget (Optional[float]): Wall-clock budget in seconds for tolerance runs.
+        chains_used (int): Number of chains generated by the last run.
+        seed (np.random.SeedSequence): Root of all random streams, chain c draws from the Philox stream spawned at (0, c // stream_size).
+        stream_size (int): Number of consecutive chains sharing one stream (even for antithetic pairs), at most a MIN_STREAMS-th
+            of the chains, blocks always start on a stream boundary.
+        chain_start (int): First chain simulated by this process, 0 unless sharded.
+        chain_stop (int): Index past the last chain simulated by this process, num_chains unless sharded.
 
     Methods:
-        step(dt: float, Y_prev: float, t: float) -> npt.NDArray[np.float64]:
+        step(Y_prev: npt.ArrayLike, t: npt.ArrayLike, dW: npt.ArrayLike, dt: Optional[npt.ArrayLike] = None) -> npt.NDArray[np.float64]:
             Abstract method to perform a single step of the SDE solver.
+
+        tangent_step(state: npt.NDArray[np.float64], t: float, dW: npt.ArrayLike, dt: Optional[float] = None) -> npt.NDArray[np.float64]:
+            A step of the paths and of their tangents, the derivative of the step.
         
-        run() -> npt.NDArray[np.float64]:
+        rng(*key: int) -> np.random.Generator:
+            Independent generator for the stream at key below the root seed.
+
+        increments(start: int, stop: int) -> npt.NDArray[np.float64]:
+            Wiener increments of the block of chains [start, stop), on t_grid merged with sim_grid when adaptive.
+
+        simulate(start: int, stop: int) -> npt.NDArray[np.float64]:
+            Simulates the block of chains [start, stop).
+
+        integrate(dW: npt.NDArray[np.float64]) -> npt.NDArray[np.float64]:
+            Paths driven by given increments, e.g. common random numbers reused across runs.
+
+        shard(index: int, count: int):
+            Restricts the run to shard index of count, whole chunks of chains.
+
+        iter_chunks() -> Iterator[tuple[int, npt.NDArray[np.float64]]]:
+            Yields (start, block) pairs of chunk_size chains, without keeping earlier blocks.
+            Blocks of a parameter batch are (num_params, block size, N), every set driven by the same increments,
+            blocks of a sensitivity run (1+len(dY0), block size, N), the paths followed by dY/dp for each parameter.
+
+        accumulate(accumulators: Sequence[Accumulator]):
+            Feeds every block to the accumulators without keeping the chains.
+
+        run(out: Optional[Union[str, Path]] = None, accumulators: Sequence[Accumulator] = ()) -> npt.NDArray[np.float64]:
             Runs the solver for the specified number of chains and time steps, returning the results as a NumPy array.
     """
 
-    def __init__(self, a: SDEFn, b: SDEFn, t_start: int, t_stop: int, num_chains: int, num_workers: int = 1, Y0: float = 0.0):
+    def __init__(self, a: SDEFn, b: SDEFn, t_start: int, t_stop: int, num_chains: int, num_workers: int = 1, Y0: float = 0.0, vectorized: bool = False, chunk_size: Optional[int] = None, variance_reduction: Optional[str] = None, control_variate: bool = False, tolerance: Optional[float] = None, tolerance_target: str = "mean", time_budget: Optional[float] = None, seed: Optional[int] = 0, stream_key: Sequence[int] = (), dt: Optional[float] = None, t_grid: Optional[Sequence[float]] = None, adaptive: bool = False, step_tolerance: float = 1e-3, max_refine: int = 2, max_coarsen: int = 4, pilot_chains: int = 32, num_params: Optional[int] = None, sensitivities: bool = False, derivatives: Optional[DerivativesFn] = None, dY0: Optional[npt.ArrayLike] = None, stream_size: int = 1024):
         """
         Initializes the SolverBase with the given parameters.
 
@@ -41,9 +102,39 @@ class SDESolver(metaclass=ABCMeta):
             b (SDEFn): The diffusion coefficient function.
             t_start (int): Start time of the simulation.
             t_stop (int): Stop time of the simulation.
-            num_chains (int): Number of independent chains to simulate.
+            num_chains (int): Number of independent chains to simulate, the chain budget when tolerance is set.
             num_workers (int): Number of worker threads to use for parallel execution (default is 1).
             Y0 (float): starting point for chain.
+            vectorized (bool): Advance all chains together with array-valued a and b (default is False).
+            chunk_size (Optional[int]): Number of chains per block, by default one block per worker (all chains at once with one worker).
+            variance_reduction (Optional[str]): "antithetic" path pairs, or "sobol"/"halton" quasi-random increments with Brownian bridge construction.
+            control_variate (bool): Estimate the mean with a control variate, a Vasicek process linearised at Y0 with known mean, driven by the same increments.
+            tolerance (Optional[float]): Stop once the largest per-step standard error of the target falls below this.
+            tolerance_target (str): "mean" (control-variate mean if enabled) or "quantile" (quantile bands, by batch means).
+            time_budget (Optional[float]): Stop a tolerance run after this many seconds.
+            seed (Optional[int]): Root seed, fresh entropy (logged) when None. Results do not depend on chunk_size or num_workers.
+            stream_key (Sequence[int]): Spawn key separating runs that share a root seed, e.g. fit and forecast.
+            dt (Optional[float]): Time step in model time units, 1/N (the whole run is one unit) by default.
+            t_grid (Optional[Sequence[float]]): Explicit, possibly non-uniform, times of the path points, replacing t_start, t_stop and dt.
+            adaptive (bool): Step through a grid chosen by step doubling (vectorized models) and report on t_grid, one step per t_grid interval otherwise.
+            step_tolerance (float): Largest accepted difference between one step and two half steps, over the pilot chains.
+            max_refine (int): Number of halvings of a t_grid interval allowed to adaptive steps.
+            max_coarsen (int): Number of doublings of a t_grid interval allowed to adaptive steps.
+            pilot_chains (int): Number of chains, from a stream of their own, the adaptive grid is chosen on.
+            num_params (Optional[int]): Number of parameter sets when a, b and Y0 broadcast against a (num_params, num_chains) state
+                (IRModel.scenarios), all sets share every chain's increments (common random numbers).
+            sensitivities (bool): Propagate tangents (forward-mode derivatives) of every path with respect to every model
+                parameter alongside it, all pathwise sensitivities from one pass.
+            derivatives (Optional[DerivativesFn]): Coefficient derivatives, required for sensitivities.
+            dY0 (Optional[npt.ArrayLike]): Initial tangents, required for sensitivities.
+            stream_size (int): Consecutive chains drawing, in order, from one random stream, so a generator is set up per group
+                rather than per chain. Capped so a run has at least MIN_STREAMS groups, chunks are rounded down to whole groups
+                (at least one). Results depend on it and num_chains but not on chunk_size or num_workers.
+
+        Raises:
+            ValueError: If variance_reduction is unknown, t_grid is not strictly increasing, an adaptive model is not vectorized,
+                or a parameter batch or sensitivities are combined with a scalar model, adaptive steps, a control variate or a tolerance,
+                or sensitivities lack derivatives or are combined with a parameter batch.
         """
 
         self.a = a
@@ -53,21 +144,76 @@ class SDESolver(metaclass=ABCMeta):
         self.N = (t_stop-t_start)+1
         self.num_chains = num_chains
         self.Y0 = Y0
-        self.dt = 1/self.N
+        self.dt = 1/self.N if dt is None else dt
+        if t_grid is None:
+            self.t_grid = t_start+np.arange(self.N)*self.dt
+            self.steps = np.full(self.N-1, self.dt)
+        else:
+            self.t_grid = np.asarray(t_grid, dtype=np.float64)
+            if self.t_grid.ndim != 1 or len(self.t_grid) < 2 or np.any(np.diff(self.t_grid) <= 0):
+                raise ValueError("t_grid must be a strictly increasing 1D array of at least 2 times.")
+            self.N = len(self.t_grid)
+            self.steps = np.diff(self.t_grid)
+        if adaptive and not vectorized:
+            raise ValueError("Adaptive stepping requires a vectorized model.")
+        if num_params is not None and (not vectorized or adaptive or control_variate or tolerance is not None):
+            raise ValueError("Parameter batches require a vectorized model without adaptive steps, control variate or tolerance.")
+        self.num_params = num_params
+        if sensitivities and (derivatives is None or dY0 is None):
+            raise ValueError("Sensitivities require the model's derivatives and initial tangents.")
+        if sensitivities and (num_params is not None or not vectorized or adaptive or control_variate or tolerance is not None):
+            raise ValueError("Sensitivities require a vectorized single-set model without adaptive steps, control variate or tolerance.")
+        self.sensitivities = sensitivities
+        self.derivatives = derivatives
+        self.dY0 = None if dY0 is None else np.asarray(dY0, dtype=np.float64)
+        self.adaptive = adaptive
+        self.step_tolerance = step_tolerance
+        self.max_refine = max_refine
+        self.max_coarsen = max_coarsen
+        self.pilot_chains = pilot_chains
+        self.sim_grid = None if adaptive else self.t_grid
+        # Times of the sampled Wiener path
+        self._noise_t = self.t_grid
+        self._noise_steps = self.steps
         self.num_workers = num_workers
-        self.dW = lambda _ : np.random.normal(loc=0.0, scale=np.sqrt(self.dt))
-
-        # Serializer settings
-        dill.settings['recurse'] = True
+        self.vectorized = vectorized
+        self.seed = np.random.SeedSequence(seed, spawn_key=tuple(stream_key))
+        if seed is None:
+            log.info(f"Root seed {self.seed.entropy}.")
+        if variance_reduction not in VARIANCE_REDUCTION:
+            raise ValueError(f"Unknown variance reduction: {variance_reduction}")
+        self.variance_reduction = variance_reduction
+        stream_size = max(1, min(stream_size, -(-num_chains//MIN_STREAMS)))
+        # Pairs must not straddle two streams
+        self.stream_size = stream_size+stream_size%2 if variance_reduction == "antithetic" else stream_size
+        if chunk_size is None and tolerance is not None:
+            # Enough batches to check the tolerance along the way
+            chunk_size = max(2, -(-num_chains//64))
+        elif chunk_size is None:
+            # One block per worker, a single process runs vectorized models in one block
+            chunk_size = -(-num_chains//num_workers)
+        # Blocks must not split streams, rounding down keeps every block within the requested size
+        chunk_size = max(1, min(chunk_size, num_chains))
+        self.chunk_size = max(1, chunk_size//self.stream_size)*self.stream_size
+        self.control_variate = control_variate
+        self.control = None
+        self.tolerance = tolerance
+        self.tolerance_target = tolerance_target
+        self.time_budget = time_budget
+        self.chains_used = 0
+        self.chain_start = 0
+        self.chain_stop = num_chains
 
     @abstractmethod
-    def step(self, Y_prev: float, t: float) -> npt.NDArray[np.float64]:
+    def step(self, Y_prev: npt.ArrayLike, t: npt.ArrayLike, dW: npt.ArrayLike, dt: Optional[npt.ArrayLike] = None) -> npt.NDArray[np.float64]:
         """
         Method to perform a single step of the SDE solver.
 
         Args:
-            Y_prev (float): Previous value of the process.
-            t (float): Timestep.
+            Y_prev (npt.ArrayLike): Previous value of the process, scalar or one value per chain.
+            t (npt.ArrayLike): Timestep, broadcasting with Y_prev.
+            dW (npt.ArrayLike): Wiener increment(s) for this step, same shape as Y_prev.
+            dt (Optional[npt.ArrayLike]): Step length(s) broadcasting with Y_prev, self.dt if None.
 
         Returns:
             npt.NDArray[np.float64]: The new value of the process after the step.
@@ -75,33 +221,383 @@ class SDESolver(metaclass=ABCMeta):
 
         pass
 
-    def run(self) -> npt.NDArray[np.float64]:
+    def tangent_step(self, state: npt.NDArray[np.float64], t: float, dW: npt.ArrayLike, dt: Optional[float] = None) -> npt.NDArray[np.float64]:
+        """
+        Advances the paths together with their tangents, the step differentiated with respect to every parameter.
+
+        Args:
+            state (npt.NDArray[np.float64]): Paths in row 0 and their derivatives dY/dp in the following rows, shape (1+P, num_chains).
+            t (float): Timestep.
+            dW (npt.ArrayLike): Wiener increments, one per chain.
+            dt (Optional[float]): Step length, self.dt if None.
+
+        Returns:
+            npt.NDArray[np.float64]: The state after the step.
+
+        Raises:
+            NotImplementedError: If the solver has no tangent step.
+        """
+
+        raise NotImplementedError(f"{type(self).__name__} has no tangent step.")
+
+    def rng(self, *key: int) -> np.random.Generator:
+        """
+        Philox generator for the stream spawned at key below the root seed, the same for any block layout or process.
+
+        Args:
+            key (int): Spawn key, (0, stream) for chain noise.
+
+        Returns:
+            np.random.Generator: A fresh generator at the start of the stream.
+        """
+
+        seq = np.random.SeedSequence(self.seed.entropy, spawn_key=self.seed.spawn_key+key)
+        return np.random.Generator(np.random.Philox(seq))
+
+    def increments(self, start: int, stop: int) -> npt.NDArray[np.float64]:
+        """
+        Wiener increments for the block of chains [start, stop), every group of stream_size chains drawn in order from its
+        own stream, so a block ending mid-group (the last one) draws a prefix of it. Antithetic chains come in pairs (2k, 2k+1) with mirrored increments, quasi-random increments
+        use points start..stop of one sequence so blocks line up. Adaptive runs sample the Wiener path
+        at the points of both t_grid and sim_grid.
+
+        Args:
+            start (int): Index of the first chain.
+            stop (int): Index past the last chain.
+
+        Returns:
+            npt.NDArray[np.float64]: Array of shape (N-1, stop-start), one row per interval of the merged grid when adaptive.
+        """
+
+        self._plan()
+        M = len(self._noise_steps)
+        if self.variance_reduction in ("sobol", "halton"):
+            Z = qmc_normals(self.variance_reduction, M, start, stop-start, seed=self.rng(1))
+            return brownian_bridge(Z, self._noise_t).T
+        Z = np.empty((stop-start, M))
+        S = self.stream_size
+        antithetic = self.variance_reduction == "antithetic"
+        for lo in range(start, stop, S):
+            hi = min(lo+S, stop)
+            if antithetic:
+                # Only the first chain of each pair draws
+                Z[lo-start:hi-start:2] = self.rng(0, lo//S).standard_normal((-(-(hi-lo)//2), M))
+            else:
+                self.rng(0, lo//S).standard_normal(out=Z[lo-start:hi-start])
+        if antithetic:
+            Z[1::2] = -Z[:len(Z)-1:2]
+        Z *= np.sqrt(self._noise_steps)
+        return np.ascontiguousarray(Z.T)
+
+    def simulate(self, start: int, stop: int) -> npt.NDArray[np.float64]:
+        """
+        Simulates the block of chains [start, stop).
+
+        Args:
+            start (int): Index of the first chain.
+            stop (int): Index past the last chain.
+
+        Returns:
+            npt.NDArray[np.float64]: Array of shape (stop-start, N), (num_params, stop-start, N) for a parameter batch.
+        """
+
+        return self._simulate_block(start, stop)[0]
+
+    def integrate(self, dW: npt.NDArray[np.float64]) -> npt.NDArray[np.float64]:
+        """
+        Simulates one chain per column of given increments, from Y0 with the current a and b.
+
+        Args:
+            dW (npt.NDArray[np.float64]): Increments from increments(), shape (N-1, num_chains) or on the merged grid when adaptive.
+
+        Returns:
+            npt.NDArray[np.float64]: Array of shape (num_chains, N), (num_params, num_chains, N) for a parameter batch.
+        """
+
+        if self.vectorized:
+            return self._simulate_vectorized(dW)
+        return np.stack([self._simulate_chain(i, dW[:, i]) for i in range(dW.shape[1])])
+
+    def shard(self, index: int, count: int):
+        """
+        Restricts the run to the index-th of count shards. Shards are contiguous runs of whole chunks,
+        so together they produce exactly the chains and blocks of an unsharded run.
+
+        Args:
+            index (int): Shard index, 0 <= index < count.
+            count (int): Number of shards.
+
+        Raises:
+            ValueError: If the index is out of range, or a tolerance is set (sharded runs cannot stop early together).
+        """
+
+        if not 0 <= index < count:
+            raise ValueError(f"Shard {index} out of range for {count} shards.")
+        if self.tolerance is not None:
+            raise ValueError("Sharded runs do not support a tolerance.")
+        chunks = -(-self.num_chains//self.chunk_size)
+        self.chain_start = min(index*chunks//count*self.chunk_size, self.num_chains)
+        self.chain_stop = min((index+1)*chunks//count*self.chunk_size, self.num_chains)
+
+    def _simulate_block(self, start: int, stop: int) -> tuple[npt.NDArray[np.float64], Optional[npt.NDArray[np.float64]]]:
+        """
+        Simulates the block of chains [start, stop) and, with control_variate, the matching control paths.
+        """
+
+        dW = self.increments(start, stop)
+        if self.vectorized:
+            Y = self._simulate_vectorized(dW)
+        else:
+            Y = np.stack([self._simulate_chain(i, dW[:, i-start]) for i in range(start, stop)])
+        C = self._simulate_control(dW) if self.control_variate else None
+        return Y, C
+
+    def _state_shape(self, chains: int) -> tuple[int, ...]:
+        if self.sensitivities:
+            return (1+len(self.dY0), chains)
+        return (chains,) if self.num_params is None else (self.num_params, chains)
+
+    def _initial_state(self) -> npt.ArrayLike:
+        # One starting point per parameter set or tangent, broadcast over the chains
+        if self.sensitivities:
+            return np.append(self.Y0, self.dY0)[:, None]
+        return self.Y0 if self.num_params is None else np.reshape(self.Y0, (-1, 1))
+
+    def _simulate_vectorized(self, dW: npt.NDArray[np.float64]) -> npt.NDArray[np.float64]:
+        """
+        Advances the whole block at once, one step call per timestep, using a single pre-drawn (N-1, num_chains) block of increments.
+        A parameter batch steps a (num_params, num_chains) state, each row of increments broadcast over the parameter sets,
+        a sensitivity run the paths stacked on their tangents.
+        """
+
+        self._plan()
+        if self.adaptive:
+            return self._simulate_adaptive(dW)
+        N = self.N
+        Y = np.empty((N, *self._state_shape(dW.shape[1])))
+        Y[0] = self._initial_state()
+        t, h = self.t_grid, self.steps
+        step = self.tangent_step if self.sensitivities else self.step
+        for i in range(1, N):
+            Y[i] = step(Y[i-1], t[i-1], dW[i-1], h[i-1])
+        return np.moveaxis(Y, 0, -1)
+
+    def _plan(self):
+        """
+        Chooses sim_grid of an adaptive run, once per solver. Pilot chains walk a grid refining every t_grid interval
+        2**max_refine times: each step is compared with two half steps driven by the same pilot path, rejected and halved
+        while they differ by more than step_tolerance on any pilot chain, and the next step is doubled while they agree within half of it.
+        Steps are dyadic blocks of the refined grid. The pilot noise comes from a stream of its own, so the grid does not
+        depend on the simulated chains and step sizes never peek at their increments (which biases Euler-Maruyama).
+        """
+
+        if self.sim_grid is not None:
+            return
+        R = 2**self.max_refine
+        top = self.max_refine+self.max_coarsen
+        t = np.append(self.t_grid[:-1, None] + (self.steps/R)[:, None]*np.arange(R), self.t_grid[-1])
+        F = len(t)-1
+        W = np.zeros((F+1, self.pilot_chains))
+        np.cumsum(self.rng(3).standard_normal((F, self.pilot_chains))*np.sqrt(np.diff(t))[:, None], axis=0, out=W[1:])
+
+        y = np.full(self.pilot_chains, self.Y0, dtype=np.float64)
+        points = [0]
+        p, level = 0, self.max_refine
+        while p < F:
+            # Largest dyadic step that starts aligned at p and ends by F
+            lv = min(level, (p & -p).bit_length()-1 if p else top, (F-p).bit_length()-1)
+            s, m = 1 << lv, (1 << lv) >> 1
+            coarse = self.step(y, t[p], W[p+s]-W[p], t[p+s]-t[p])
+            # A step of the finest level has m = 0, its half step is the identity and its error 0
+            half = self.step(y, t[p], W[p+m]-W[p], t[p+m]-t[p])
+            fine = self.step(half, t[p+m], W[p+s]-W[p+m], t[p+s]-t[p+m])
+            err = np.max(np.abs(fine-coarse))
+            if err > self.step_tolerance:
+                level = lv-1
+                continue
+            y = fine
+            p += s
+            points.append(p)
+            level = min(lv+1, top) if err <= self.step_tolerance/2 else lv
+
+        points = np.array(points)
+        report = np.arange(self.N)*R
+        merged = np.union1d(points, report)
+        self.sim_grid = t[points]
+        self._noise_t = t[merged]
+        self._noise_steps = np.diff(self._noise_t)
+        self._step_index = np.searchsorted(merged, points)
+        self._report_index = np.searchsorted(merged, report)
+        log.info(f"Adaptive grid of {len(points)-1} steps for {self.N-1} reporting intervals.")
+
+    def _simulate_adaptive(self, dW: npt.NDArray[np.float64]) -> npt.NDArray[np.float64]:
+        """
+        Steps through sim_grid with the increments summed over each step. Points of t_grid inside a step are filled
+        by a step from its start driven by the sampled partial increment, so paths keep their variance between steps.
+        """
+
+        W = np.zeros((len(dW)+1, dW.shape[1]))
+        np.cumsum(dW, axis=0, out=W[1:])
+        b = self._step_index
+        t, h = self.sim_grid, np.diff(self.sim_grid)
+        dW_step = W[b[1:]]-W[b[:-1]]
+        Y_step = np.empty((len(b), dW.shape[1]))
+        Y_step[0] = self.Y0
+        for i in range(1, len(b)):
+            Y_step[i] = self.step(Y_step[i-1], t[i-1], dW_step[i-1], h[i-1])
+
+        # Step starting at or before each reporting point
+        r = self._report_index
+        j = np.searchsorted(b, r, side="right")-1
+        Y = Y_step[j]
+        inside = np.flatnonzero(b[j] != r)
+        if len(inside):
+            ji, ri = j[inside], r[inside]
+            Y[inside] = self.step(Y_step[ji], t[ji, None], W[ri]-W[b[ji]], (self._noise_t[ri]-t[ji])[:, None])
+        return Y.T
+
+    def _simulate_chain(self, i: int, dW: npt.NDArray[np.float64]) -> npt.NDArray[np.float64]:
+        """
+        Fallback for models that only accept scalars, simulates a single chain.
+        """
+
+        N = self.N
+        Y = np.zeros(N)
+        Y[0] = self.Y0
+        t, h = self.t_grid, self.steps
+        for j in range(1, N):
+            Y[j] = self.step(Y[j-1], t[j-1], dW[j-1], h[j-1])
+        return Y
+
+    def _control_parameters(self) -> tuple[float, float, float]:
+        """
+        Vasicek (theta, alpha, sigma) matching a and b to first order at (Y0, t_start).
+        """
+
+        Y0, t = float(self.Y0), self.t_grid[0]
+        h = 1e-6*max(1.0, abs(Y0))
+        alpha = -(float(self.a(Y0+h, t))-float(self.a(Y0-h, t)))/(2*h)
+        theta = float(self.a(Y0, t))+alpha*Y0
+        return theta, alpha, float(self.b(Y0, t))
+
+    def _simulate_control(self, dW: npt.NDArray[np.float64]) -> npt.NDArray[np.float64]:
+        theta, alpha, sigma = self._control_parameters()
+        if self.adaptive:
+            # Control paths stay on t_grid, driven by the increments summed over its intervals
+            dW = np.add.reduceat(dW, self._report_index[:-1], axis=0)
+        h = self.steps
+        C = np.empty((self.N, dW.shape[1]))
+        C[0] = self.Y0
+        for i in range(1, self.N):
+            C[i] = C[i-1] + (theta-alpha*C[i-1])*h[i-1] + sigma*dW[i-1]
+        return C.T
+
+    def control_mean(self) -> npt.NDArray[np.float64]:
+        """
+        Analytic mean of the control paths, E[C_i] = E[C_{i-1}](1-alpha*h_i) + theta*h_i, exact for the discretised process.
+
+        Returns:
+            npt.NDArray[np.float64]: Mean for each time step.
+        """
+
+        theta, alpha, _ = self._control_parameters()
+        h = self.steps
+        m = np.empty(self.N)
+        m[0] = self.Y0
+        for i in range(1, self.N):
+            m[i] = m[i-1]*(1-alpha*h[i-1]) + theta*h[i-1]
+        return m
+
+    def _blocks(self, ranges: list[tuple[int, int]]) -> Iterator[tuple[npt.NDArray[np.float64], Optional[npt.NDArray[np.float64]]]]:
+        if self.num_workers > 1 and len(ranges) > 1:
+            yield from get_executor(self.num_workers).map_blocks(self, ranges)
+        else:
+            for start, stop in ranges:
+                yield self._simulate_block(start, stop)
+
+    def iter_chunks(self) -> Iterator[tuple[int, npt.NDArray[np.float64]]]:
+        """
+        Generates the chains in blocks of chunk_size, in order.
+        With num_workers > 1 blocks are computed in parallel by the persistent executor but still yielded one at a time.
+        With a tolerance, generation stops as soon as the standard error target is met or the time budget runs out.
+
+        Yields:
+            tuple[int, npt.NDArray[np.float64]]: Index of the first chain in the block and the (block size, N) block,
+                (num_params, block size, N) for a parameter batch.
+        """
+
+        # Adaptive grids are chosen before blocks are sent to workers
+        self._plan()
+        self.control = ControlVariateMean(self.N, self.control_mean()) if self.control_variate else None
+        monitor = None
+        if self.tolerance is not None:
+            monitor = StandardErrorMonitor(self.N, self.tolerance_target)
+        started = time.monotonic()
+
+        self.chains_used = 0
+        progress = Progress(self.chain_stop-self.chain_start)
+        starts = range(self.chain_start, self.chain_stop, self.chunk_size)
+        ranges = [(start, min(start+self.chunk_size, self.chain_stop)) for start in starts]
+        for start, (block, control) in zip(starts, self._blocks(ranges)):
+            if self.control is not None:
+                self.control.update(block, control)
+            chains = block.shape[-2]
+            self.chains_used = start+chains-self.chain_start
+            progress.update(chains)
+            yield start, block
+
+            if monitor is None:
+                continue
+            if self.tolerance_target == "mean" and self.control is not None:
+                se = self.control.std_error
+            else:
+                monitor.update(block)
+                se = monitor.standard_error()
+            if (monitor.batches >= 2 or self.control is not None) and np.nanmax(se) <= self.tolerance:
+                log.info(f"Tolerance {self.tolerance} met with {self.chains_used} chains.")
+                return
+            if self.time_budget is not None and time.monotonic()-started > self.time_budget:
+                log.info(f"Time budget exhausted after {self.chains_used} chains, standard error {np.nanmax(se)}.")
+                return
+        if monitor is not None:
+            log.info(f"Chain budget exhausted after {self.chains_used} chains.")
+
+    def accumulate(self, accumulators: Sequence[Accumulator]):
+        """
+        Runs the solver feeding every block to the accumulators, chains are discarded after each block.
+
+        Args:
+            accumulators (Sequence[Accumulator]): Online statistics to update.
+        """
+
+        for _, block in self.iter_chunks():
+            for acc in accumulators:
+                acc.update(block)
+
+    def run(self, out: Optional[Union[str, Path]] = None, accumulators: Sequence[Accumulator] = ()) -> npt.NDArray[np.float64]:
         """
         Runs the solver for the specified number of chains and time steps.
+        Blocks are written into a preallocated array, so chains are never held twice.
+
+        Args:
+            out (Optional[Union[str, Path]]): If given, results go to a memory-mapped .npy file at this path.
+            accumulators (Sequence[Accumulator]): Online statistics updated with every block.
 
         Returns:
-            npt.NDArray[np.float64]: A NumPy array containing the results of the simulation for each chain on axis=0.
+            npt.NDArray[np.float64]: A NumPy array containing the results of the simulation for each chain on axis=0
+                (axis=1 after the parameter sets of a batch), only the chains_used first when a tolerance stopped the run early.
         """
-        
-        def chain(i: int) -> npt.NDArray[np.float64]:
-            # For multiprocessing
-            rng = np.random.default_rng(seed=i)
-            self.dW = lambda _ : rng.normal(loc=0.0, scale=np.sqrt(self.dt))
-
-            N = self.N
-            Y = np.zeros(N)
-            Y[0] = self.Y0
-            t = self.t_start
-            for i in tqdm(range(1, N), desc=f"Chain {i}"):
-                Y[i] = self.step(Y[i-1], t)
-                t += self.dt
-            return Y
-        
-        chains = range(1, self.num_chains+1)
-        if self.num_workers > 1:
 
-            with Pool(self.num_workers) as pool:
-                Ys = pool.map(chain, chains)
+        shape = (*self._state_shape(self.chain_stop-self.chain_start), self.N)
+        if out is None:
+            Ys = np.empty(shape)
         else:
-            Ys = [chain(i) for i in chains]
-        return np.stack(Ys)
+            Ys = np.lib.format.open_memmap(out, mode="w+", dtype=np.float64, shape=shape)
+        for start, block in self.iter_chunks():
+            offset = start-self.chain_start
+            Ys[..., offset:offset+block.shape[-2], :] = block
+            for acc in accumulators:
+                acc.update(block)
+        if out is not None:
+            Ys.flush()
+        return Ys[..., :self.chains_used, :]
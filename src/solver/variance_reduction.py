@@ -0,0 +1,87 @@
+import warnings
+from functools import lru_cache
+from typing import Union
+
+import numpy as np
+import numpy.typing as npt
+
+
+VARIANCE_REDUCTION = (None, "antithetic", "sobol", "halton")
+
+@lru_cache(maxsize=8)
+def _bridge_schedule(M: int) -> tuple[tuple[int, int, int], ...]:
+    """
+    Breadth-first bisection order (midpoint, left, right) of a Brownian bridge over M steps.
+    """
+
+    schedule = []
+    queue = [(0, M)]
+    while queue:
+        l, r = queue.pop(0)
+        if r-l < 2:
+            continue
+        m = (l+r)//2
+        schedule.append((m, l, r))
+        queue += [(l, m), (m, r)]
+    return tuple(schedule)
+
+def brownian_bridge(Z: npt.NDArray[np.float64], t: npt.NDArray[np.float64]) -> npt.NDArray[np.float64]:
+    """
+    Builds Wiener increments with the Brownian bridge construction: Z[:, 0] fixes the endpoint and
+    each following column fills the midpoint of the widest remaining gap, so the leading (best distributed)
+    quasi-random coordinates carry most of the path variance.
+
+    Args:
+        Z (npt.NDArray[np.float64]): Standard normals of shape (num_chains, M).
+        t (npt.NDArray[np.float64]): Grid of M+1 increasing times.
+
+    Returns:
+        npt.NDArray[np.float64]: Increments of shape (num_chains, M).
+    """
+
+    M = Z.shape[1]
+    W = np.zeros((Z.shape[0], M+1))
+    W[:, M] = np.sqrt(t[M]-t[0])*Z[:, 0]
+    for k, (m, l, r) in enumerate(_bridge_schedule(M), start=1):
+        span = t[r]-t[l]
+        W[:, m] = ((t[r]-t[m])*W[:, l] + (t[m]-t[l])*W[:, r])/span + np.sqrt((t[m]-t[l])*(t[r]-t[m])/span)*Z[:, k]
+    return np.diff(W, axis=1)
+
+def qmc_normals(method: str, d: int, start: int, n: int, seed: Union[int, np.random.Generator] = 0) -> npt.NDArray[np.float64]:
+    """
+    Points start..start+n of a scrambled low-discrepancy sequence mapped to standard normals.
+
+    Args:
+        method (str): "sobol" or "halton".
+        d (int): Dimension (number of time steps).
+        start (int): Index of the first point, blocks of the same sequence line up across chunks.
+        n (int): Number of points.
+        seed (Union[int, np.random.Generator]): Scrambling seed, must give the same scrambling for every block.
+
+    Returns:
+        npt.NDArray[np.float64]: Array of shape (n, d).
+
+    Raises:
+        ValueError: If the method is unknown or the dimension is too large for Sobol.
+    """
+
+    # scipy.stats takes longer to import than a typical run, only quasi-random runs pay for it
+    from scipy.stats import norm, qmc
+
+    if method == "sobol":
+        if d > qmc.Sobol.MAXDIM:
+            raise ValueError(f"Sobol sequences support at most {qmc.Sobol.MAXDIM} time steps.")
+        engine = qmc.Sobol(d, scramble=True, seed=seed)
+    elif method == "halton":
+        engine = qmc.Halton(d, scramble=True, seed=seed)
+    else:
+        raise ValueError(f"Unknown quasi-random method: {method}")
+
+    with warnings.catch_warnings():
+        # Sobol balance warnings for chunk sizes that are not powers of two
+        warnings.simplefilter("ignore", UserWarning)
+        if start > 0:
+            engine.fast_forward(start)
+        u = engine.random(n)
+    eps = np.finfo(np.float64).eps
+    return norm.ppf(np.clip(u, eps, 1-eps))
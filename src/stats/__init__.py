@@ -0,0 +1,10 @@
+from .accumulator import Accumulator
+from .moments import RunningMoments
+from .p_square import P2Quantile
+from .histogram import HistogramQuantile
+from .control_variate import ControlVariateMean
+from .precision import StandardErrorMonitor
+from .path_statistics import PathStatistics
+from .path_sample import PathSample
+from .parameter_batch import ParameterBatch
+from .scoring import pinball_loss, coverage, crps_sample
\ No newline at end of file
@@ -0,0 +1,57 @@
+from abc import ABCMeta, abstractmethod
+
+import numpy as np
+import numpy.typing as npt
+
+
+class Accumulator(metaclass=ABCMeta):
+    """
+    Abstract base class for statistics computed online over chains, one block of chains at a time.
+    Memory depends on the number of time steps only, never on the number of chains.
+
+    Attributes:
+        N (int): Number of time steps per chain.
+        count (int): Number of chains seen so far.
+
+    Methods:
+        update(block: npt.NDArray[np.float64]):
+            Adds a (num_chains, N) block of chains.
+        merge(other: Accumulator):
+            Combines with statistics accumulated over a disjoint set of chains (e.g. another shard).
+    """
+
+    def __init__(self, N: int):
+        self.N = N
+        self.count = 0
+
+    @abstractmethod
+    def update(self, block: npt.NDArray[np.float64]):
+        """
+        Adds a block of chains.
+
+        Args:
+            block (npt.NDArray[np.float64]): Array of shape (num_chains, N).
+        """
+
+        pass
+
+    def merge(self, other: "Accumulator"):
+        """
+        Combines with statistics accumulated over a disjoint set of chains.
+
+        Args:
+            other (Accumulator): Statistics of the same kind over the same time grid.
+
+        Raises:
+            NotImplementedError: If the statistic cannot be merged.
+        """
+
+        raise NotImplementedError(f"{type(self).__name__} cannot be merged.")
+
+    def _check(self, block: npt.NDArray[np.float64]) -> npt.NDArray[np.float64]:
+        block = np.asarray(block, dtype=np.float64)
+        if block.ndim == 1:
+            block = block[None, :]
+        if block.shape[1] != self.N:
+            raise ValueError(f"Expected chains of length {self.N}, got {block.shape[1]}.")
+        return block
@@ -0,0 +1,81 @@
+import numpy as np
+import numpy.typing as npt
+
+from .accumulator import Accumulator
+
+
+class ControlVariateMean(Accumulator):
+    """
+    Control-variate estimate of the per-timestep mean of Y, using paths C driven by the same noise whose mean is known:
+        mean_cv = mean(Y) - beta*(mean(C) - E[C]),  beta = cov(Y, C)/var(C)
+    Co-moments are accumulated block by block (Chan's update), so memory is O(N).
+
+    Attributes:
+        control_mean (npt.NDArray[np.float64]): Known E[C] for each time step.
+        mean (npt.NDArray[np.float64]): Control-variate mean estimate.
+        std_error (npt.NDArray[np.float64]): Standard error of mean.
+        plain_std_error (npt.NDArray[np.float64]): Standard error of the plain sample mean, for comparison.
+
+    Methods:
+        update(block: npt.NDArray[np.float64], control: npt.NDArray[np.float64]):
+            Adds a (num_chains, N) block of chains and the matching control paths.
+        merge(other: ControlVariateMean):
+            Combines with co-moments accumulated over a disjoint set of chains.
+    """
+
+    def __init__(self, N: int, control_mean: npt.NDArray[np.float64]):
+        super().__init__(N)
+        self.control_mean = np.asarray(control_mean, dtype=np.float64)
+        self._mean_y = np.zeros(N)
+        self._mean_c = np.zeros(N)
+        self._cyy = np.zeros(N)
+        self._ccc = np.zeros(N)
+        self._cyc = np.zeros(N)
+
+    def update(self, block: npt.NDArray[np.float64], control: npt.NDArray[np.float64]):
+        block, control = self._check(block), self._check(control)
+        n = len(block)
+        if n == 0:
+            return
+        by, bc = block.mean(axis=0), control.mean(axis=0)
+        dy, dc = block-by, control-bc
+        self._combine(n, by, bc, (dy*dy).sum(axis=0), (dc*dc).sum(axis=0), (dy*dc).sum(axis=0))
+
+    def merge(self, other: "ControlVariateMean"):
+        if other.N != self.N or not np.allclose(other.control_mean, self.control_mean):
+            raise ValueError("Cannot merge control variates of different controls.")
+        self._combine(other.count, other._mean_y, other._mean_c, other._cyy, other._ccc, other._cyc)
+
+    def _combine(self, n: int, by: npt.NDArray[np.float64], bc: npt.NDArray[np.float64], cyy: npt.NDArray[np.float64], ccc: npt.NDArray[np.float64], cyc: npt.NDArray[np.float64]):
+        if n == 0:
+            return
+        total = self.count+n
+        delta_y, delta_c = by-self._mean_y, bc-self._mean_c
+        w = self.count*n/total
+        self._mean_y += delta_y*(n/total)
+        self._mean_c += delta_c*(n/total)
+        self._cyy += cyy + delta_y**2*w
+        self._ccc += ccc + delta_c**2*w
+        self._cyc += cyc + delta_y*delta_c*w
+        self.count = total
+
+    @property
+    def beta(self) -> npt.NDArray[np.float64]:
+        return np.divide(self._cyc, self._ccc, out=np.zeros(self.N), where=self._ccc > 0)
+
+    @property
+    def mean(self) -> npt.NDArray[np.float64]:
+        return self._mean_y - self.beta*(self._mean_c-self.control_mean)
+
+    @property
+    def std_error(self) -> npt.NDArray[np.float64]:
+        if self.count < 2:
+            return np.full(self.N, np.nan)
+        residual = np.maximum(self._cyy - self.beta*self._cyc, 0.0)
+        return np.sqrt(residual/(self.count-1)/self.count)
+
+    @property
+    def plain_std_error(self) -> npt.NDArray[np.float64]:
+        if self.count < 2:
+            return np.full(self.N, np.nan)
+        return np.sqrt(self._cyy/(self.count-1)/self.count)
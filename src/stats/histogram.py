@@ -0,0 +1,180 @@
+from typing import Sequence
+
+import numpy as np
+import numpy.typing as npt
+
+from .accumulator import Accumulator
+
+
+class HistogramQuantile(Accumulator):
+    """
+    Streaming quantile estimates per time step from a fixed number of bins per time step.
+    Each block is binned with a single bincount, so the cost per chain is a handful of vectorized operations
+    (unlike P-square, which is sequential over chains). The range of a time step doubles whenever a value
+    falls outside it, so the resolution is about 1/bins of the spread seen.
+
+    Attributes:
+        quantiles (npt.NDArray[np.float64]): Estimated probabilities.
+        bins (int): Number of bins per time step.
+        lo (npt.NDArray[np.float64]): Lower edge of the histogram of each time step.
+        width (npt.NDArray[np.float64]): Bin width of each time step.
+        counts (npt.NDArray[np.int64]): Bin counts, shape (N, bins).
+
+    Methods:
+        update(block: npt.NDArray[np.float64]):
+            Adds a (num_chains, N) block of chains.
+        merge(other: HistogramQuantile):
+            Adds the counts of another histogram, re-binned onto this one's grid (exact to one bin width).
+        quantile(p: float) -> npt.NDArray[np.float64]:
+            Current estimate of quantile p for each time step.
+        support() -> tuple[float, float]:
+            Lowest and highest edge of the non-empty bins over all time steps.
+        density(edges: npt.ArrayLike) -> npt.NDArray[np.float64]:
+            Fraction of chains between consecutive edges at each time step, e.g. for a heatmap.
+    """
+
+    def __init__(self, N: int, quantiles: Sequence[float] = (0.05, 0.95), bins: int = 512):
+        super().__init__(N)
+        self.quantiles = np.asarray(quantiles, dtype=np.float64)
+        if np.any((self.quantiles <= 0) | (self.quantiles >= 1)):
+            raise ValueError("Quantiles must lie in (0, 1).")
+        if bins < 2 or bins % 2:
+            raise ValueError("bins must be an even number >= 2.")
+        self.bins = bins
+        self.lo = None
+        self.width = None
+        self.counts = np.zeros((N, bins), dtype=np.int64)
+
+    def update(self, block: npt.NDArray[np.float64]):
+        block = self._check(block)
+        if len(block) == 0:
+            return
+        b_min, b_max = block.min(axis=0), block.max(axis=0)
+        if self.lo is None:
+            span = b_max-b_min
+            scale = np.maximum(np.abs(b_min), np.abs(b_max))
+            self.width = np.maximum(span, np.maximum(scale*1e-6, 1e-12))*2/self.bins
+            self.lo = b_min-np.maximum(span, self.width)/2
+        self._cover(b_min, b_max)
+
+        idx = np.floor((block-self.lo)/self.width).astype(np.int64)
+        np.clip(idx, 0, self.bins-1, out=idx)
+        idx += np.arange(self.N)*self.bins
+        self.counts += np.bincount(idx.ravel(), minlength=self.N*self.bins).reshape(self.N, self.bins)
+        self.count += len(block)
+
+    def merge(self, other: "HistogramQuantile"):
+        if other.N != self.N or other.bins != self.bins:
+            raise ValueError("Cannot merge histograms of different shapes.")
+        if other.count == 0:
+            return
+        if self.lo is None:
+            self.lo, self.width, self.counts = other.lo.copy(), other.width.copy(), other.counts.copy()
+            self.count = other.count
+            return
+
+        # Other's counts sit at its bin centres, on a grid at least as coarse as other's
+        centres = other.lo[:, None] + (np.arange(self.bins)+0.5)*other.width[:, None]
+        filled = other.counts > 0
+        while np.any(self.width < other.width):
+            self._coarsen(self.width < other.width)
+        self._cover(np.where(filled, centres, np.inf).min(axis=1), np.where(filled, centres, -np.inf).max(axis=1))
+
+        idx = np.floor((centres-self.lo[:, None])/self.width[:, None]).astype(np.int64)
+        np.clip(idx, 0, self.bins-1, out=idx)
+        idx += np.arange(self.N)[:, None]*self.bins
+        self.counts += np.bincount(idx.ravel(), weights=other.counts.ravel(), minlength=self.N*self.bins).astype(np.int64).reshape(self.N, self.bins)
+        self.count += other.count
+
+    def _coarsen(self, mask: npt.NDArray[np.bool_]):
+        """
+        Doubles the bin width of the masked time steps, keeping their lower edge.
+        """
+
+        half = self.bins//2
+        counts = np.zeros((mask.sum(), self.bins), dtype=np.int64)
+        counts[:, :half] = self.counts[mask].reshape(-1, half, 2).sum(axis=2)
+        self.counts[mask] = counts
+        self.width = np.where(mask, self.width*2, self.width)
+
+    def _cover(self, b_min: npt.NDArray[np.float64], b_max: npt.NDArray[np.float64]):
+        """
+        Doubles the range of the time steps that do not cover [b_min, b_max], merging pairs of bins.
+        """
+
+        half = self.bins//2
+        while True:
+            below = b_min < self.lo
+            above = b_max >= self.lo+self.width*self.bins
+            grow = below | above
+            if not grow.any():
+                return
+            merged = self.counts[grow].reshape(-1, half, 2).sum(axis=2)
+            down = below[grow]
+            counts = np.zeros((len(merged), self.bins), dtype=np.int64)
+            counts[down, half:] = merged[down]
+            counts[~down, :half] = merged[~down]
+            self.counts[grow] = counts
+            self.lo = np.where(below, self.lo-self.width*self.bins, self.lo)
+            self.width = np.where(grow, self.width*2, self.width)
+
+    def quantile(self, p: float) -> npt.NDArray[np.float64]:
+        """
+        Args:
+            p (float): One of the tracked probabilities.
+
+        Returns:
+            npt.NDArray[np.float64]: Quantile estimate for each time step, linearly interpolated within bins.
+
+        Raises:
+            KeyError: If p is not tracked.
+        """
+
+        if not np.isclose(self.quantiles, p).any():
+            raise KeyError(f"Quantile {p} is not tracked.")
+        if self.count == 0:
+            return np.full(self.N, np.nan)
+        cum = np.cumsum(self.counts, axis=1)
+        target = p*self.count
+        k = np.minimum((cum < target).sum(axis=1), self.bins-1)
+        rows = np.arange(self.N)
+        before = np.where(k > 0, cum[rows, np.maximum(k-1, 0)], 0)
+        inside = self.counts[rows, k]
+        frac = np.divide(target-before, inside, out=np.full(self.N, 0.5), where=inside > 0)
+        return self.lo + (k+frac)*self.width
+
+    def support(self) -> tuple[float, float]:
+        """
+        Returns:
+            tuple[float, float]: Lowest and highest edge of the non-empty bins over all time steps.
+        """
+
+        if self.count == 0:
+            raise ValueError("No chains have been added.")
+        filled = self.counts > 0
+        first = np.argmax(filled, axis=1)
+        last = self.bins-np.argmax(filled[:, ::-1], axis=1)
+        rows = filled.any(axis=1)
+        return float((self.lo+first*self.width)[rows].min()), float((self.lo+last*self.width)[rows].max())
+
+    def density(self, edges: npt.ArrayLike) -> npt.NDArray[np.float64]:
+        """
+        Re-bins the per-step histograms onto common edges, spreading each bin's count uniformly
+        over the bin as quantile does. The cost depends on N and the number of edges, not on the chains.
+
+        Args:
+            edges (npt.ArrayLike): Increasing bin edges.
+
+        Returns:
+            npt.NDArray[np.float64]: Fraction of chains in each bin at each time step, shape (N, len(edges)-1).
+        """
+
+        edges = np.asarray(edges, dtype=np.float64)
+        if self.count == 0:
+            return np.zeros((self.N, len(edges)-1))
+        cum = np.concatenate([np.zeros((self.N, 1)), np.cumsum(self.counts, axis=1)], axis=1)
+        u = np.clip((edges[None, :]-self.lo[:, None])/self.width[:, None], 0, self.bins)
+        k = np.minimum(u.astype(np.int64), self.bins-1)
+        rows = np.arange(self.N)[:, None]
+        cdf = cum[rows, k] + (u-k)*self.counts[rows, k]
+        return np.diff(cdf, axis=1)/self.count
@@ -0,0 +1,54 @@
+import numpy as np
+import numpy.typing as npt
+
+from .accumulator import Accumulator
+
+
+class RunningMoments(Accumulator):
+    """
+    Running per-timestep mean and variance (Welford, with Chan's update for whole blocks).
+
+    Attributes:
+        mean (npt.NDArray[np.float64]): Mean over chains for each time step.
+        variance (npt.NDArray[np.float64]): Unbiased variance over chains for each time step.
+        std_error (npt.NDArray[np.float64]): Standard error of the mean for each time step.
+
+    Methods:
+        update(block: npt.NDArray[np.float64]):
+            Adds a (num_chains, N) block of chains.
+        merge(other: RunningMoments):
+            Combines with moments accumulated over a disjoint set of chains.
+    """
+
+    def __init__(self, N: int):
+        super().__init__(N)
+        self.mean = np.zeros(N)
+        self._m2 = np.zeros(N)
+
+    def update(self, block: npt.NDArray[np.float64]):
+        block = self._check(block)
+        self._combine(len(block), block.mean(axis=0), ((block-block.mean(axis=0))**2).sum(axis=0))
+
+    def merge(self, other: "RunningMoments"):
+        if other.N != self.N:
+            raise ValueError("Cannot merge moments over different time grids.")
+        self._combine(other.count, other.mean, other._m2)
+
+    def _combine(self, count: int, mean: npt.NDArray[np.float64], m2: npt.NDArray[np.float64]):
+        if count == 0:
+            return
+        total = self.count+count
+        delta = mean-self.mean
+        self.mean = self.mean + delta*(count/total)
+        self._m2 = self._m2 + m2 + delta**2*(self.count*count/total)
+        self.count = total
+
+    @property
+    def variance(self) -> npt.NDArray[np.float64]:
+        if self.count < 2:
+            return np.full(self.N, np.nan)
+        return self._m2/(self.count-1)
+
+    @property
+    def std_error(self) -> npt.NDArray[np.float64]:
+        return np.sqrt(self.variance/self.count)
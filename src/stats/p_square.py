@@ -0,0 +1,95 @@
+from typing import Sequence
+
+import numpy as np
+import numpy.typing as npt
+
+from .accumulator import Accumulator
+
+
+class P2Quantile(Accumulator):
+    """
+    Streaming quantile estimates per time step with the P-square algorithm (Jain & Chlamtac, 1985).
+    Five markers per quantile and time step are kept, the update is vectorized over time steps and quantiles.
+
+    Attributes:
+        quantiles (npt.NDArray[np.float64]): Estimated probabilities.
+
+    Methods:
+        update(block: npt.NDArray[np.float64]):
+            Adds a (num_chains, N) block of chains.
+        quantile(p: float) -> npt.NDArray[np.float64]:
+            Current estimate of quantile p for each time step.
+    """
+
+    def __init__(self, N: int, quantiles: Sequence[float] = (0.05, 0.95)):
+        super().__init__(N)
+        self.quantiles = np.asarray(quantiles, dtype=np.float64)
+        if np.any((self.quantiles <= 0) | (self.quantiles >= 1)):
+            raise ValueError("Quantiles must lie in (0, 1).")
+        p = self.quantiles[:, None]
+        self._dn = np.hstack([np.zeros_like(p), p/2, p, (1+p)/2, np.ones_like(p)])
+        self._n_desired = np.hstack([np.zeros_like(p), 2*p, 4*p, 2+2*p, 4*np.ones_like(p)])
+        self._init = []
+        self._q = None
+        self._n = None
+
+    def update(self, block: npt.NDArray[np.float64]):
+        for x in self._check(block):
+            self._observe(x)
+            self.count += 1
+
+    def _observe(self, x: npt.NDArray[np.float64]):
+        if self._q is None:
+            self._init.append(x)
+            if len(self._init) == 5:
+                init = np.sort(np.stack(self._init), axis=0)
+                self._q = np.repeat(init[None], len(self.quantiles), axis=0)
+                self._n = np.broadcast_to(np.arange(5.0)[None, :, None], self._q.shape).copy()
+                self._init = []
+            return
+
+        q, n = self._q, self._n
+        np.minimum(q[:, 0], x, out=q[:, 0])
+        np.maximum(q[:, 4], x, out=q[:, 4])
+        k = (x >= q[:, 1:4]).sum(axis=1)
+        n += np.arange(5)[None, :, None] > k[:, None, :]
+        self._n_desired += self._dn
+
+        for i in (1, 2, 3):
+            d = self._n_desired[:, i, None]-n[:, i]
+            up = (d >= 1) & (n[:, i+1]-n[:, i] > 1)
+            down = (d <= -1) & (n[:, i-1]-n[:, i] < -1)
+            move = up | down
+            if not move.any():
+                continue
+            s = np.where(up, 1.0, -1.0)
+
+            dq_up = (q[:, i+1]-q[:, i])/(n[:, i+1]-n[:, i])
+            dq_down = (q[:, i]-q[:, i-1])/(n[:, i]-n[:, i-1])
+            parabolic = q[:, i] + s/(n[:, i+1]-n[:, i-1])*((n[:, i]-n[:, i-1]+s)*dq_up + (n[:, i+1]-n[:, i]-s)*dq_down)
+            linear = q[:, i] + np.where(up, dq_up, -dq_down)
+            inside = (q[:, i-1] < parabolic) & (parabolic < q[:, i+1])
+
+            q[:, i] = np.where(move, np.where(inside, parabolic, linear), q[:, i])
+            n[:, i] += np.where(move, s, 0.0)
+
+    def quantile(self, p: float) -> npt.NDArray[np.float64]:
+        """
+        Args:
+            p (float): One of the tracked probabilities.
+
+        Returns:
+            npt.NDArray[np.float64]: Quantile estimate for each time step.
+
+        Raises:
+            KeyError: If p is not tracked.
+        """
+
+        idx = np.flatnonzero(np.isclose(self.quantiles, p))
+        if len(idx) == 0:
+            raise KeyError(f"Quantile {p} is not tracked.")
+        if self._q is None:
+            if not self._init:
+                return np.full(self.N, np.nan)
+            return np.quantile(np.stack(self._init), p, axis=0)
+        return self._q[idx[0], 2].copy()
@@ -0,0 +1,46 @@
+from typing import Sequence
+
+import numpy as np
+import numpy.typing as npt
+
+from .accumulator import Accumulator
+
+
+class ParameterBatch(Accumulator):
+    """
+    One accumulator per parameter set of a batched run, each fed the chains of its set.
+
+    Attributes:
+        accumulators (list[Accumulator]): Statistics of each parameter set, in batch order.
+
+    Methods:
+        update(block: npt.NDArray[np.float64]):
+            Adds a (num_params, num_chains, N) block of chains.
+        merge(other: ParameterBatch):
+            Merges the statistics of each parameter set with those of a disjoint set of chains.
+    """
+
+    def __init__(self, accumulators: Sequence[Accumulator]):
+        super().__init__(accumulators[0].N)
+        self.accumulators = list(accumulators)
+
+    def __len__(self) -> int:
+        return len(self.accumulators)
+
+    def __getitem__(self, index: int) -> Accumulator:
+        return self.accumulators[index]
+
+    def update(self, block: npt.NDArray[np.float64]):
+        block = np.asarray(block, dtype=np.float64)
+        if block.ndim != 3 or len(block) != len(self.accumulators):
+            raise ValueError(f"Expected a block of shape ({len(self.accumulators)}, num_chains, {self.N}), got {block.shape}.")
+        for acc, chains in zip(self.accumulators, block):
+            acc.update(chains)
+        self.count += block.shape[1]
+
+    def merge(self, other: "ParameterBatch"):
+        if len(other.accumulators) != len(self.accumulators):
+            raise ValueError("Cannot merge batches of different numbers of parameter sets.")
+        for acc, acc_other in zip(self.accumulators, other.accumulators):
+            acc.merge(acc_other)
+        self.count += other.count
@@ -0,0 +1,40 @@
+import numpy as np
+import numpy.typing as npt
+
+from .accumulator import Accumulator
+
+
+class PathSample(Accumulator):
+    """
+    The first max_paths chains, kept for drawing sample paths.
+    Blocks arrive in chain order for any chunk_size or num_workers, so the sample is reproducible,
+    and memory is O(max_paths*N) whatever the number of chains.
+
+    Attributes:
+        max_paths (int): Number of chains kept.
+        paths (npt.NDArray[np.float64]): Kept chains, shape (min(count, max_paths), N).
+
+    Methods:
+        update(block: npt.NDArray[np.float64]):
+            Adds a (num_chains, N) block of chains.
+        merge(other: PathSample):
+            Appends the sample of the chains following these (e.g. the next shard).
+    """
+
+    def __init__(self, N: int, max_paths: int = 100):
+        super().__init__(N)
+        self.max_paths = max_paths
+        self.paths = np.empty((0, N))
+
+    def update(self, block: npt.NDArray[np.float64]):
+        block = self._check(block)
+        room = self.max_paths-len(self.paths)
+        if room > 0:
+            self.paths = np.concatenate([self.paths, block[:room]])
+        self.count += len(block)
+
+    def merge(self, other: "PathSample"):
+        if other.N != self.N:
+            raise ValueError("Cannot merge samples of different lengths.")
+        self.update(other.paths)
+        self.count += other.count-len(other.paths)
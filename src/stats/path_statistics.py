@@ -0,0 +1,131 @@
+import os
+from typing import Optional, Sequence, Union
+
+import numpy as np
+import numpy.typing as npt
+
+from .accumulator import Accumulator
+from .moments import RunningMoments
+from .p_square import P2Quantile
+from .histogram import HistogramQuantile
+from .control_variate import ControlVariateMean
+
+
+class PathStatistics(Accumulator):
+    """
+    Per-timestep summary of a set of chains: mean, standard deviation, standard error and quantile bands,
+    accumulated block by block in O(N) memory. Does not depend on matplotlib.
+
+    Attributes:
+        moments (RunningMoments): Running mean and variance.
+        bands (Union[HistogramQuantile, P2Quantile]): Streaming quantile estimates.
+        control (Optional[ControlVariateMean]): Control-variate mean, preferred over the plain mean when set.
+
+    Methods:
+        update(block: npt.NDArray[np.float64]):
+            Adds a (num_chains, N) block of chains.
+        merge(other: PathStatistics):
+            Combines with statistics of a disjoint set of chains, moments exactly and bands to one bin width.
+        summary() -> dict[str, npt.NDArray[np.float64]]:
+            Named per-timestep columns.
+        density(bins: int = 200) -> tuple[npt.NDArray[np.float64], npt.NDArray[np.float64]]:
+            Per-timestep distribution of the chains on common bins, from the histogram bands.
+        save(file_path: str, x: Optional[npt.ArrayLike] = None):
+            Writes the summary as CSV, or as NPZ for a .npz path.
+    """
+
+    def __init__(self, N: int, quantiles: Sequence[float] = (0.05, 0.95), method: str = "histogram"):
+        """
+        Args:
+            N (int): Number of time steps per chain.
+            quantiles (Sequence[float]): Probabilities of the tracked quantile bands.
+            method (str): "histogram" (binned, fast for many chains) or "p2" (P-square markers).
+        """
+
+        super().__init__(N)
+        self.moments = RunningMoments(N)
+        self.control = None
+        if method == "histogram":
+            self.bands = HistogramQuantile(N, quantiles)
+        elif method == "p2":
+            self.bands = P2Quantile(N, quantiles)
+        else:
+            raise ValueError(f"Unknown quantile method: {method}")
+
+    def update(self, block: npt.NDArray[np.float64]):
+        block = self._check(block)
+        self.moments.update(block)
+        self.bands.update(block)
+        self.count += len(block)
+
+    def merge(self, other: "PathStatistics"):
+        self.moments.merge(other.moments)
+        self.bands.merge(other.bands)
+        if other.control is not None:
+            if self.control is None:
+                self.control = ControlVariateMean(self.N, other.control.control_mean)
+            self.control.merge(other.control)
+        self.count += other.count
+
+    @property
+    def mean(self) -> npt.NDArray[np.float64]:
+        if self.control is not None and self.control.count > 0:
+            return self.control.mean
+        return self.moments.mean
+
+    def quantile(self, p: float) -> npt.NDArray[np.float64]:
+        return self.bands.quantile(p)
+
+    def summary(self) -> dict[str, npt.NDArray[np.float64]]:
+        columns = {
+            "mean": self.moments.mean,
+            "std": np.sqrt(self.moments.variance),
+            "std_error": self.moments.std_error,
+        }
+        if self.control is not None:
+            columns["mean_cv"] = self.control.mean
+            columns["std_error_cv"] = self.control.std_error
+        for p in self.bands.quantiles:
+            columns[f"q{p:g}"] = self.bands.quantile(p)
+        return columns
+
+    def density(self, bins: int = 200) -> tuple[npt.NDArray[np.float64], npt.NDArray[np.float64]]:
+        """
+        Distribution of the chains at each time step on bins common to all steps, spanning the values seen.
+
+        Args:
+            bins (int): Number of bins.
+
+        Returns:
+            tuple[npt.NDArray[np.float64], npt.NDArray[np.float64]]: Bin edges (bins+1) and the fraction of
+                chains in each bin, shape (N, bins).
+
+        Raises:
+            ValueError: If the bands are not histogram-based.
+        """
+
+        if not isinstance(self.bands, HistogramQuantile):
+            raise ValueError("Densities need method='histogram'.")
+        edges = np.linspace(*self.bands.support(), bins+1)
+        return edges, self.bands.density(edges)
+
+    def save(self, file_path: str, x: Optional[npt.ArrayLike] = None):
+        """
+        Writes the summary, one row per time step. A path ending in .npz gets one array per column
+        (and x) instead of CSV.
+
+        Args:
+            file_path (str): Destination file.
+            x (Optional[npt.ArrayLike]): Row labels (e.g. dates), row numbers if None.
+        """
+
+        columns = self.summary()
+        labels = np.arange(self.N) if x is None else np.asarray(x)
+        os.makedirs(os.path.dirname(os.path.abspath(file_path)), exist_ok=True)
+        if str(file_path).endswith(".npz"):
+            np.savez(file_path, x=labels, **columns)
+            return
+        with open(file_path, "w") as f:
+            f.write(",".join(["x", *columns]) + "\n")
+            for i in range(self.N):
+                f.write(",".join([str(labels[i]), *(repr(float(c[i])) for c in columns.values())]) + "\n")
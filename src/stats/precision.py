@@ -0,0 +1,49 @@
+from typing import Sequence
+
+import numpy as np
+import numpy.typing as npt
+
+from .accumulator import Accumulator
+from .moments import RunningMoments
+
+
+class StandardErrorMonitor(Accumulator):
+    """
+    Tracks the Monte Carlo standard error of the per-timestep mean, or of quantile bands, while blocks arrive.
+    Quantile errors use batch means: each block's sample quantiles are one batch, so blocks should have equal size.
+
+    Attributes:
+        target (str): "mean" or "quantile".
+        quantiles (npt.NDArray[np.float64]): Monitored probabilities for the "quantile" target.
+        batches (int): Number of blocks seen.
+
+    Methods:
+        update(block: npt.NDArray[np.float64]):
+            Adds a (num_chains, N) block of chains.
+        standard_error() -> npt.NDArray[np.float64]:
+            Current standard error for each time step (worst quantile for the "quantile" target).
+    """
+
+    def __init__(self, N: int, target: str = "mean", quantiles: Sequence[float] = (0.05, 0.95)):
+        super().__init__(N)
+        if target not in ("mean", "quantile"):
+            raise ValueError(f"Unknown tolerance target: {target}")
+        self.target = target
+        self.quantiles = np.asarray(quantiles, dtype=np.float64)
+        self.batches = 0
+        self._moments = RunningMoments(N) if target == "mean" else RunningMoments(N*len(self.quantiles))
+
+    def update(self, block: npt.NDArray[np.float64]):
+        block = self._check(block)
+        if self.target == "mean":
+            self._moments.update(block)
+        else:
+            self._moments.update(np.quantile(block, self.quantiles, axis=0).ravel())
+        self.batches += 1
+        self.count += len(block)
+
+    def standard_error(self) -> npt.NDArray[np.float64]:
+        se = self._moments.std_error
+        if self.target == "quantile":
+            se = se.reshape(len(self.quantiles), self.N).max(axis=0)
+        return se
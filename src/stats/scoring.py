@@ -0,0 +1,47 @@
+import numpy as np
+import numpy.typing as npt
+
+
+def pinball_loss(q: npt.ArrayLike, y: npt.ArrayLike, p: float) -> npt.NDArray[np.float64]:
+    """
+    Pinball (quantile) loss of a predicted p-quantile q for realized values y.
+
+    Args:
+        q (npt.ArrayLike): Predicted quantiles.
+        y (npt.ArrayLike): Realized values, same shape as q.
+        p (float): Probability of the quantile.
+
+    Returns:
+        npt.NDArray[np.float64]: max(p*(y-q), (p-1)*(y-q)), elementwise.
+    """
+
+    diff = np.asarray(y, dtype=np.float64)-np.asarray(q, dtype=np.float64)
+    return np.maximum(p*diff, (p-1)*diff)
+
+def coverage(lower: npt.ArrayLike, upper: npt.ArrayLike, y: npt.ArrayLike) -> npt.NDArray[np.float64]:
+    """
+    Whether realized values fall inside predicted bands, as 1.0/0.0 so it can be averaged into a hit rate.
+    """
+
+    y = np.asarray(y, dtype=np.float64)
+    return ((y >= lower) & (y <= upper)).astype(np.float64)
+
+def crps_sample(samples: npt.NDArray[np.float64], y: npt.ArrayLike) -> npt.NDArray[np.float64]:
+    """
+    Continuous ranked probability score of the empirical distribution of samples,
+        CRPS = E|X - y| - E|X - X'|/2,
+    with E|X - X'| from the sorted samples in O(n log n).
+
+    Args:
+        samples (npt.NDArray[np.float64]): Predictive samples of shape (n, ...) (e.g. chains x time steps).
+        y (npt.ArrayLike): Realized values of shape (...).
+
+    Returns:
+        npt.NDArray[np.float64]: CRPS of shape (...).
+    """
+
+    x = np.sort(np.asarray(samples, dtype=np.float64), axis=0)
+    n = len(x)
+    weights = (2*np.arange(1, n+1)-n-1).reshape((n,)+(1,)*(x.ndim-1))
+    spread = 2*(weights*x).sum(axis=0)/n**2
+    return np.abs(x-np.asarray(y, dtype=np.float64)).mean(axis=0) - spread/2
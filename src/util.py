@@ -1,54 +1,255 @@
+import os
+import zlib
 import logging
-from datetime import date, timedelta
 import typing
 import numpy as np
 import numpy.typing as npt
 
-from omegaconf import DictConfig
+from omegaconf import DictConfig, OmegaConf
 from hydra.utils import instantiate
 
 from model import IRModel
-from visualizations import plot_sim
+from solver import SDESolver, Milstein, ExactSolver
+from stats import Accumulator, PathStatistics, PathSample, ParameterBatch
+from sharding import parse_shard, shard_path, save_shard, merge_shards
+from instrumentation import stage
 
 
 log = logging.getLogger(__name__)
 
-def working_days_between(a: date, b: date) -> list[date]:
+def init_model(config: DictConfig) -> IRModel:
     """
-    Calculate the number of working days (Monday to Friday) between two dates.
+    Instantiates config.model, with the persistent calibration cache when config.calibration_cache is set.
+    The cache context holds config.solver, so entries are not shared across solver settings.
+    """
+
+    model = instantiate(config.model)
+    if config.get("calibration_cache"):
+        model.calibration_cache = instantiate(config.calibration_cache)
+        if config.get("solver"):
+            model.calibration_cache.context["solver"] = OmegaConf.to_container(config.solver, resolve=True)
+    return model
+
+def make_solver(config: DictConfig, model: IRModel, t_start: float, t_stop: float, tag: str = "sim", **kwargs) -> SDESolver:
+    """
+    Instantiates config.solver for the model, with the model-specific arguments each solver needs
+    and a stream key derived from the tag.
 
     Args:
-        a (date): The start date.
-        b (date): The end date.
+        config (DictConfig): Configuration with a solver entry.
+        model (IRModel): Simulated model.
+        t_start (float): Start time of the simulation.
+        t_stop (float): Stop time of the simulation.
+        tag (str): Run tag, runs with different tags draw independent noise.
+        **kwargs: Further solver arguments (e.g. dt).
 
     Returns:
-        list(date): List of working days between two dates
+        SDESolver: The solver, starting from model.Y0(), stepping every parameter set of a batched model together.
+
+    Raises:
+        RuntimeError: If the model does not support the solver, or solver.sensitivities is set for a model without derivatives.
     """
 
-    if b <= a:
-        return []
+    solver_fn = instantiate(config.solver)
+    if issubclass(solver_fn.func, Milstein):
+        if not model.differentiable():
+            raise RuntimeError("Milstein solver requires differentiable SDE!")
+        kwargs["b_prime"] = model.b_prime_vec
+    if issubclass(solver_fn.func, ExactSolver):
+        if not model.exact():
+            raise RuntimeError("Exact solver requires a known transition density!")
+        kwargs["transition"] = model.transition
+    if config.solver.get("sensitivities", False):
+        if not model.pathwise():
+            raise RuntimeError("Sensitivities require pathwise derivatives of the model!")
+        kwargs["derivatives"] = model.derivatives
+        kwargs["dY0"] = model.Y0_derivatives()
 
-    total_days = (b - a).days
-    tmp = [ a+timedelta(days=day) for day in range(total_days) ]
-    return list(filter(lambda x: x.weekday() < 5, tmp))
+    vectorized = model.vectorized()
+    return solver_fn(
+        t_start=t_start,
+        t_stop=t_stop,
+        a=model.a_vec if vectorized else model.a, 
+        b=model.b_vec if vectorized else model.b, 
+        Y0=model.Y0(),
+        vectorized=vectorized,
+        stream_key=(zlib.crc32(tag.encode()),),
+        num_params=model.num_params(),
+        **kwargs
+    )
 
-def run_sim(config: DictConfig, t_start: float, t_stop: float, y: typing.Optional[np.float64], x: npt.NDArray[np.float64], model: IRModel, Y0: float):
+def save_scenarios(file_path: str, model: IRModel, batch: ParameterBatch):
     """
-    Helper function
+    Writes one CSV row per parameter set of a batched run: the varied parameters (bucketed ones by their mean
+    over buckets) and the last-step summary of the set's chains.
+
+    Args:
+        file_path (str): Destination file.
+        model (IRModel): The batched model.
+        batch (ParameterBatch): PathStatistics of each parameter set.
+    """
+
+    varied = [name for name, ndim in model.PARAM_NDIM.items() if np.ndim(getattr(model, name)) > ndim]
+    columns = list(batch[0].summary())
+    os.makedirs(os.path.dirname(os.path.abspath(file_path)), exist_ok=True)
+    with open(file_path, "w") as f:
+        f.write(",".join(["scenario", *varied, *columns]) + "\n")
+        for p, stats in enumerate(batch.accumulators):
+            params = [np.mean(np.asarray(getattr(model, name))[p]) for name in varied]
+            summary = stats.summary()
+            f.write(",".join([str(p), *(repr(float(v)) for v in params), *(repr(float(summary[c][-1])) for c in columns)]) + "\n")
+
+def save_sensitivities(file_path: str, model: IRModel, batch: ParameterBatch, x: typing.Optional[npt.ArrayLike] = None):
+    """
+    Writes one CSV row per time step of a sensitivity run: the mean path and, for each parameter of PARAM_NDIM,
+    the pathwise derivative of the mean d_mean_d_<name> = E[dY/dp] with its standard error.
+
+    Args:
+        file_path (str): Destination file.
+        model (IRModel): The simulated model.
+        batch (ParameterBatch): PathStatistics of the paths followed by those of their tangents.
+        x (Optional[npt.ArrayLike]): Row labels (e.g. dates), row numbers if None.
+    """
+
+    columns = {"mean": batch[0].moments.mean, "std_error": batch[0].moments.std_error}
+    for name, stats in zip(model.PARAM_NDIM, batch.accumulators[1:]):
+        columns[f"d_mean_d_{name}"] = stats.moments.mean
+        columns[f"d_mean_d_{name}_std_error"] = stats.moments.std_error
+    labels = np.arange(batch.N) if x is None else np.asarray(x)
+    os.makedirs(os.path.dirname(os.path.abspath(file_path)), exist_ok=True)
+    with open(file_path, "w") as f:
+        f.write(",".join(["x", *columns]) + "\n")
+        for i in range(batch.N):
+            f.write(",".join([str(labels[i]), *(repr(float(c[i])) for c in columns.values())]) + "\n")
+
+def run_sim(config: DictConfig, t_start: float, t_stop: float, y: typing.Optional[np.float64], x: npt.NDArray[np.float64], model: IRModel, Y0: float, tag: str = "sim", accumulators: typing.Sequence[Accumulator] = (), **solver_kwargs):
     """
+    Helper function
+
+    Chains are summarised online into PathStatistics (returned). With sim.paths_dir set, chains are written to
+    a memory-mapped <tag>.npy there instead of RAM. With sim.plot False nothing is plotted and chains are not kept,
+    otherwise only the sim.max_paths chains that are drawn are kept. With sim.save_stats the per-step summary
+    (bands included) goes to OUTPUT_DIR/<tag>_stats.<sim.stats_format>, csv or npz, alongside or instead of the plot.
+    sim.headless renders with Agg and never shows the figure, sim.plot_style "density" draws a heatmap of all chains.
+    Runs with different tags draw independent noise below the same root solver.seed.
+    Further accumulators (e.g. a BondPricer) are fed the same blocks as the statistics.
+    Further keyword arguments go to the solver (e.g. dt, the time step in years).
+    Simulation and plotting are timed as "<tag> simulation" and "<tag> plotting" stages of the run report.
+
+    A batched model (IRModel.scenarios) is simulated in one pass with common random numbers and summarised into
+    a ParameterBatch of PathStatistics (returned), written to OUTPUT_DIR/<tag>_scenarios.csv instead of a plot,
+    with sim.save_stats one <tag>_stats_<scenario> file per parameter set. Further accumulators must then be
+    ParameterBatches of one accumulator per set (e.g. one BondPricer each), anything else raises a ValueError.
 
-    if (config.solver == "Milstein") and (not model.differentiable()):
-        raise RuntimeError("Milstein solver requires differentiable SDE!")
+    With solver.sensitivities the paths carry their tangents: the returned ParameterBatch holds the statistics of the
+    paths followed by those of dY/dp for each model parameter, and OUTPUT_DIR/<tag>_sensitivities.csv gets the
+    pathwise derivatives of the mean. Accumulators see the stacked (1+P, num_chains, N) blocks (BondPricer prices
+    their sensitivities), the plot and saved statistics cover the paths.
+
+    With sim.shard "i/k" only shard i of k is simulated and its statistics (and paths, with sim.paths_dir) go to
+    sim.shard_dir, nothing is plotted. sim.shard "merge" combines all shards there instead of simulating.
+    """
 
     log.info("Initializing solver.")
-    solver = instantiate(config.solver)(
-        t_start=t_start,
-        t_stop=t_stop,
-        a=model.a, 
-        b=model.b, 
-        Y0=model.Y0()
-    )
+    solver = make_solver(config, model, t_start, t_stop, tag, **solver_kwargs)
+
+    quantiles = config.sim.get("quantiles", (0.05, 0.95))
+    num_params = solver.num_params
+    tangents = len(solver.dY0) if solver.sensitivities else 0
+    plot = config.sim.get("plot", True)
+    if tangents:
+        stats = ParameterBatch([PathStatistics(solver.N, quantiles) for _ in range(1+tangents)])
+    elif num_params is None:
+        stats = PathStatistics(solver.N, quantiles)
+    else:
+        stats = ParameterBatch([PathStatistics(solver.N, quantiles) for _ in range(num_params)])
+        unbatched = [type(acc).__name__ for acc in accumulators if not (isinstance(acc, ParameterBatch) and len(acc) == num_params)]
+        if unbatched:
+            raise ValueError(f"Accumulators of {num_params} parameter scenarios must be ParameterBatches of one accumulator per set, got {unbatched}.")
+        if plot:
+            log.info(f"Plotting is skipped for {num_params} parameter scenarios.")
+            plot = False
+    path_stats = stats[0] if tangents else stats
+    out = None
+    if config.sim.get("paths_dir"):
+        os.makedirs(config.sim.paths_dir, exist_ok=True)
+        out = os.path.join(config.sim.paths_dir, f"{tag}.npy")
+
+    spec = config.sim.get("shard")
+    shard_dir = config.sim.get("shard_dir") or os.path.join(os.getenv("OUTPUT_DIR", "."), "shards")
+    shard = parse_shard(spec)
+    if (num_params is not None or tangents) and spec is not None:
+        raise ValueError("Parameter batches and sensitivities do not support sharding.")
+    with stage(f"{tag} simulation") as timing:
+        if spec == "merge":
+            log.info("Merging shards.")
+            merged, merged_accumulators, Ys = merge_shards(shard_dir, tag, solver.N, out)
+            if len(Ys):
+                # Replaying the paths in the original blocks gives exactly the bands of an unsharded run
+                for start in range(0, len(Ys), solver.chunk_size):
+                    for acc in [stats, *accumulators]:
+                        acc.update(Ys[start:start+solver.chunk_size])
+                stats.control = merged.control
+            else:
+                stats = merged
+                for acc, other in zip(accumulators, merged_accumulators, strict=True):
+                    acc.merge(other)
+        elif shard is not None:
+            index, count = shard
+            solver.shard(index, count)
+            log.info(f"Running shard {index}/{count}, chains {solver.chain_start} to {solver.chain_stop}.")
+            if out is not None:
+                os.makedirs(shard_dir, exist_ok=True)
+                solver.run(shard_path(shard_dir, tag, index, count, "npy"), accumulators=[stats, *accumulators])
+            else:
+                solver.accumulate([stats, *accumulators])
+            stats.control = solver.control
+            timing.chains, timing.steps = solver.chains_used, solver.chains_used*(solver.N-1)
+            save_shard(shard_dir, tag, index, count, stats, (solver.chain_start, solver.chain_stop), accumulators)
+            return stats
+        else:
+            log.info("Running simulation.")
+            if out is not None:
+                Ys = solver.run(out, accumulators=[stats, *accumulators])
+                if tangents:
+                    Ys = Ys[0]
+            elif plot:
+                sample = PathSample(solver.N, config.sim.get("max_paths", 100))
+                # Tangent rows are not drawn
+                samples = ParameterBatch([sample, *(PathSample(solver.N, 0) for _ in range(tangents))]) if tangents else sample
+                solver.accumulate([stats, samples, *accumulators])
+                Ys = sample.paths
+            else:
+                solver.accumulate([stats, *accumulators])
+            if num_params is None and not tangents:
+                stats.control = solver.control
+            paths = solver.chains_used*(num_params or 1)
+            timing.chains, timing.steps = paths, paths*(solver.N-1)
+            if solver.tolerance is not None:
+                log.info(f"Used {solver.chains_used} of {solver.num_chains} chains.")
 
-    log.info("Running simulation.")
-    Ys = solver.run()
-    plot_sim(Ys, y, x, config.sim.save_plots)
\ No newline at end of file
+    if num_params is not None:
+        file_path = os.path.join(os.getenv("OUTPUT_DIR", "."), f"{tag}_scenarios.csv")
+        save_scenarios(file_path, model, stats)
+        log.info(f"Scenario summary saved to {file_path}")
+    if tangents:
+        file_path = os.path.join(os.getenv("OUTPUT_DIR", "."), f"{tag}_sensitivities.csv")
+        save_sensitivities(file_path, model, stats, x)
+        log.info(f"Sensitivities saved to {file_path}")
+    if config.sim.get("save_stats", False):
+        fmt = config.sim.get('stats_format', 'csv')
+        output_dir = os.getenv("OUTPUT_DIR", ".")
+        if num_params is None:
+            file_path = os.path.join(output_dir, f"{tag}_stats.{fmt}")
+            path_stats.save(file_path, x)
+        else:
+            file_path = os.path.join(output_dir, f"{tag}_stats_<scenario>.{fmt}")
+            for p, scenario_stats in enumerate(stats.accumulators):
+                scenario_stats.save(os.path.join(output_dir, f"{tag}_stats_{p}.{fmt}"), x)
+        log.info(f"Statistics saved to {file_path}")
+    if plot:
+        with stage(f"{tag} plotting"):
+            from visualizations import plot_sim
+            plot_sim(Ys, y, x, config.sim.save_plots, path_stats, max_paths=config.sim.get("max_paths", 100),
+                     style=config.sim.get("plot_style", "lines"), headless=config.sim.get("headless", False), dpi=config.sim.get("plot_dpi", 300))
+    return stats
\ No newline at end of file
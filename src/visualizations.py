@@ -4,57 +4,100 @@ import logging
 from datetime import datetime
 
 import matplotlib.pyplot as plt
+import matplotlib.dates as mdates
+from matplotlib.collections import LineCollection
 import numpy as np
 
+from stats import PathStatistics
+
 
 log = logging.getLogger(__name__)
 
-def plot_sim(Ys: list[np.ndarray], y: typing.Optional[np.ndarray], x: np.ndarray, save_plot: bool):
+def plot_sim(Ys: list[np.ndarray], y: typing.Optional[np.ndarray], x: np.ndarray, save_plot: bool, stats: typing.Optional[PathStatistics] = None,
+             max_paths: int = 100, max_points: int = 2000, style: str = "lines", headless: bool = False, dpi: int = 300):
     """
     Plot simulation results.
 
+    At most max_paths chains (spread evenly over Ys) are drawn, as a single LineCollection thinned to
+    max_points per chain, and bands come from stats, so the time does not grow with the number of chains.
+    The "density" style draws the distribution of all chains from the histogram of stats as a heatmap instead.
+
     Args:
-        Ys (List[np.ndarray]): List of 1D arrays to be plotted as individual lines.
+        Ys (List[np.ndarray]): List or 2D (possibly memory-mapped) array of 1D arrays to be plotted as individual lines.
         y (typing.Optional[np.ndarray]): 1D array of values to be marked with crosses on the plot.
-        x (np.ndarray): 1D array of x-axis labels corresponding to Ys and y.
+        x (np.ndarray): 1D array of x-axis labels (numbers or dates) corresponding to Ys and y.
         save_plot (bool): Whether to save the plot to OUTPUT_DIR.
+        stats (typing.Optional[PathStatistics]): Online statistics of the chains, bands are taken from it instead of recomputed from Ys.
+        max_paths (int): Number of chains drawn.
+        max_points (int): Number of points drawn per chain, the time axis is thinned beyond it.
+        style (str): "lines" (sample paths) or "density" (heatmap, requires stats).
+        headless (bool): Render with the Agg backend and never call plt.show, for servers and batch jobs.
+        dpi (int): Resolution of the saved image.
 
     Raises:
-        ValueError: If the lengths of x, y, or any element in Ys do not match.
+        ValueError: If the lengths of x, y, or any element in Ys do not match, or style is unknown.
     """
 
-    tmp = Ys
-    if y is not None:
-        tmp = Ys+[y]
-    if any(len(arr) != len(x) for arr in tmp):
+    if any(len(arr) != len(x) for arr in Ys) or (y is not None and len(y) != len(x)):
         raise ValueError("All input arrays must have the same length as x.")
-    
-    plt.figure(figsize=(10, 6))
-
-    for Y in Ys:
-        plt.plot(x, Y, alpha=0.4)
-
-    upper_bound = np.quantile(Ys, q=0.95, axis=0)
-    lower_bound = np.quantile(Ys, q=0.05, axis=0)
-    average_line = np.mean(Ys, axis=0)
-    plt.plot(x, upper_bound, 'k--', label="Upper Bound")
-    plt.plot(x, lower_bound, 'k--', label="Lower Bound")
-    plt.plot(x, average_line, 'k:', label="Average")
+    if style not in ("lines", "density"):
+        raise ValueError(f"Unknown plot style: {style}")
+    if style == "density" and stats is None:
+        raise ValueError("The density style needs stats.")
+    if headless:
+        plt.switch_backend("Agg")
+
+    dates = np.issubdtype(np.asarray(x).dtype, np.datetime64)
+    x = mdates.date2num(np.asarray(x)) if dates else np.asarray(x, dtype=np.float64)
+    fig, ax = plt.subplots(figsize=(10, 6))
+
+    if style == "density":
+        edges, density = stats.density()
+        # Scaled per time step, early steps would otherwise saturate the colour map
+        peak = density.max(axis=1, keepdims=True)
+        density = np.divide(density, peak, out=np.zeros_like(density), where=peak > 0)
+        mesh = ax.pcolormesh(x, (edges[1:]+edges[:-1])/2, density.T, shading="nearest", cmap="Blues")
+        fig.colorbar(mesh, ax=ax, label="Density relative to the time step's mode")
+    elif len(Ys):
+        rows = np.unique(np.linspace(0, len(Ys)-1, min(max_paths, len(Ys))).astype(np.int64))
+        cols = np.unique(np.linspace(0, len(x)-1, min(max_points, len(x))).astype(np.int64))
+        paths = np.asarray([Ys[i] for i in rows])[:, cols]
+        segments = np.stack([np.broadcast_to(x[cols], paths.shape), paths], axis=-1)
+        colors = plt.rcParams["axes.prop_cycle"].by_key()["color"]
+        ax.add_collection(LineCollection(segments, colors=colors, alpha=0.4))
+        ax.autoscale_view()
+
+    if stats is not None:
+        upper_bound = stats.quantile(max(stats.bands.quantiles))
+        lower_bound = stats.quantile(min(stats.bands.quantiles))
+        average_line = stats.mean
+    else:
+        upper_bound = np.quantile(Ys, q=0.95, axis=0)
+        lower_bound = np.quantile(Ys, q=0.05, axis=0)
+        average_line = np.mean(Ys, axis=0)
+    ax.plot(x, upper_bound, 'k--', label="Upper Bound")
+    ax.plot(x, lower_bound, 'k--', label="Lower Bound")
+    ax.plot(x, average_line, 'k:', label="Average")
     if y is not None:
-        plt.plot(x, y, color='red', label="Real")
+        ax.plot(x, y, color='red', label="Real")
 
-    plt.xlabel("X-axis")
-    plt.ylabel("Values")
-    plt.title("Simulation Plot ")
-    plt.legend()
-    plt.tight_layout()
+    if dates:
+        ax.xaxis_date()
+    ax.set_xlabel("X-axis")
+    ax.set_ylabel("Values")
+    ax.set_title("Simulation Plot ")
+    # A fixed location, "best" scans every drawn point
+    ax.legend(loc="upper left")
+    fig.tight_layout()
 
     if save_plot:
         output_dir = os.getenv("OUTPUT_DIR", ".")
         os.makedirs(output_dir, exist_ok=True)
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         file_path = os.path.join(output_dir, f"simulation{timestamp}.png")
-        plt.savefig(file_path, dpi=300)
+        fig.savefig(file_path, dpi=dpi)
         log.info(f"Plot saved to {file_path}")
-    
-    plt.show()
\ No newline at end of file
+
+    if not headless:
+        plt.show()
+    plt.close(fig)
@@ -1,11 +1,15 @@
 import logging
+import os
 import numpy as np
+import pandas as pd
 from datetime import datetime
 
 from omegaconf import DictConfig
 from hydra.utils import instantiate
 
-from util import working_days_between, run_sim
+from util import init_model, run_sim
+from pricing import BondPricer, closed_form_yields
+from instrumentation import stage
 
 
 log = logging.getLogger(__name__)
@@ -13,21 +17,59 @@ log = logging.getLogger(__name__)
 def simulation(config: DictConfig):
     """
     Simulation procedure.
+
+    With sim.price the simulated paths are also priced: a BondPricer turns them into a model-implied
+    yield curve for every maturity of the row (plus the closed-form curve when the model has one),
+    written to OUTPUT_DIR/yield_curve.csv next to the market curve. With solver.sensitivities the file also gets
+    the Monte Carlo prices and their pathwise derivatives d_price_d_<name> for every model parameter.
     """
 
     log.info("Initializing data loader.")
-    data_loader = instantiate(config.data)
+    with stage("data load"):
+        data_loader = instantiate(config.data)
 
     log.info("Initializing model.")
-    model = instantiate(config.model)
+    model = init_model(config)
 
     date = np.datetime64(datetime.strptime(config.sim.date, "%m/%d/%Y").date())
     rates = data_loader.get_date(date)
     t_start = 0
     t_stop = len(rates)-1
 
+    # Consecutive maturities are one month apart, so time is in years with a monthly step
+    dt = 1/12
+
     log.info("Model calibration.")
-    model.calibrate(rates)
+    with stage("calibration"):
+        model.calibrate(rates, dt=dt, **config.sim.get("calibrate", {}))
+
+    accumulators = []
+    if config.sim.get("price", False):
+        rate_scale = config.sim.get("rate_scale", 0.01)
+        maturities = data_loader.maturity_index*dt
+        pricer = BondPricer(np.arange(t_stop-t_start+1)*dt, maturities, rate_scale, tangents=config.solver.get("sensitivities", False))
+        accumulators.append(pricer)
 
     log.info("Model fit.")
-    run_sim(config, t_start, t_stop, rates, data_loader.maturity_index, model, model.Y0())
\ No newline at end of file
+    run_sim(config, t_start, t_stop, rates, data_loader.maturity_index, model, model.Y0(), accumulators=accumulators, dt=dt)
+
+    if accumulators:
+        curve = pd.DataFrame({
+            "maturity": data_loader.maturity_index,
+            "market": rates,
+            "monte_carlo": pricer.yields(),
+            "monte_carlo_std_error": pricer.yield_std_error(),
+        })
+        if model.closed_form():
+            curve["closed_form"] = closed_form_yields(model, maturities, rate_scale=rate_scale)
+        if pricer.sensitivity is not None:
+            curve["price"] = pricer.prices
+            for name, sensitivity, std_error in zip(model.PARAM_NDIM, pricer.price_sensitivities, pricer.price_sensitivity_std_error):
+                curve[f"d_price_d_{name}"] = sensitivity
+                curve[f"d_price_d_{name}_std_error"] = std_error
+        rmse = np.sqrt(np.mean((curve["monte_carlo"]-curve["market"])**2))
+        log.info(f"Monte Carlo yield curve RMSE against market: {rmse}")
+        file_path = os.path.join(os.getenv("OUTPUT_DIR", "."), "yield_curve.csv")
+        os.makedirs(os.path.dirname(os.path.abspath(file_path)), exist_ok=True)
+        curve.to_csv(file_path, index=False)
+        log.info(f"Yield curve saved to {file_path}")
\ No newline at end of file
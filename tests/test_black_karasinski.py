@@ -0,0 +1,76 @@
+import numpy as np
+import pytest
+
+from model import BlackKarasinski
+
+
+def calibrated(N: int, buckets=None, dt: float = 1/252) -> BlackKarasinski:
+    rates = 3.0 + np.cumsum(np.random.default_rng(0).normal(0.0, 0.01, N))
+    model = BlackKarasinski(theta=[0.0], phi=[0.0], sigma=[0.0], r0=0.0)
+    model.calibrate(rates, maxiter=1, buckets=buckets, dt=dt)
+    return model
+
+@pytest.mark.parametrize("N", [200, 1200, 5000])
+@pytest.mark.parametrize("buckets", [None, 7])
+def test_simulation_uses_calibration_buckets(N, buckets):
+    dt = 1/252
+    model = calibrated(N, buckets, dt)
+    K = len(model.theta)
+    # Bucket values equal to their index expose the lookup
+    model.theta, model.sigma, model.phi = np.arange(K, dtype=np.float64), np.arange(K, dtype=np.float64), np.zeros(K)
+    i = np.arange(N-1)
+    expected = (i*K)//N
+    assert np.array_equal(model.a_vec(np.zeros(N-1), i*dt), expected)
+    assert np.array_equal(model.b_vec(np.zeros(N-1), i*dt), expected)
+    # The solver's grid accumulates t the same way
+    assert np.array_equal([model.a(0.0, t) for t in np.arange(N-1)*dt], expected)
+
+def reference_recurrence(c, d, y0):
+    y = [y0]
+    for c_i, d_i in zip(c, d):
+        y.append(c_i*y[-1] + d_i)
+    return np.array(y)
+
+@pytest.mark.parametrize("n", [0, 1, 63, 64, 65, 2519, 5000])
+@pytest.mark.parametrize("vanishing", [False, True])
+def test_linear_recurrence_matches_step_by_step(n, vanishing):
+    from model.black_karasinski import _linear_recurrence
+
+    rng = np.random.default_rng(n)
+    d = rng.normal(0.0, 1.0, n)
+    if vanishing:
+        # Products of c hit zero, the matrix path
+        c = rng.uniform(-1.2, 1.2, n)
+        c[::97] = 0.0
+    else:
+        c = 1-rng.uniform(0.0, 50.0, n)/252
+    assert np.allclose(_linear_recurrence(c, d, 0.5), reference_recurrence(c, d, 0.5), rtol=1e-10, atol=1e-12)
+
+@pytest.mark.parametrize("N", [60, 300])
+def test_adjoint_gradient_matches_finite_differences(N):
+    from model.black_karasinski import _path_loss
+
+    rng = np.random.default_rng(1)
+    K, dt = 4, 1/252
+    rates = 3.0 + np.cumsum(rng.normal(0.0, 0.05, N))
+    dW = rng.normal(0.0, np.sqrt(dt), N-1)
+    k = (np.arange(N-1)*K)//N
+    x = np.concatenate([rng.uniform(0.0, 0.5, K), rng.uniform(0.1, 1.0, K), rng.uniform(0.05, 0.3, K)])
+
+    _, grad = _path_loss(x, rates, dW, k, dt)
+    h = 1e-6
+    fd = np.array([(_path_loss(x+h*e, rates, dW, k, dt)[0]-_path_loss(x-h*e, rates, dW, k, dt)[0])/(2*h) for e in np.eye(len(x))])
+    assert np.allclose(grad, fd, rtol=1e-5, atol=1e-8)
+
+@pytest.mark.parametrize("buckets", [None, 5])
+def test_simulated_path_reproduces_calibration_loss(buckets):
+    N, dt, seed = 200, 1/252, 1
+    model = calibrated(N, buckets, dt)
+    rates = 3.0 + np.cumsum(np.random.default_rng(0).normal(0.0, 0.01, N))
+    # The optimizer's noise path, stepped with a and b as a solver does
+    dW = np.random.default_rng(seed=seed).normal(loc=0.0, scale=np.sqrt(dt), size=N-1)
+    Y = [model.Y0()]
+    for i, t in enumerate(np.arange(N-1)*dt):
+        Y.append(Y[-1] + model.a(Y[-1], t)*dt + model.b(Y[-1], t)*dW[i])
+    loss = np.sum((np.array(Y)-rates)**2)
+    assert loss == pytest.approx(model.calibration_diagnostics["loss"], rel=1e-9)
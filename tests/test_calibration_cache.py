@@ -0,0 +1,39 @@
+import numpy as np
+from omegaconf import OmegaConf
+
+from model import Vasicek, CalibrationCache
+from util import init_model
+
+
+RATES = 3.0 + np.cumsum(np.random.default_rng(0).normal(0, 0.01, 300))
+
+def cached_model(cache_dir) -> Vasicek:
+    model = Vasicek(0.0, 0.0, 0.0, 0.0)
+    model.calibration_cache = CalibrationCache(str(cache_dir))
+    return model
+
+def test_positional_and_keyword_options_share_an_entry(tmp_path):
+    cached_model(tmp_path).calibrate(RATES, 1/252)
+    model = cached_model(tmp_path)
+    model.calibrate(RATES, dt=1/252)
+    assert len(list(tmp_path.glob("*.json"))) == 1
+    assert "seconds" in model.calibration_diagnostics
+
+def test_options_change_the_key(tmp_path):
+    first, second = cached_model(tmp_path), cached_model(tmp_path)
+    first.calibrate(RATES, 1/252)
+    second.calibrate(RATES, 1/12)
+    assert len(list(tmp_path.glob("*.json"))) == 2
+    assert first.get_params() != second.get_params()
+
+def test_solver_settings_enter_the_context(tmp_path):
+    def config(num_chains: int):
+        return OmegaConf.create({
+            "model": {"_target_": "model.Vasicek", "theta": 0.0, "alpha": 0.0, "sigma": 0.0, "r0": 0.0},
+            "calibration_cache": {"_target_": "model.CalibrationCache", "cache_dir": str(tmp_path)},
+            "solver": {"_target_": "solver.EulerMaruyama", "_partial_": True, "num_chains": num_chains},
+        })
+
+    first, second = init_model(config(100)), init_model(config(200))
+    assert first.calibration_cache.context["solver"]["num_chains"] == 100
+    assert first.calibration_cache.key(Vasicek, RATES, {}) != second.calibration_cache.key(Vasicek, RATES, {})
@@ -0,0 +1,45 @@
+import os
+
+import numpy as np
+from omegaconf import OmegaConf
+
+import solver.sde_solver
+from model import Vasicek
+from solver import EulerMaruyama
+from solver.executor import _serialize, get_executor
+from util import make_solver
+
+
+CONFIG_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "config")
+
+
+def test_model_solvers_travel_by_pickle():
+    config = OmegaConf.create({"solver": {"_target_": "solver.Milstein", "_partial_": True, "num_chains": 10}})
+    _, use_dill = _serialize(make_solver(config, Vasicek(0.15, 0.5, 0.3, 3.0), 0, 10, dt=1/252))
+    assert not use_dill
+
+def test_closures_fall_back_to_dill():
+    theta, alpha = 0.15, 0.5
+    kwargs = dict(t_start=0, t_stop=30, num_chains=101, Y0=3.0, vectorized=True, dt=1/252, chunk_size=16, stream_size=16)
+    sde = EulerMaruyama(lambda Y, t: theta*(alpha-Y), lambda Y, t: 0.3*np.ones_like(Y), num_workers=2, **kwargs)
+    assert _serialize(sde)[1]
+    reference = EulerMaruyama(lambda Y, t: theta*(alpha-Y), lambda Y, t: 0.3*np.ones_like(Y), **kwargs).run()
+    assert np.array_equal(sde.run(), reference)
+
+def test_shipped_config_runs_in_the_pool(monkeypatch):
+    config = OmegaConf.create({"solver": OmegaConf.load(os.path.join(CONFIG_DIR, "solver", "euler_maruyama.yaml"))})
+    assert config.solver.num_workers > 1 and config.solver.chunk_size is None
+    for num_chains in (config.solver.num_chains, 10000):
+        sde = make_solver(OmegaConf.merge(config, {"solver": {"num_chains": num_chains}}), Vasicek(0.15, 0.5, 0.3, 3.0), 0, 30, dt=1/252)
+        assert sde.vectorized
+        # Every worker gets a block
+        assert -(-num_chains//sde.chunk_size) >= config.solver.num_workers
+
+    used = []
+    def spy(num_workers: int):
+        used.append(num_workers)
+        return get_executor(num_workers)
+    monkeypatch.setattr(solver.sde_solver, "get_executor", spy)
+    Y = sde.run()
+    assert used == [config.solver.num_workers]
+    assert len(Y) == 10000
@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+from omegaconf import OmegaConf
+
+from model import Vasicek
+from pricing import BondPricer
+from stats import ParameterBatch
+from util import make_solver, run_sim
+
+
+N = 61
+T = np.arange(N)/12
+MATURITIES = [1.0, 5.0]
+
+def priced(paths) -> BondPricer:
+    bonds = BondPricer(T, MATURITIES, 0.01)
+    bonds.update(paths)
+    return bonds
+
+def run(model, sensitivities: bool = False):
+    config = OmegaConf.create({"solver": {"_target_": "solver.EulerMaruyama", "_partial_": True, "num_chains": 100,
+                                          "seed": 0, "sensitivities": sensitivities}})
+    return make_solver(config, model, 0, N-1, tag="test", dt=1/12).run()
+
+def test_tangent_blocks_price_the_paths():
+    Y = run(Vasicek(0.15, 0.5, 0.3, 3.0), sensitivities=True)
+    bonds = BondPricer(T, MATURITIES, 0.01, tangents=True)
+    bonds.update(Y)
+    assert np.array_equal(bonds.prices, priced(Y[0]).prices)
+    assert bonds.price_sensitivities.shape == (len(Vasicek.PARAM_NDIM), len(MATURITIES))
+    with pytest.raises(ValueError):
+        bonds.update(Y[0])
+
+def test_parameter_batches_are_priced_per_set():
+    model = Vasicek(0.15, 0.5, 0.3, 3.0).scenarios({"sigma": [0.1, 0.3, 0.5]})
+    Y = run(model)
+    with pytest.raises(ValueError):
+        BondPricer(T, MATURITIES, 0.01).update(Y)
+
+    batch = ParameterBatch([BondPricer(T, MATURITIES, 0.01) for _ in range(len(Y))])
+    batch.update(Y)
+    for bonds, paths in zip(batch, Y):
+        assert np.array_equal(bonds.prices, priced(paths).prices)
+    assert batch[0].prices[-1] < batch[2].prices[-1]
+
+def test_scenario_runs_refuse_unbatched_pricers(tmp_path, monkeypatch):
+    monkeypatch.setenv("OUTPUT_DIR", str(tmp_path))
+    config = OmegaConf.create({
+        "solver": {"_target_": "solver.EulerMaruyama", "_partial_": True, "num_chains": 100, "seed": 0},
+        "sim": {"plot": False},
+    })
+    model = Vasicek(0.15, 0.5, 0.3, 3.0).scenarios({"sigma": [0.1, 0.3, 0.5]})
+    with pytest.raises(ValueError):
+        run_sim(config, 0, N-1, None, T, model, model.Y0(), accumulators=[BondPricer(T, MATURITIES, 0.01)], dt=1/12)
+
+    batch = ParameterBatch([BondPricer(T, MATURITIES, 0.01) for _ in range(3)])
+    run_sim(config, 0, N-1, None, T, model, model.Y0(), tag="test", accumulators=[batch], dt=1/12)
+    assert np.allclose(batch[1].prices, priced(run(model)[1]).prices, rtol=1e-12)
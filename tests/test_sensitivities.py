@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+from omegaconf import OmegaConf
+
+from model import Vasicek, CIR, BlackKarasinski
+from pricing import BondPricer
+from util import make_solver
+
+
+N = 61
+EPS = 1e-6
+
+def solver(name: str, model, sensitivities: bool, **kwargs):
+    config = OmegaConf.create({"solver": {"_target_": f"solver.{name}", "_partial_": True, "num_chains": 100, "seed": 0,
+                                          "sensitivities": sensitivities, **kwargs}})
+    return make_solver(config, model, 0, N-1, tag="test", dt=1/12)
+
+def black_karasinski(theta: float, phi: float, sigma: float, r0: float) -> BlackKarasinski:
+    # Parallel shifts of all buckets, the direction the tangents differentiate in
+    return BlackKarasinski(np.array([0.15, 0.2])+theta, np.array([0.5, 0.6])+phi, np.array([0.3, 0.2])+sigma, r0)
+
+MODELS = {
+    "Vasicek": (Vasicek, {"theta": 0.15, "alpha": 0.5, "sigma": 0.3, "r0": 3.0}),
+    "CIR": (CIR, {"theta": 1.5, "alpha": 0.5, "sigma": 0.2, "r0": 3.0}),
+    "BlackKarasinski": (black_karasinski, {"theta": 0.0, "phi": 0.0, "sigma": 0.0, "r0": 3.0}),
+}
+
+def shifted(params: dict, name: str, eps: float) -> dict:
+    return {**params, name: params[name]+eps}
+
+@pytest.mark.parametrize("name", ["EulerMaruyama", "Milstein"])
+@pytest.mark.parametrize("model", MODELS)
+def test_tangents_match_finite_differences(name, model):
+    make, params = MODELS[model]
+    Y = solver(name, make(**params), True).run()
+    assert np.array_equal(Y[0], solver(name, make(**params), False).run())
+    assert np.array_equal(Y, solver(name, make(**params), True, chunk_size=30, num_workers=2).run())
+
+    # Common random numbers: the same seed drives the shifted runs
+    for k, p in enumerate(params):
+        up = solver(name, make(**shifted(params, p, EPS)), False).run()
+        down = solver(name, make(**shifted(params, p, -EPS)), False).run()
+        fd = (up-down)/(2*EPS)
+        assert np.max(np.abs(fd-Y[1+k])) < 1e-5*max(1.0, np.max(np.abs(fd))), p
+
+@pytest.mark.parametrize("model", MODELS)
+def test_price_sensitivities_match_finite_differences(model):
+    make, params = MODELS[model]
+    t, maturities = np.arange(N)/12, [1.0, 5.0]
+    bonds = BondPricer(t, maturities, 0.01, tangents=True)
+    bonds.update(solver("EulerMaruyama", make(**params), True).run())
+
+    for k, p in enumerate(params):
+        up, down = BondPricer(t, maturities, 0.01), BondPricer(t, maturities, 0.01)
+        up.update(solver("EulerMaruyama", make(**shifted(params, p, 1e-5)), False).run())
+        down.update(solver("EulerMaruyama", make(**shifted(params, p, -1e-5)), False).run())
+        fd = (up.prices-down.prices)/2e-5
+        assert np.allclose(bonds.price_sensitivities[k], fd, rtol=1e-4, atol=1e-10), p
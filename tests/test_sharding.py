@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+from omegaconf import OmegaConf
+
+from model import Vasicek
+from pricing import BondPricer
+from sharding import shard_path, save_shard, merge_shards
+from stats import PathStatistics
+from util import make_solver
+
+
+N = 30
+
+def solver():
+    config = OmegaConf.create({"solver": {"_target_": "solver.EulerMaruyama", "_partial_": True, "num_chains": 101,
+                                          "chunk_size": 16, "stream_size": 16, "seed": 0}})
+    return make_solver(config, Vasicek(0.15, 0.5, 0.3, 3.0), 0, N-1, tag="test", dt=1/252)
+
+def pricer():
+    return BondPricer(np.arange(N)/252, [0.02, 0.05, 0.1])
+
+@pytest.mark.parametrize("count", [1, 2, 3, 7])
+def test_merged_shards_reproduce_unsharded_run(tmp_path, count):
+    stats, bonds = PathStatistics(N), pricer()
+    reference = solver().run(accumulators=[stats, bonds])
+
+    for index in range(count):
+        shard = solver()
+        shard.shard(index, count)
+        shard_stats, shard_bonds = PathStatistics(N), pricer()
+        shard.run(shard_path(str(tmp_path), "test", index, count, "npy"), accumulators=[shard_stats, shard_bonds])
+        save_shard(str(tmp_path), "test", index, count, shard_stats, (shard.chain_start, shard.chain_stop), [shard_bonds])
+    merged, (merged_bonds,), Ys = merge_shards(str(tmp_path), "test", N)
+
+    assert np.array_equal(Ys, reference)
+    assert merged.count == stats.count == len(reference)
+    assert np.allclose(merged.mean, stats.mean, rtol=1e-12)
+    assert np.allclose(merged.moments.variance, stats.moments.variance, rtol=1e-10)
+    assert np.allclose(merged_bonds.prices, bonds.prices, rtol=1e-12)
+
+def test_missing_shard_is_reported(tmp_path):
+    shard = solver()
+    shard.shard(0, 2)
+    stats = PathStatistics(N)
+    shard.accumulate([stats])
+    save_shard(str(tmp_path), "test", 0, 2, stats, (shard.chain_start, shard.chain_stop))
+    with pytest.raises(FileNotFoundError):
+        merge_shards(str(tmp_path), "test", N)
@@ -0,0 +1,43 @@
+import numpy as np
+import pytest
+from omegaconf import OmegaConf
+
+from model import Vasicek, CIR
+from util import make_solver
+
+
+def solver(name: str, model, **kwargs):
+    config = OmegaConf.create({"solver": {"_target_": f"solver.{name}", "_partial_": True, "num_chains": 101, "seed": 0, **kwargs}})
+    return make_solver(config, model, 0, 30, tag="test", dt=1/252)
+
+CASES = [
+    ("EulerMaruyama", lambda: Vasicek(0.15, 0.5, 0.3, 3.0), {}),
+    ("EulerMaruyama", lambda: Vasicek(0.15, 0.5, 0.3, 3.0), {"variance_reduction": "antithetic"}),
+    ("Milstein", lambda: CIR(1.5, 0.5, 0.2, 3.0), {}),
+    ("ExactSolver", lambda: CIR(1.5, 0.5, 0.2, 3.0), {}),
+]
+
+@pytest.mark.parametrize("name, model, options", CASES)
+@pytest.mark.parametrize("stream_size", [1, 16, 1024])
+def test_results_do_not_depend_on_chunks_or_workers(name, model, options, stream_size):
+    reference = solver(name, model(), stream_size=stream_size, **options).run()
+    for chunk_size, num_workers in [(1, 1), (17, 1), (40, 2), (64, 2)]:
+        Y = solver(name, model(), stream_size=stream_size, chunk_size=chunk_size, num_workers=num_workers, **options).run()
+        assert np.array_equal(Y, reference), (chunk_size, num_workers)
+
+@pytest.mark.parametrize("stream_size", [1, 16, 1024])
+def test_antithetic_pairs_mirror(stream_size):
+    sde = solver("EulerMaruyama", Vasicek(0.15, 0.5, 0.3, 3.0), stream_size=stream_size, variance_reduction="antithetic")
+    dW = sde.increments(0, sde.num_chains)
+    assert np.array_equal(dW[:, 1::2], -dW[:, :-1:2])
+    assert not np.array_equal(dW[:, 0], dW[:, 2])
+
+def test_chains_draw_independent_noise():
+    sde = solver("EulerMaruyama", Vasicek(0.15, 0.5, 0.3, 3.0), stream_size=16)
+    dW = sde.increments(0, sde.num_chains)
+    assert len(np.unique(dW[0])) == sde.num_chains
+
+def test_small_runs_still_split_into_blocks():
+    sde = solver("ExactSolver", CIR(1.5, 0.5, 0.2, 3.0), chunk_size=20)
+    assert sde.stream_size == 7 and sde.chunk_size == 14
+    assert len(list(sde.iter_chunks())) == 8